@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Modules of src come first, 'build.py' at the root of the repository is not the 'build' module of kiss
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -0,0 +1,95 @@
+# Benchmark of the configure and build wall time of CMake generators on a synthetic workspace: a binary that uses libraries
+# - 'Unix Makefiles' is a single profile generator, each profile has its own tree, its own configure and its own objects
+# - 'Ninja Multi-Config' configures a single tree that builds all profiles
+# CMakeLists.txt are generated by 'kiss generate' in a copy of the workspace per generator, configure and build are timed
+# Run it from the root of the repository: python -m benchmarks.bench_cmake_generators
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from benchmarks import *
+from cmake.cmake_builder import CMakeBuilder
+from cmake.cmake_generator_name import CMakeGeneratorName
+from toolchain import Toolchain
+from toolchain.compiler import Compiler
+from toolchain.target import Target
+
+def create_workspace(directory: Path, libraries: int, sources: int):
+    for i in range(libraries):
+        library = directory / f"lib_{i}"
+        (library / "src").mkdir(parents=True)
+        (library / "interface" / f"lib_{i}").mkdir(parents=True)
+        (library / "interface" / f"lib_{i}" / "lib.h").write_text(f"int lib_{i}();\n", encoding="utf-8")
+        for j in range(sources):
+            (library / "src" / f"source_{j}.cpp").write_text(
+                f"#include <lib_{i}/lib.h>\n#include <string>\n#include <vector>\n"
+                f"int lib_{i}_{j}() {{ std::vector<std::string> v(10, \"{j}\"); return int(v.size()); }}\n", encoding="utf-8")
+        (library / "src" / "lib.cpp").write_text(f"#include <lib_{i}/lib.h>\nint lib_{i}() {{ return {i}; }}\n", encoding="utf-8")
+        (library / "kiss.yaml").write_text(
+            f"lib:\n- name: lib_{i}\n  version: 0.1.0\n  sources:\n  - src/*.cpp\n  interface_directories:\n  - interface\n", encoding="utf-8")
+    binary = directory / "app"
+    (binary / "src").mkdir(parents=True)
+    (binary / "src" / "main.cpp").write_text(
+        "".join(f"#include <lib_{i}/lib.h>\n" for i in range(libraries)) +
+        "int main() { return " + " + ".join([f"lib_{i}()" for i in range(libraries)] or ["0"]) + "; }\n", encoding="utf-8")
+    (binary / "kiss.yaml").write_text(
+        "bin:\n- name: app\n  version: 0.1.0\n  sources:\n  - src/main.cpp\n  dependencies:\n" +
+        "".join(f"  - name: lib_{i}\n    path: ../lib_{i}\n" for i in range(libraries)), encoding="utf-8")
+
+# Generate the CMakeLists.txt files of the binary for the profile, return the directory of its CMakeLists.txt
+def generate_workspace(directory: Path, cmake_generator_name: CMakeGeneratorName, profile_name: str) -> Path:
+    subprocess.run([sys.executable, "src/kiss.py", "-d", str(directory / "app"), "generate", "--profile", profile_name, "cmake", "-g", cmake_generator_name.name],
+                   check=True, capture_output=True)
+    pattern = f"build/*/*/cmake/app_*/{profile_name}" if cmake_generator_name.is_single_profile() else "build/*/*/cmake/app_*"
+    return next((directory / "app").glob(pattern)).resolve()
+
+def run(args: list[str], working_dir: Path) -> float:
+    start = time.perf_counter()
+    subprocess.run(["cmake"] + args, cwd=working_dir, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+# Configure and build all profiles, return the configure and build times
+def measure(toolchain: Toolchain, cmake_generator_name: CMakeGeneratorName, profile_names: list[str], directory: Path, libraries: int, sources: int, jobs: int) -> tuple[float, float]:
+    create_workspace(directory, libraries, sources)
+    configure_time = 0.0
+    build_time = 0.0
+    build_directory = None
+    for profile_name in profile_names:
+        if cmake_generator_name.is_single_profile() or build_directory is None:
+            source_directory = generate_workspace(directory, cmake_generator_name, profile_name)
+            build_directory = source_directory / "build"
+            build_directory.mkdir(exist_ok=True)
+            configure_args = CMakeBuilder()._get_configure_args(cmake_generator_name, context=SimpleNamespace(toolchain=toolchain), source_directory=source_directory)
+            configure_time += run(configure_args, build_directory)
+        build_time += run(["--build", ".", "--config", profile_name, "--parallel", str(jobs)], build_directory)
+    return configure_time, build_time
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark configure and build of CMake generators")
+    parser.add_argument("--libraries", type=int, default=8)
+    parser.add_argument("--sources", type=int, default=8, help="Number of sources of each library")
+    parser.add_argument("--profiles", nargs="+", default=["debug", "release"])
+    parser.add_argument("--generators", nargs="+", default=["Unix Makefiles", "Ninja Multi-Config"])
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    Toolchain.load_all_toolchains_in_directory(Path("toolchains/linux"))
+    toolchain = Toolchain.create(compiler_name=Compiler.default_compiler_name(), target_name=Target.default_target_name())
+
+    directory = Path(tempfile.mkdtemp(prefix="kiss_bench_generators_"))
+    try:
+        print(f"{args.libraries} libraries of {args.sources + 1} sources, profiles {', '.join(args.profiles)}, {toolchain.compiler.name}, {args.jobs} jobs")
+        for generator in args.generators:
+            configure_time, build_time = measure(toolchain, CMakeGeneratorName(generator), args.profiles, directory / generator.replace(" ", "_"),
+                                                 args.libraries, args.sources, args.jobs)
+            print(f"  {generator:20}: configure {configure_time:8.3f} s, build {build_time:8.3f} s, total {configure_time + build_time:8.3f} s")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Benchmark of file hashing on a synthetic source tree
+# - Serial hashing with 1 MiB chunks and resolve/exists on each file, like Fingerprint.compute_file_hash did
+# - Batch hashing with hash_files (thread pool, mmap of large files)
+# Each is measured with a cold page cache (pages of the files are dropped with posix_fadvise) and with a warm page cache
+# Run it from the root of the repository: python -m benchmarks.bench_fingerprint_hash
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from benchmarks import *
+from cmake.fingerprint import DEFAULT_HASH_ALGORITHM, HASH_ALGORITHMS, hash_files
+
+def create_tree(directory: Path, small_files: int, large_files: int, large_size: int) -> list[Path]:
+    random.seed(0)
+    files = list[Path]()
+    for i in range(small_files):
+        file = directory / f"dir_{i % 100}" / f"source_{i}.cpp"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_bytes(random.randbytes(random.randint(1024, 32 * 1024)))
+        files.append(file)
+    for i in range(large_files):
+        file = directory / "large" / f"large_{i}.bin"
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_bytes(random.randbytes(large_size))
+        files.append(file)
+    os.sync()
+    return files
+
+def drop_page_cache(files: list[Path]) -> bool:
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for file in files:
+        fd = os.open(file, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+def serial_hash(files: list[Path], hash_algorithm: str) -> dict:
+    hashes = {}
+    for file in files:
+        h = HASH_ALGORITHMS[hash_algorithm]()
+        file = file.resolve()
+        if not file.exists():
+            raise FileNotFoundError(file)
+        with file.open("rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        hashes[file] = h.hexdigest()
+    return hashes
+
+def measure(function, files: list[Path], cold: bool) -> float:
+    if cold:
+        drop_page_cache(files)
+    else:
+        function()
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark serial and batch hashing of files")
+    parser.add_argument("--small-files", type=int, default=20000)
+    parser.add_argument("--large-files", type=int, default=16)
+    parser.add_argument("--large-size", type=int, default=16 * 2**20, help="Size of large files in bytes")
+    parser.add_argument("--hash", default=DEFAULT_HASH_ALGORITHM, choices=list(HASH_ALGORITHMS))
+    parser.add_argument("--jobs", type=int, default=None)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="kiss_bench_hash_"))
+    try:
+        files = create_tree(directory, args.small_files, args.large_files, args.large_size)
+        total_size = sum(file.stat().st_size for file in files)
+        assert len(serial_hash(files, args.hash)) == len(hash_files(files, args.hash, args.jobs)) == len(files)
+        cold_supported = drop_page_cache(files)
+
+        print(f"{len(files)} files, {total_size / 2**20:.1f} MiB, {args.hash}, {args.jobs or os.cpu_count()} jobs")
+        for cache in (["cold", "warm"] if cold_supported else ["warm"]):
+            serial_time = measure(lambda: serial_hash(files, args.hash), files, cache == "cold")
+            batch_time = measure(lambda: hash_files(files, args.hash, args.jobs), files, cache == "cold")
+            print(f"  {cache} page cache")
+            print(f"    serial      : {serial_time:8.3f} s ({total_size / 2**20 / serial_time:8.1f} MiB/s)")
+            print(f"    hash_files  : {batch_time:8.3f} s ({total_size / 2**20 / batch_time:8.1f} MiB/s)")
+            print(f"    speedup     : {serial_time / batch_time:8.2f}x")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
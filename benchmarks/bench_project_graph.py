@@ -0,0 +1,66 @@
+# Benchmark of the memory and the time used by a large synthetic workspace
+# - Memory retained by the yaml projects and by the registered projects (tracemalloc)
+# - Time to register projects and resolve dependencies
+# - Time of the first topological sort, transitive closure and levels queries of the last project
+# Run it from the root of the repository: python -m benchmarks.bench_project_graph
+import argparse
+import gc
+import time
+import tracemalloc
+from benchmarks import *
+from benchmarks.bench_project_registry import create_graph
+from project_graph import ProjectGraph
+from projectregistry import ProjectRegistry
+
+def measure(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+# Memory retained by the yaml projects, and by the registered projects once yaml projects are released
+def measure_memory(project_count: int, dependency_count: int) -> tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    start_memory = tracemalloc.get_traced_memory()[0]
+    graph = create_graph(project_count, dependency_count)
+    yaml_memory = tracemalloc.get_traced_memory()[0] - start_memory
+    registry = type(ProjectRegistry)()
+    registry.register_yaml_projects(graph)
+    del graph
+    gc.collect()
+    project_memory = tracemalloc.get_traced_memory()[0] - start_memory
+    tracemalloc.stop()
+    del registry
+    ProjectRegistry.clear()
+    gc.collect()
+    return yaml_memory, project_memory
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory and graph queries of a large workspace")
+    parser.add_argument("--projects", type=int, default=50000)
+    parser.add_argument("--dependencies", type=int, default=4, help="Dependencies per project")
+    args = parser.parse_args()
+
+    yaml_memory, project_memory = measure_memory(args.projects, args.dependencies)
+
+    # Times are measured without tracemalloc
+    graph, create_time = measure(lambda: create_graph(args.projects, args.dependencies))
+    registry = type(ProjectRegistry)()
+    _, register_time = measure(lambda: registry.register_yaml_projects(graph))
+    root = registry.get_project(f"lib_{args.projects - 1}")
+    order, sort_time = measure(lambda: root.topological_sort_projects())
+    closure, closure_time = measure(lambda: root.transitive_dependencies())
+    levels, levels_time = measure(lambda: ProjectGraph.levels([root]))
+    assert len(order) == args.projects and len(closure) == args.projects - 1 and len(levels) == args.projects
+
+    print(f"{args.projects} projects, {args.dependencies} dependencies per project")
+    print(f"  yaml projects memory       : {yaml_memory / 2**20:8.1f} MiB ({yaml_memory / args.projects:6.0f} B/project)")
+    print(f"  registered projects memory : {project_memory / 2**20:8.1f} MiB ({project_memory / args.projects:6.0f} B/project)")
+    print(f"  create yaml projects       : {create_time:8.3f} s")
+    print(f"  register                   : {register_time:8.3f} s")
+    print(f"  topological sort           : {sort_time:8.3f} s")
+    print(f"  transitive closure         : {closure_time:8.3f} s")
+    print(f"  levels                     : {levels_time:8.3f} s")
+
+if __name__ == "__main__":
+    main()
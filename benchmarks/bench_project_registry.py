@@ -0,0 +1,61 @@
+# Benchmark of the ProjectRegistry dependency resolution on synthetic project graphs
+# Run it from the root of the repository: python -m benchmarks.bench_project_registry
+import argparse
+import time
+from pathlib import Path
+import semver
+from benchmarks import *
+from project import Project
+from projectregistry import ProjectRegistry
+from yaml_file import YamlLibProject, YamlPathDependency
+
+ROOT_DIRECTORY = Path("/synthetic")
+
+# Create a graph of project_count library projects, each one in its own 'kiss.yaml' file
+# Each project depends on up to dependency_count projects created before it
+def create_graph(project_count: int, dependency_count: int) -> dict[Path, list[YamlLibProject]]:
+    yaml_projects_per_file = dict[Path, list[YamlLibProject]]()
+    for index in range(project_count):
+        directory = ROOT_DIRECTORY / f"lib_{index}"
+        file = directory / "kiss.yaml"
+        dependencies = [YamlPathDependency(name=f"lib_{dep}", path=ROOT_DIRECTORY / f"lib_{dep}")
+                        for dep in range(max(0, index - dependency_count), index)]
+        yaml_projects_per_file[file] = [YamlLibProject(file=file, path=directory, name=f"lib_{index}", description="", version=semver.Version.parse("0.1.0"), sources=[], interface_directories=[], dependencies=dependencies)]
+    return yaml_projects_per_file
+
+# The resolution used before the registry was indexed, kept as a reference
+def nested_loop_resolution(yaml_projects_per_file: dict[Path, list[YamlLibProject]]):
+    all_projects = [(yaml_project, Project.from_yaml_project(yaml_project)) for yaml_project_list in yaml_projects_per_file.values() for yaml_project in yaml_project_list]
+    for yaml_project, project in all_projects:
+        for yaml_dep in yaml_project.dependencies:
+            for yaml_project_dep, project_dep in all_projects:
+                if yaml_project_dep.is_matching_yaml_dependency(yaml_dep) or (yaml_dep.name == project_dep.name and project_dep.file.parent == yaml_dep.path):
+                    project.dependencies.append(project_dep)
+                    break
+
+def indexed_resolution(yaml_projects_per_file: dict[Path, list[YamlLibProject]]):
+    registry = type(ProjectRegistry)()
+    registry.register_yaml_projects(yaml_projects_per_file)
+    assert registry.get_project(f"lib_{len(yaml_projects_per_file) - 1}") is not None
+
+def measure(function, yaml_projects_per_file) -> float:
+    start = time.perf_counter()
+    function(yaml_projects_per_file)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ProjectRegistry dependency resolution")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 5000, 10000])
+    parser.add_argument("--dependencies", type=int, default=4, help="Dependencies per project")
+    parser.add_argument("--nested-loop-max", type=int, default=2000, help="Largest size measured with the nested loop resolution")
+    args = parser.parse_args()
+
+    print(f"{'projects':>10} {'indexed (s)':>12} {'us/project':>11} {'nested loop (s)':>16}")
+    for size in args.sizes:
+        graph = create_graph(size, args.dependencies)
+        indexed = measure(indexed_resolution, graph)
+        nested = f"{measure(nested_loop_resolution, graph):16.3f}" if size <= args.nested_loop_max else f"{'-':>16}"
+        print(f"{size:>10} {indexed:12.3f} {indexed / size * 1e6:11.1f} {nested}")
+
+if __name__ == "__main__":
+    main()
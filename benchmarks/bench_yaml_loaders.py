@@ -0,0 +1,26 @@
+# Benchmark of the YAML loaders on toolchain files
+# Run it from the root of the repository: python -m benchmarks.bench_yaml_loaders
+import argparse
+import timeit
+from pathlib import Path
+import yaml
+from benchmarks import *
+from yaml_file.line_loader import HAS_LIBYAML, LineLoader, PyLineLoader
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the libyaml and the pure python line loaders")
+    parser.add_argument("--file", type=Path, default=Path("toolchains/linux/compilers.yaml"))
+    parser.add_argument("--number", type=int, default=50)
+    args = parser.parse_args()
+
+    content = args.file.read_text(encoding="utf-8")
+    print(f"{args.file} ({len(content)} bytes), libyaml available: {HAS_LIBYAML}")
+    results = {}
+    for name, loader in (("python", PyLineLoader), ("libyaml" if HAS_LIBYAML else "python (fallback)", LineLoader)):
+        results[name] = min(timeit.repeat(lambda: yaml.load(content, Loader=loader), number=args.number, repeat=5)) / args.number
+        print(f"{name:>18}: {results[name] * 1e3:8.3f} ms/load")
+    python_time, line_loader_time = results.values()
+    print(f"{'speedup':>18}: {python_time / line_loader_time:8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -54,7 +54,7 @@ def cmd_add(cli_args: argparse.Namespace) -> bool:
         console.print_step(f"""Adding to the project `{project_name}` in file {project_file} the dependency :
  - name : {cli_args.dependency_name} 
    git : {cli_args.git} """)
-        yaml_git_dict = yaml_file.git_depencendies_to_yaml_dict(cli_args.dependency_name, cli_args.git)
+        yaml_git_dict = yaml_file.git_depencendies_to_yaml_dict(cli_args.dependency_name, cli_args.git, cli_args.branch, cli_args.commit)
         if not yaml_file.add_dependency_to_project(project_name, yaml_git_dict):
             console.print_error(f"Error: Unable to add dependency `{cli_args.dependency_name}` to project `{project_name}` in file `{project_file}`")
             return False
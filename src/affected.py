@@ -0,0 +1,185 @@
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Optional, Self
+import console
+from context import KissBaseContext
+from project import Project
+from project_graph import ProjectGraph
+from projectregistry import ProjectRegistry
+from yaml_file import IndexedProjectDiscovery, YamlProjectFile
+
+# Absolute path without '..' components, paths are compared with it
+def _normalize(path: Path) -> Path:
+    return Path(os.path.abspath(path))
+
+# Regular expression of a glob pattern relative to its base directory
+# '**' match any number of directories, '*' and '?' don't match '/'
+def _glob_to_regex(pattern: str) -> re.Pattern:
+    regex = ""
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**", i):
+            regex += ".*"
+            i += 2
+        elif pattern[i] == "*":
+            regex += "[^/]*"
+            i += 1
+        elif pattern[i] == "?":
+            regex += "[^/]"
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex)
+
+# ProjectOwners find the projects that own a file:
+# - The 'kiss.yaml' file that describe the project
+# - A source of the project, or a file in a source directory or that match a source pattern
+# - A file in an interface directory of the project
+# Paths are indexed by directory, so finding the owners of a file only looks at its parent directories
+class ProjectOwners:
+    def __init__(self, projects: list[Project]):
+        # Projects by owned file or directory
+        self._projects_by_path: dict[Path, list[Project]] = {}
+        # Source patterns by the directory before the first wildcard
+        self._patterns_by_directory: dict[Path, list[tuple[re.Pattern, Project]]] = {}
+        for project in projects:
+            self._add_project(project)
+
+    def _add_path(self, path: Path, project: Project):
+        self._projects_by_path.setdefault(_normalize(path), []).append(project)
+
+    def _add_project(self, project: Project):
+        self._add_path(project.file, project)
+        for source in getattr(project, "sources", []):
+            parts = source.parts
+            if (wildcard := next((i for i, part in enumerate(parts) if "*" in part or "?" in part), None)) is None:
+                self._add_path(source, project)
+            else:
+                pattern = _glob_to_regex("/".join(parts[wildcard:]))
+                self._patterns_by_directory.setdefault(_normalize(Path(*parts[:wildcard])), []).append((pattern, project))
+        for interface_directory in getattr(project, "interface_directories", []):
+            self._add_path(interface_directory, project)
+
+    # Projects that own the file, in registration order
+    def owners(self, file: Path) -> list[Project]:
+        file = _normalize(file)
+        owners = dict[int, Project]()
+        for path in (file, *file.parents):
+            for project in self._projects_by_path.get(path, []):
+                owners.setdefault(id(project), project)
+            if (patterns := self._patterns_by_directory.get(path)):
+                relative_file = file.relative_to(path).as_posix()
+                for pattern, project in patterns:
+                    if pattern.fullmatch(relative_file):
+                        owners.setdefault(id(project), project)
+        return list(owners.values())
+
+class KissAffectedContext(KissBaseContext):
+    def __init__(self, current_directory:Path, files:Optional[list[Path]], since:Optional[str], json_file:Optional[str], jobs:int):
+        super().__init__(current_directory)
+        self._files = files
+        self._since = since
+        self._json_file = json_file
+        self._jobs = jobs
+
+    # Changed files given on the command line, relative to the current directory
+    @property
+    def files(self) -> Optional[list[Path]] :
+        return self._files
+
+    # Git revision to compare with the working tree
+    @property
+    def since(self) -> Optional[str] :
+        return self._since
+
+    # File where the json result is written, '-' for the standard output, None to print the result
+    @property
+    def json_file(self) -> Optional[str] :
+        return self._json_file
+
+    @property
+    def jobs(self) -> int :
+        return self._jobs
+
+    @classmethod
+    def from_cli_args(cls, cli_args: argparse.Namespace) -> Self:
+        return cls(current_directory=cli_args.directory, files=cli_args.files, since=cli_args.since, json_file=cli_args.json, jobs=cli_args.jobs)
+
+# Files changed in the working tree since the git revision, None if git failed
+def _git_changed_files(directory: Path, revision: str) -> Optional[list[Path]]:
+    try:
+        toplevel = subprocess.run(["git", "rev-parse", "--show-toplevel"], cwd=directory, capture_output=True, text=True)
+        if toplevel.returncode != 0:
+            console.print_error(f"Error: {directory} is not in a git repository: {toplevel.stderr.strip()}")
+            return None
+        diff = subprocess.run(["git", "diff", "--name-only", "-z", revision, "--"], cwd=directory, capture_output=True, text=True)
+    except OSError as e:
+        console.print_error(f"Error: Unable to run git: {e}")
+        return None
+    if diff.returncode != 0:
+        console.print_error(f"Error: Unable to list files changed since {revision}: {diff.stderr.strip()}")
+        return None
+    root = Path(toplevel.stdout.strip())
+    return [root / file for file in diff.stdout.split("\0") if file]
+
+def cmd_affected(cli_args: argparse.Namespace) -> bool:
+    affected_context = KissAffectedContext.from_cli_args(cli_args)
+    if affected_context.since is not None:
+        if (changed_files := _git_changed_files(affected_context.current_directory, affected_context.since)) is None:
+            return False
+    else:
+        changed_files = [affected_context.current_directory / file for file in affected_context.files]
+
+    # Load all projects of the directory and their dependencies
+    all_yaml_projects = YamlProjectFile.load_yaml_projects_in_directory(directory=affected_context.current_directory, recursive=True, load_dependencies=True, discovery=IndexedProjectDiscovery(), jobs=affected_context.jobs)
+    ProjectRegistry.register_yaml_projects(all_yaml_projects)
+    all_projects = [project for project_list in ProjectRegistry.projects.values() for project in project_list]
+
+    # Projects that own a changed file, then all projects that depend on them
+    owners = ProjectOwners(all_projects)
+    changed_projects = dict[int, Project]()
+    unowned_files = list[Path]()
+    for file in changed_files:
+        if not (file_owners := owners.owners(file)):
+            unowned_files.append(file)
+        for project in file_owners:
+            changed_projects.setdefault(id(project), project)
+    affected_projects = ProjectGraph.dependants_closure(list(changed_projects.values()), all_projects)
+
+    if affected_context.json_file is not None:
+        result = {
+            "projects": [{
+                "name": project.name,
+                "type": str(project.type),
+                "file": str(project.file),
+                "path": str(project.path),
+                "changed": id(project) in changed_projects
+            } for project in affected_projects],
+            "unowned_files": [str(file) for file in unowned_files]
+        }
+        if affected_context.json_file == "-":
+            sys.stdout.write(json.dumps(result, indent=2) + "\n")
+            return True
+        try:
+            with open(affected_context.json_file, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2)
+        except OSError as e:
+            console.print_error(f"Error: When saving {affected_context.json_file} file: {e}")
+            return False
+        return True
+
+    if not affected_projects:
+        console.print_success(f"No project affected by {len(changed_files)} changed files")
+    else:
+        console.print_success(f"{len(affected_projects)} projects affected by {len(changed_files)} changed files")
+        for project in affected_projects:
+            console.print(f"  - {project.name} ({project.file}){' [changed]' if id(project) in changed_projects else ''}")
+    if unowned_files:
+        console.print_tips(f"{len(unowned_files)} changed files are not owned by any project")
+    return True
@@ -13,17 +13,24 @@ class KissBuildContext(KissBaseContext):
                  project: Project, 
                  builder_name: str, 
                  toolchain: Toolchain,
-                 profile_name: str):
+                 profile_name: str,
+                 root_projects: Optional[list[Project]] = None):
         super().__init__(current_directory)
         self._project = project
         self._builder_name = builder_name
         self._toolchain = toolchain
         self._profile_name = profile_name
+        self._root_projects = root_projects or [project]
         
     @property
     def project(self) -> Project:
         return self._project
 
+    # Projects to build with their dependencies, only the project unless all projects of the directory are built
+    @property
+    def root_projects(self) -> list[Project]:
+        return self._root_projects
+
     @property
     def builder_name(self) -> str:
         return self._builder_name
@@ -42,7 +49,18 @@ class KissBuildContext(KissBaseContext):
                project_name: str, 
                builder_name: str, 
                toolchain: Toolchain, 
-               profile_name: str) -> Optional[Self] :
+               profile_name: str,
+               all_projects: bool = False) -> Optional[Self] :
+        # Without project name, build all projects of the directory
+        if all_projects and not project_name:
+            if not (root_projects := super().find_target_projects(current_directory)):
+                return None
+            return KissBuildContext(current_directory=current_directory, 
+                                    project=root_projects[0], 
+                                    builder_name=builder_name, 
+                                    toolchain=toolchain,
+                                    profile_name=profile_name,
+                                    root_projects=root_projects)
         project_to_build = super().find_target_project(current_directory, project_name)
         if not project_to_build:
             console.print_error(f"No project '{project_name}' found in {str(current_directory)}")
@@ -70,7 +88,8 @@ class KissBuildContext(KissBaseContext):
                                        project_name=cli_args.project_name,
                                        builder_name=cli_args.builder,
                                        toolchain=toolchain,
-                                       profile_name=cli_args.profile)
+                                       profile_name=cli_args.profile,
+                                       all_projects=getattr(cli_args, "superbuild", False))
 
 def cmd_build(cli_args: argparse.Namespace) -> bool:
     if( builder := BuilderRegistry.builders.get(cli_args.builder)) is None:
@@ -81,7 +100,8 @@ def cmd_build(cli_args: argparse.Namespace) -> bool:
         return None
     kiss_build_context : KissBuildContext = kiss_build_context
     
-    console.print_step(f"Building '{kiss_build_context.project.name}' with \n"
+    project_names = ", ".join(project.name for project in kiss_build_context.root_projects)
+    console.print_step(f"Building '{project_names}' with \n"
                        f" - Builder : {builder.name}\n"
                        f" - Profile : {kiss_build_context.profile_name}\n"
                        f" - Target : {kiss_build_context.toolchain.target.name}\n"
@@ -91,7 +111,7 @@ def cmd_build(cli_args: argparse.Namespace) -> bool:
                                      cli_args=cli_args) 
 
     if is_build_success:
-        console.print_success(f"'{kiss_build_context.project.name}' build successfully") 
+        console.print_success(f"'{project_names}' build successfully") 
     else:
-        console.print_error(f"'{kiss_build_context.project.name}' build error") 
+        console.print_error(f"'{project_names}' build error") 
     return is_build_success
\ No newline at end of file
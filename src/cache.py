@@ -0,0 +1,14 @@
+import os
+from pathlib import Path
+import platform
+
+# Directory where kiss keeps data shared by all invocations (parsed manifests, ...)
+# The environment variable KISS_CACHE_DIR can be used to override the default location
+def cache_directory() -> Path:
+    if (directory := os.environ.get("KISS_CACHE_DIR")):
+        return Path(directory).expanduser().absolute()
+    if platform.system() == "Windows":
+        base_directory = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    else:
+        base_directory = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base_directory / "kiss"
@@ -0,0 +1,39 @@
+import argparse
+from pathlib import Path
+from typing import Self
+import console
+from context import KissBaseContext
+from project_graph import ProjectGraph
+from projectregistry import ProjectRegistry
+from yaml_file import IndexedProjectDiscovery, YamlProjectFile
+
+
+class KissCheckContext(KissBaseContext):
+    def __init__(self, current_directory:Path, jobs:int):
+        super().__init__(current_directory)
+        self._jobs = jobs
+
+    @property
+    def jobs(self) -> int : 
+        return self._jobs
+    
+    @classmethod
+    def from_cli_args(cls, cli_args: argparse.Namespace) -> Self:
+        return cls(current_directory=cli_args.directory, jobs=cli_args.jobs)
+
+# Report all dependency cycles of the projects in one pass
+def _check_graph(check_context: KissCheckContext) -> bool:
+    all_yaml_projects = YamlProjectFile.load_yaml_projects_in_directory(directory=check_context.current_directory, recursive=True, load_dependencies=True, discovery=IndexedProjectDiscovery(), jobs=check_context.jobs)
+    ProjectRegistry.register_yaml_projects(all_yaml_projects)
+    all_projects = [project for project_list in ProjectRegistry.projects.values() for project in project_list]
+    if (cycles := ProjectGraph.cycles(all_projects)):
+        ProjectGraph.print_cycles(cycles)
+        console.print_error(f"Error: {len(cycles)} dependency cycles found in {len(all_projects)} projects")
+        return False
+    console.print_success(f"No dependency cycle in {len(all_projects)} projects")
+    return True
+
+def cmd_check(cli_args: argparse.Namespace) -> bool:
+    # The dependency graph is the only check, '--graph' selects it explicitly
+    check_context = KissCheckContext.from_cli_args(cli_args)
+    return _check_graph(check_context)
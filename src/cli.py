@@ -3,6 +3,7 @@ from pathlib import Path
 import re
 import sys
 from builder import BuilderRegistry
+from cmake.fingerprint import DEFAULT_HASH_ALGORITHM, HASH_ALGORITHMS, FingerprintMode
 from cleaner import CleanerRegistry
 import console
 from generator import GeneratorRegistry
@@ -30,6 +31,32 @@ def _add_list_command(parser : argparse.ArgumentParser):
     list_parser = parser.add_parser("list", description="list projects in directory")
     list_parser.add_argument("-r", "--recursive", help="iterate over directories", action='store_const', const=True, default=False) 
     list_parser.add_argument("-d", "--list-dependencies", help="list all dependencies", action='store_const', const=True, default=False) 
+    list_parser.add_argument("--levels", help="print projects grouped by dependency levels, projects of a level don't depend on each other", dest="list_levels", action='store_const', const=True, default=False) 
+    list_parser.add_argument("-j", "--jobs", help="number of processes used to parse kiss.yaml files (0 means one per CPU)", type=int, default=1) 
+    list_parser.add_argument("-s", "--stop-at-project", help="with --recursive, don't iterate below a directory that contains a kiss.yaml", action='store_const', const=True, default=False) 
+
+def _add_index_command(parser : argparse.ArgumentParser):
+    index_parser = parser.add_parser("index", description="update the index of projects in directories")
+    index_parser.add_argument("--rebuild", help="ignore the current index and scan all directories", action='store_const', const=True, default=False) 
+    index_parser.add_argument("-p", "--project", help="print files that describe the project", dest="project_name", required=False, type=valid_project_name)
+    index_parser.add_argument("-j", "--jobs", help="number of processes used to parse kiss.yaml files (0 means one per CPU)", type=int, default=1) 
+
+def _add_affected_command(parser : argparse.ArgumentParser):
+    affected_parser = parser.add_parser("affected", description="list projects affected by changed files, in build order")
+    changes_group = affected_parser.add_mutually_exclusive_group(required=True)
+    changes_group.add_argument("--files", help="changed files, relative to the directory", nargs="+", type=Path)
+    changes_group.add_argument("--since", help="git revision, files changed since this revision are changed files", type=str)
+    affected_parser.add_argument("--json", help="write affected projects as json in the file (default: the standard output)", metavar="FILE", nargs="?", const="-", default=None, type=str) 
+    affected_parser.add_argument("-j", "--jobs", help="number of processes used to parse kiss.yaml files (0 means one per CPU)", type=int, default=1) 
+
+def _add_check_command(parser : argparse.ArgumentParser):
+    check_parser = parser.add_parser("check", description="check projects in directory and its child directories")
+    check_parser.add_argument("--graph", help="report all dependency cycles (the only check, run without option too)", action='store_const', const=True, default=False) 
+    check_parser.add_argument("-j", "--jobs", help="number of processes used to parse kiss.yaml files (0 means one per CPU)", type=int, default=1) 
+
+def _add_lock_command(parser : argparse.ArgumentParser):
+    lock_parser = parser.add_parser("lock", description="write the kiss.lock file with the resolved dependencies of the projects in directory")
+    lock_parser.add_argument("--check", help="check that the kiss.lock file is up to date without writing it", action='store_const', const=True, default=False) 
 
 def _add_bin_to_parser(parser: argparse.ArgumentParser):
     parser.add_argument("project_name", help="name of the project to create", type=valid_project_name)
@@ -84,10 +111,13 @@ def _add_add_command(parser : argparse.ArgumentParser):
     group.add_argument("--path", type=Path, help="Path to the dependency project")
     group.add_argument("--git", type=str, help="Git repository URL")
     add_parser.add_argument("--branch", help="Git branch (only with --git)")
+    add_parser.add_argument("--commit", help="Git commit (only with --git)")
 
 def _add_generate_command(parser : argparse.ArgumentParser):
     from cmake.cmakelists_generator import CMakeListsGenerator
+    from ninja_build.ninja_generator import NinjaGenerator
     GeneratorRegistry.register(CMakeListsGenerator())
+    GeneratorRegistry.register(NinjaGenerator())
     
     generate_parser = parser.add_parser("generate", description="generate files used to build the project")
     generate_parser.add_argument("-p", "--project", help="name of the project to generate", dest="project_name", required=False, type=valid_project_name)
@@ -106,7 +136,7 @@ def _add_generate_command(parser : argparse.ArgumentParser):
             generator_help_str += "\n"
         generator_help_str += f"'{generator.name}' {generator.description}"
     generator_subparser = generate_parser.add_subparsers(title="choose one of the following generator",
-                                                            dest="generator_name",
+                                                            dest="generator",
                                                             help=generator_help_str)
     
     # Use "CMake" as default generator
@@ -119,7 +149,9 @@ def _add_generate_command(parser : argparse.ArgumentParser):
 
 def _add_build_command(parser : argparse.ArgumentParser):
     from cmake.cmake_builder import CMakeBuilder
+    from ninja_build.ninja_builder import NinjaBuilder
     BuilderRegistry.register(CMakeBuilder())
+    BuilderRegistry.register(NinjaBuilder())
     
     build_parser = parser.add_parser("build", description="build files used to build the project")
     build_parser.add_argument("-p", "--project", help="name of the project to build", dest="project_name", required=False, type=valid_project_name)
@@ -151,7 +183,9 @@ def _add_build_command(parser : argparse.ArgumentParser):
 
 def _add_run_command(parser : argparse.ArgumentParser):
     from cmake.cmake_runner import CMakeRunner
+    from ninja_build.ninja_runner import NinjaRunner
     RunnerRegistry.register(CMakeRunner())
+    RunnerRegistry.register(NinjaRunner())
 
     run_parser = parser.add_parser("run", description="run the project")
     run_parser.add_argument("-p", "--project", help="name of the project to run", dest="project_name", required=False, type=valid_project_name)
@@ -206,12 +240,17 @@ def _add_clean_command(parser : argparse.ArgumentParser):
         cleaner_parser = cleaner_subparser.add_parser(cleaner.name, description=cleaner.description)
         cleaner.add_cli_argument_to_parser(parser=cleaner_parser)
 
-class UserParams:
-    def from_args():
-        import argparse
-        import sys
-        from pathlib import Path
+def _add_daemon_command(parser : argparse.ArgumentParser):
+    daemon_parser = parser.add_parser("daemon", description="keep projects and toolchains in memory and serve 'list', 'generate', 'build' and 'run' commands.\n" +
+                                                              "commands are sent to the daemon when the environment variable KISS_DAEMON_SOCKET is set")
+    daemon_parser.add_argument("--socket", help="path of the unix socket (default: KISS_DAEMON_SOCKET or 'daemon.sock' in the kiss cache directory)", type=Path)
+    daemon_parser.add_argument("--poll", help="poll files instead of using inotify to detect changes", action='store_const', const=True, default=False)
+    daemon_parser.add_argument("--stop", help="stop the running daemon", action='store_const', const=True, default=False)
 
+class UserParams:
+    # Create the parser of all commands
+    # Builders, generators, runners and cleaners are registered when the parser is created, it must be created once
+    def create_parser() -> KissParser:
         parser = KissParser(description=f"{sys.argv[0]} is used to create, run C/C++ project", formatter_class=argparse.RawTextHelpFormatter)
 
         # We can specify a current directory
@@ -219,10 +258,44 @@ class UserParams:
             "-d", "--dir",
             dest="directory",
             type=lambda p: Path(p).expanduser().resolve(),
-            default=Path.cwd(),
+            default=None,
             help="Dossier contenant les modules (par défaut current directory)"
         )
 
+        # Always parse 'kiss.yaml' files instead of reusing the parsed manifests cache
+        parser.add_argument(
+            "--no-manifest-cache",
+            dest="no_manifest_cache",
+            action="store_true",
+            help="do not use the cache of parsed kiss.yaml files"
+        )
+
+        # Never fetch git repositories, use the git cache
+        parser.add_argument(
+            "--offline",
+            dest="offline",
+            action="store_true",
+            help="do not fetch git dependencies, use the repositories already in the cache"
+        )
+
+        # How generated files are checked, and the hash algorithm of fingerprints
+        parser.add_argument(
+            "--fingerprint",
+            dest="fingerprint_mode",
+            type=FingerprintMode,
+            choices=list(FingerprintMode),
+            default=FingerprintMode.stat_hash,
+            help="how files are checked to be up-to-date: 'trust-stat' compare size and modification time,\n" +
+                 "'stat+hash' also compare the hash when they changed (default), 'always-hash' always compare the hash"
+        )
+        parser.add_argument(
+            "--fingerprint-hash",
+            dest="fingerprint_hash",
+            choices=list(HASH_ALGORITHMS),
+            default=DEFAULT_HASH_ALGORITHM,
+            help=f"hash algorithm of fingerprints (default {DEFAULT_HASH_ALGORITHM})"
+        )
+
         # Show the version of kiss
         parser.add_argument(
             "-v", "--version",
@@ -235,24 +308,43 @@ class UserParams:
         subparsers = parser.add_subparsers(title="choose one of the following options",
                                            dest="option",
                                            help="'list' list projects in directory\n" +
+                                                "'index' update the index of projects in directories\n" +
                                                 "'new' create a new project\n" +
                                                 "'add' add a dependency to an existing project\n" +
+                                                "'lock' lock the resolved dependencies\n" +
+                                                "'affected' list projects affected by changed files\n" +
+                                                "'check' check projects\n" +
                                                 "'run' build and run the project\n" +
                                                 "'build' build the project\n" +
+                                                "'daemon' serve commands from a resident process\n" +
                                                 "'test' run tests of the project" )
         
         _add_list_command(subparsers)
+        _add_index_command(subparsers)
         _add_new_command(subparsers)
         _add_add_command(subparsers)    
+        _add_lock_command(subparsers)
+        _add_affected_command(subparsers)
+        _add_check_command(subparsers)
         _add_generate_command(subparsers)
         _add_build_command(subparsers)
         _add_run_command(subparsers)
         _add_clean_command(subparsers)
-
-        args = parser.parse_args()
+        _add_daemon_command(subparsers)
+        return parser
+
+    # Parse argv (the command line arguments if None) with the parser (created if None)
+    def from_args(argv: list[str] | None = None, parser: KissParser | None = None):
+        parser = parser or UserParams.create_parser()
+        args = parser.parse_args(argv)
+        # The default directory is the current directory when arguments are parsed
+        if args.directory is None:
+            args.directory = Path.cwd()
         if args.option == "add":
             if args.path and args.branch:
                 parser.error("--branch cannot be used with --path")
+            if args.path and args.commit:
+                parser.error("--commit cannot be used with --path")
             # If we are in add command and no subcommand is given, set `path` as default
             if args.path is None and args.git is None:
                 args.path = Path(f"{args.dependency_name}")
@@ -0,0 +1,185 @@
+
+############################################################
+# BuildFingerprint records what the last successful 'cmake --build' of a project used, for a toolchain and a profile:
+# - The 'kiss.yaml' file, the sources and the generated 'CMakeLists.txt' of the project and of its dependencies
+# - The files of their interface directories
+# - The files read by the compiler, like private headers, from the dependency files written by the compiler
+#   (the '.d' files next to the objects with Makefiles, the deps log with Ninja)
+#   Visual Studio doesn't keep them, the files of the directories that hold a source are recorded instead
+# - The directories walked to find them, a directory changes when a file is added or removed
+# - The artifacts in their output directories
+# - The arguments of the CMake configure
+# - The digest of the toolchain configuration and of the compiler binaries
+# When all of them are fresh, the build is up-to-date and CMake is not started.
+############################################################
+import os
+import re
+import subprocess
+from pathlib import Path
+from cmake.cmake_context import CMakeContext
+from cmake.cmake_generator_name import CMakeGeneratorName
+from cmake.fingerprint import Fingerprint
+from project import Project
+from project_sources import resolve_sources, split_source_pattern
+from toolchain import Toolchain
+from toolchain.toolchain_digest import ToolchainDigest
+
+# Dependencies of a make rule, spaces in file names are escaped with a backslash
+_DEPENDENCY_REGEX = re.compile(r"(?:\\ |\S)+")
+
+# Files of the rules of a dependency file written by the compiler ('-MD'), relative files are relative to the directory of the compilation
+def _parse_dependency_file(content: str) -> list[str]:
+    files = list[str]()
+    for line in content.replace("\\\n", " ").splitlines():
+        _, separator, dependencies = line.partition(": ")
+        if separator:
+            files.extend(dependency.replace("\\ ", " ") for dependency in _DEPENDENCY_REGEX.findall(dependencies))
+    return files
+
+class BuildFingerprint:
+    def __init__(self, build_directory: Path, profile_name: str):
+        self._fingerprint = Fingerprint(build_directory, scope=f"build_fingerprint_{profile_name}")
+        # Keys of files and directories recorded by this build
+        self._keys = set[str]()
+        # Resolved files added since the last update of the fingerprint, they are hashed together
+        self._pending_files = list[str]()
+        # Directories never walked, they are modified by the build
+        self._excluded_directories = set[Path]()
+
+    @property
+    def fingerprint(self) -> Fingerprint:
+        return self._fingerprint
+
+    def load(self):
+        self._fingerprint.load_or_create()
+
+    def is_fresh(self, configure_args: list[str], toolchain_digest: ToolchainDigest) -> bool:
+        return (self._fingerprint.is_fresh_value("configure_args", configure_args)
+                and self._fingerprint.is_fresh_value("toolchain_configuration", toolchain_digest.configuration)
+                and self._fingerprint.is_fresh_value("compiler", toolchain_digest.compiler)
+                and self._fingerprint.is_fresh())
+
+    # The compiler binaries changed since the last build, a build without a fingerprint is not known to have changed
+    def is_compiler_changed(self, toolchain_digest: ToolchainDigest) -> bool:
+        return (compiler := self._fingerprint.value("compiler")) is not None and compiler != toolchain_digest.compiler
+
+    # Forget the last build, the next one can't be up-to-date until this one succeeds
+    def invalidate(self):
+        self._fingerprint.clear_store()
+
+    # Add a resolved file
+    def _add_file(self, file: str):
+        if file not in self._keys:
+            self._keys.add(file)
+            self._pending_files.append(file)
+
+    def _update_files(self):
+        self._fingerprint.update_files(self._pending_files)
+        self._pending_files.clear()
+
+    def _add_directory(self, directory: Path):
+        self._fingerprint.update_directory(directory)
+        self._keys.add(str(directory.resolve()))
+
+    # Add the directory, its files if add_files is True, and all its sub directories
+    # Only the directory is resolved, files are named from it
+    def _walk(self, directory: Path, add_files: bool):
+        for root, directories, files in os.walk(directory.resolve()):
+            directories[:] = [d for d in directories if Path(root, d) not in self._excluded_directories]
+            self._add_directory(Path(root))
+            if add_files:
+                for file in files:
+                    self._add_file(os.path.join(root, file))
+
+    def _add_sources(self, project: Project):
+        sources = getattr(project, "sources", [])
+        for source in sources:
+            base, pattern, rest = split_source_pattern(source)
+            if pattern is None:
+                continue
+            # Only the base directory is listed by a pattern of file names, sub directories are listed by other patterns
+            if "**" in pattern or rest is not None:
+                self._walk(base, add_files=False)
+            elif base.is_dir():
+                self._add_directory(base)
+        for source in resolve_sources(sources, project.name) or []:
+            self._add_file(str(source))
+
+    # Record the inputs of the projects, before the build starts so that a file modified during the build is not fresh
+    def add_inputs(self, projects: list[Project], current_directory: Path, toolchain: Toolchain, cmake_generator_name: CMakeGeneratorName, profile_name: str):
+        self._excluded_directories.add(CMakeContext.resolveRootBuildDirectory(current_directory).resolve())
+        for project in projects:
+            self._add_file(str(project.file.resolve()))
+            self._add_file(str(CMakeContext.resolveCMakefile(current_directory=current_directory, toolchain=toolchain, project=project, cmake_generator_name=cmake_generator_name, profile_name=profile_name).resolve()))
+            self._add_sources(project)
+            # Without dependency files, headers next to the sources are found in their directories
+            if cmake_generator_name.is_visual_studio():
+                for directory in {source.parent for source in resolve_sources(getattr(project, "sources", []), project.name) or []}:
+                    for entry in os.scandir(directory):
+                        if entry.is_file():
+                            self._add_file(entry.path)
+            for interface_directory in getattr(project, "interface_directories", []):
+                if interface_directory.is_dir():
+                    self._walk(interface_directory, add_files=True)
+        self._update_files()
+
+    # Files read by the compiler for the objects of the build directory, relative files are resolved from the directory of the compilation
+    @staticmethod
+    def _compiler_dependencies(build_directory: Path, cmake_generator_name: CMakeGeneratorName) -> list[Path]:
+        build_directory = build_directory.resolve()
+        dependencies = list[Path]()
+        if cmake_generator_name.is_ninja() or cmake_generator_name.is_ninja_multi_config():
+            # Ninja reads the dependency files and keeps them in its deps log, files are relative to the build directory
+            if not (build_directory / ".ninja_deps").exists():
+                return dependencies
+            try:
+                result = subprocess.run(["ninja", "-t", "deps"], cwd=build_directory, capture_output=True, text=True)
+            except OSError:
+                return dependencies
+            if result.returncode == 0:
+                dependencies.extend(build_directory / line.strip() for line in result.stdout.splitlines() if line.startswith("    "))
+        elif cmake_generator_name.is_unix_makefiles():
+            # A '.d' file is written next to each object, make compiles in the directory that holds the 'CMakeFiles' directory
+            for dependency_file in build_directory.rglob("*.d"):
+                compile_directory = next((parent.parent for parent in dependency_file.parents if parent.name == "CMakeFiles"), build_directory)
+                try:
+                    content = dependency_file.read_text(encoding="utf-8", errors="replace")
+                except OSError:
+                    continue
+                dependencies.extend(compile_directory / file for file in _parse_dependency_file(content))
+        return dependencies
+
+    # Record the files read by the compiler, before the build from the last build, and after the build for new files
+    # A file already recorded keeps its state before the build, files of the build directory are outputs of the build
+    def add_compiler_dependencies(self, build_directory: Path, cmake_generator_name: CMakeGeneratorName):
+        excluded_directories = tuple(str(directory) + os.sep for directory in self._excluded_directories)
+        for file in {os.path.normpath(dependency) for dependency in self._compiler_dependencies(build_directory, cmake_generator_name)}:
+            if not file.startswith(excluded_directories) and os.path.isfile(file):
+                self._add_file(file)
+        self._update_files()
+
+    # Record other input files, like the superbuild CMakeLists.txt
+    def add_files(self, files: list[Path]):
+        for file in files:
+            self._add_file(str(file.resolve()))
+        self._update_files()
+
+    # Record the files in the output directory of the projects, after the build
+    def add_artifacts(self, projects: list[Project], current_directory: Path, toolchain: Toolchain, cmake_generator_name: CMakeGeneratorName, profile_name: str):
+        for project in projects:
+            context = CMakeContext(current_directory=current_directory, toolchain=toolchain, project=project, cmake_generator_name=cmake_generator_name, profile_name=profile_name)
+            output_directory = Path(context.output_directory_for_profile(profile_name))
+            if not output_directory.is_dir():
+                continue
+            for entry in os.scandir(output_directory.resolve()):
+                if entry.is_file():
+                    self._add_file(entry.path)
+        self._update_files()
+
+    # Save what this build recorded, entries of files no longer used are removed
+    def save(self, configure_args: list[str], toolchain_digest: ToolchainDigest):
+        self._fingerprint.retain(self._keys | {"configure_args", "toolchain_configuration", "compiler"})
+        self._fingerprint.update_value("configure_args", configure_args)
+        self._fingerprint.update_value("toolchain_configuration", toolchain_digest.configuration)
+        self._fingerprint.update_value("compiler", toolchain_digest.compiler)
+        self._fingerprint.save()
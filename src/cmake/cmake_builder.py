@@ -1,18 +1,22 @@
 import argparse
 from multiprocessing import context
 import os
+import shutil
 from pathlib import Path
 from typing import Optional, Self
 from build import KissBuildContext
 from builder import BaseBuilder
 from cli import KissParser
+from cmake.build_fingerprint import BuildFingerprint
 from cmake.cmake_context import CMakeContext
+from cmake.compiler_detection import CompilerDetectionCache
 from cmake.cmake_generator_name import CMakeGeneratorName
 from cmake.cmakelists_generator import CMakeListsGenerateContext, CMakeListsGenerator
 import console
 from generator import GeneratorRegistry
 from process import run_process
 from project import Project
+from project_graph import ProjectGraph
 from toolchain import Toolchain
 
 
@@ -22,13 +26,17 @@ class CMakeBuildContext(KissBuildContext):
                  project: Project, 
                  builder_name: str, 
                  toolchain: Toolchain, 
-                 cmake_generator_name:str,
-                 profile_name:str):
+                 cmake_generator_name: Optional[CMakeGeneratorName],
+                 profile_name:str,
+                 root_projects: Optional[list[Project]] = None,
+                 superbuild: bool = False):
         super().__init__(current_directory=current_directory, 
                          project=project, 
                          builder_name=builder_name, 
                          toolchain=toolchain,
-                         profile_name=profile_name)
+                         profile_name=profile_name,
+                         root_projects=root_projects)
+        self._superbuild = superbuild
         self._cmakelist_generate_context = CMakeListsGenerateContext.create(current_directory=current_directory,
                                                                             project_name=project.name,
                                                                             generator_name=builder_name,
@@ -43,6 +51,18 @@ class CMakeBuildContext(KissBuildContext):
     @property
     def cmake_generator_name(self) -> CMakeGeneratorName :
         return self.cmakelist_generate_context.cmake_generator_name
+
+    # Build all root projects and their dependencies in a single CMake tree
+    @property
+    def superbuild(self) -> bool:
+        return self._superbuild
+
+    @property
+    def superbuild_directory(self) -> Path:
+        return CMakeContext.resolveSuperbuildDirectory(current_directory=self.current_directory,
+                                                       toolchain=self.toolchain,
+                                                       cmake_generator_name=self.cmake_generator_name,
+                                                       profile_name=self.profile_name)
     
     def output_directory_for_profile(self, config: str) -> str: 
         return self.cmakelist_generate_context.output_directory_for_profile(config)
@@ -53,7 +73,7 @@ class CMakeBuildContext(KissBuildContext):
                project_name: str, 
                builder_name: str, 
                toolchain: Toolchain, 
-               cmake_generator_name:str,
+               cmake_generator_name: Optional[CMakeGeneratorName],
                profile_name:str) -> Optional[Self] :
         project_to_build = super().find_target_project(current_directory, project_name)
         if not project_to_build:
@@ -69,36 +89,29 @@ class CMakeBuildContext(KissBuildContext):
 
     @staticmethod
     def from_cli_args(kiss_build_context: KissBuildContext, cli_args: argparse.Namespace) -> Optional[Self] :
-        cmake_generator_name  = getattr(cli_args, "generator", None)
         return CMakeBuildContext(current_directory=kiss_build_context.current_directory,
                                  project=kiss_build_context.project,
                                  builder_name=kiss_build_context.builder_name,
                                  toolchain=kiss_build_context.toolchain,
-                                 cmake_generator_name=cmake_generator_name,
-                                 profile_name=kiss_build_context.profile_name)
+                                 cmake_generator_name=CMakeGeneratorName.from_cli_args(cli_args),
+                                 profile_name=kiss_build_context.profile_name,
+                                 root_projects=kiss_build_context.root_projects,
+                                 superbuild=getattr(cli_args, "superbuild", False))
 
     
 class CMakeBuilder(BaseBuilder):
     @classmethod
     def add_cli_argument_to_parser(cls, parser: KissParser):
-        generator_name_list = list[str]()
-        def generator_help_string() -> str:
-            lines = []
-            for target in Toolchain.available_target_list():
-                list_names = CMakeGeneratorName.available_generator_for_platform_target(target)
-                generator_name_list.extend(list_names)
-                lines.append(f" - {target.name} -> {{{', '.join(list_names)}}}")
-            return "\n".join(lines)
-        parser.formatter_class=argparse.RawTextHelpFormatter
-        parser.add_argument("-g", "--generator",
-                            type=str,
-                            choices=generator_name_list,
-                            help="Choose CMake generator based on platform:\n" + generator_help_string())
+        CMakeGeneratorName.add_cli_argument_to_parser(parser)
+        parser.add_argument("--superbuild",
+                            action="store_true",
+                            help="configure all projects of the directory and their dependencies in a single CMake tree\n"
+                                 "and build them with a single 'cmake --build --parallel'")
            
     def __init__(self):
         super().__init__("cmake", "Build cmake CMakeLists.txt")
 
-    def _get_visual_studio_configure_args(self, cmake_generator_name: str, context: CMakeContext) -> list[str] | None:
+    def _get_visual_studio_configure_args(self, cmake_generator_name: str, context: CMakeContext, source_directory: Path) -> list[str] | None:
         # Determine -T
         is_x64_host = context.toolchain.is_host_x86_64()
         if context.toolchain.compiler.is_clangcl_based():
@@ -118,9 +131,10 @@ class CMakeBuilder(BaseBuilder):
             return None
 
         # Complete x86_64-pc-windows-msvc cmake generation list
-        return ["--no-warn-unused-cli", "-S", str(context.cmakelists_directory), "-G", cmake_generator_name, "-T", host_arch, "-A", arch_target]
+        return ["--no-warn-unused-cli", "-S", str(source_directory), "-G", cmake_generator_name, "-T", host_arch, "-A", arch_target]
     
-    def _get_linux_gnu_configure_args(self, cmake_generator_name: str, context: CMakeContext) -> list[str]:
+    # Arguments that select the compiler and its architecture
+    def _get_linux_gnu_compiler_args(self, cmake_generator_name: str, context: CMakeContext) -> list[str]:
         # Get the arch flags
         if context.toolchain.target.is_x86_64():
             cmake_generator_c_arch = "-DCMAKE_C_FLAGS=-m64"
@@ -137,8 +151,47 @@ class CMakeBuilder(BaseBuilder):
         # Set compiler path
         cmake_generator_c_compiler = f"-DCMAKE_C_COMPILER={context.toolchain.compiler.c_path}"
         cmake_generator_cxx_compiler = f"-DCMAKE_CXX_COMPILER={context.toolchain.compiler.cxx_path}"
-        return ["--no-warn-unused-cli", "-S", str(context.cmakelists_directory), "-G", cmake_generator_name, cmake_generator_c_compiler, cmake_generator_cxx_compiler, cmake_generator_c_arch, cmake_generator_cxx_arch]
-        
+        return ["-G", cmake_generator_name, cmake_generator_c_compiler, cmake_generator_cxx_compiler, cmake_generator_c_arch, cmake_generator_cxx_arch]
+
+    def _get_linux_gnu_configure_args(self, cmake_generator_name: str, context: CMakeContext, source_directory: Path) -> list[str]:
+        return ["--no-warn-unused-cli", "-S", str(source_directory)] + self._get_linux_gnu_compiler_args(cmake_generator_name, context=context)
+
+    def _is_linux_gnu_generator(self, cmake_generator_name: CMakeGeneratorName) -> bool:
+        return cmake_generator_name.is_unix_makefiles() or cmake_generator_name.is_ninja() or cmake_generator_name.is_ninja_multi_config()
+
+    def _get_configure_args(self, cmake_generator_name: CMakeGeneratorName, context: CMakeContext, source_directory: Path) -> list[str] | None:
+        if cmake_generator_name.is_visual_studio():
+            return self._get_visual_studio_configure_args(cmake_generator_name.name, context=context, source_directory=source_directory)
+        elif self._is_linux_gnu_generator(cmake_generator_name):
+            return self._get_linux_gnu_configure_args(cmake_generator_name.name, context=context, source_directory=source_directory)
+        console.print_error(f"Unknown target {context.toolchain.target.name}")
+        return None
+
+    # Run the CMake configure, with GCC and Clang it loads the compiler detected once for the toolchain and the compiler binaries
+    # The compiler is only detected when CMake configures, the initial cache file is not part of the fingerprinted configure arguments
+    def _configure(self, cmake_generator_name: CMakeGeneratorName, context: CMakeContext, configure_args: list[str], build_directory: Path) -> bool:
+        console.print_step(f"🛠️  CMake configure...")
+        if self._is_linux_gnu_generator(cmake_generator_name):
+            detection_args = self._get_linux_gnu_compiler_args(cmake_generator_name.name, context=context)
+            if (initial_cache_file := CompilerDetectionCache.initial_cache_file(context.toolchain, detection_args)) is not None:
+                configure_args = ["-C", str(initial_cache_file)] + configure_args
+        return run_process("cmake", configure_args, build_directory) == 0
+
+    # Remove the CMake cache and the objects of the projects
+    def _remove_cmake_build_files(self, cmake_build_context: CMakeBuildContext, projects: list[Project]):
+        for project in projects:
+            build_directory = CMakeContext.resolveProjectBuildDirectory(current_directory=cmake_build_context.current_directory,
+                                                                        toolchain=cmake_build_context.toolchain,
+                                                                        project=project,
+                                                                        cmake_generator_name=cmake_build_context.cmake_generator_name,
+                                                                        profile_name=cmake_build_context.profile_name)
+            self._remove_cmake_cache(build_directory)
+
+    @staticmethod
+    def _remove_cmake_cache(build_directory: Path):
+        (build_directory / "CMakeCache.txt").unlink(missing_ok=True)
+        shutil.rmtree(build_directory / "CMakeFiles", ignore_errors=True)
+
     def build_project(self, cmake_build_context: CMakeBuildContext) -> bool:
         # Generate the project
         cmakelists_generator : CMakeListsGenerator = GeneratorRegistry.generators.get(cmake_build_context.builder_name)
@@ -147,31 +200,48 @@ class CMakeBuilder(BaseBuilder):
             return False
         
         generate_context = cmake_build_context.cmakelist_generate_context
-        generated_context_list = cmakelists_generator.generate_project(generate_context)
 
         # Configure the generated CMakelists.txt
         context = CMakeContext(current_directory=cmake_build_context.current_directory, 
                                toolchain=cmake_build_context.toolchain, 
                                project=cmake_build_context.project,
-                               cmake_generator_name=cmake_build_context.cmake_generator_name)
-        
-        if generate_context.cmake_generator_name.is_visual_studio():
-            if (configure_args := self._get_visual_studio_configure_args(generate_context.cmake_generator_name.name, context=context) ) is None:
-                return False
-        elif generate_context.cmake_generator_name.is_unix_makefiles():
-            if (configure_args := self._get_linux_gnu_configure_args(generate_context.cmake_generator_name.name,context=context)) is None:
-                return False
-        else:
-            console.print_error(f"Unknown target {context.toolchain.target.name}")
-            return False       
+                               cmake_generator_name=cmake_build_context.cmake_generator_name,
+                               profile_name=cmake_build_context.profile_name)
         
+        if (configure_args := self._get_configure_args(generate_context.cmake_generator_name, context=context, source_directory=context.cmakelists_directory)) is None:
+            return False
+
+        # Nothing changed since the last build, CMake is not started
+        toolchain_digest = generate_context.toolchain_digest
+        build_fingerprint = BuildFingerprint(context.build_directory, cmake_build_context.profile_name)
+        build_fingerprint.load()
+        if build_fingerprint.is_fresh(configure_args, toolchain_digest):
+            console.print_step("✔️  Build is up-to-date")
+            return True
+        compiler_changed = build_fingerprint.is_compiler_changed(toolchain_digest)
+        build_fingerprint.invalidate()
+
+        if (generated_context_list := cmakelists_generator.generate_project(generate_context)) is None:
+            return False
+
+        projects = cmake_build_context.project.topological_sort_projects()
+        # The compiler binary changed, CMake must detect it again and all objects must be compiled again
+        if compiler_changed:
+            console.print_step("♻️  Compiler changed, configure and build from scratch")
+            self._remove_cmake_build_files(cmake_build_context, projects)
+
+        # Record the inputs before the build, a file modified during the build makes the next build run
+        build_fingerprint.add_inputs(projects=projects,
+                                     current_directory=cmake_build_context.current_directory,
+                                     toolchain=cmake_build_context.toolchain,
+                                     cmake_generator_name=generate_context.cmake_generator_name,
+                                     profile_name=generate_context.profile_name)
+        build_fingerprint.add_compiler_dependencies(context.build_directory, generate_context.cmake_generator_name)
 
         os.makedirs(context.build_directory, exist_ok=True)
+        # Configure only when a generated file changed on disk or CMake never configured the build directory
         if generated_context_list or not context.cmakecache.exists():
-            context.toolchain.compiler.name
-            context.toolchain.target.name
-            console.print_step(f"🛠️  CMake configure...")
-            if not run_process("cmake", configure_args, context.build_directory) == 0:
+            if not self._configure(generate_context.cmake_generator_name, context, configure_args, context.build_directory):
                 return False
         else:            
             console.print_step(f"✔️  No CMake configure required") 
@@ -182,6 +252,14 @@ class CMakeBuilder(BaseBuilder):
         if not run_process("cmake", args, context.build_directory) == 0:
             return False
 
+        build_fingerprint.add_compiler_dependencies(context.build_directory, generate_context.cmake_generator_name)
+        build_fingerprint.add_artifacts(projects=projects,
+                                        current_directory=cmake_build_context.current_directory,
+                                        toolchain=cmake_build_context.toolchain,
+                                        cmake_generator_name=generate_context.cmake_generator_name,
+                                        profile_name=cmake_build_context.profile_name)
+        build_fingerprint.save(configure_args, toolchain_digest)
+
         # Install
         # console.print_step("🏗️  CMake install...")
         # args = ["--install", ".", "--config", cmake_config, "--prefix", context.install_directory]
@@ -190,9 +268,81 @@ class CMakeBuilder(BaseBuilder):
 
         return True
 
+    # Configure the root projects and their dependencies in a single CMake tree, each project is configured and compiled once
+    # and a single 'cmake --build --parallel' lets the build tool schedule the targets of all projects
+    def build_superbuild(self, cmake_build_context: CMakeBuildContext) -> bool:
+        cmakelists_generator : CMakeListsGenerator = GeneratorRegistry.generators.get(cmake_build_context.builder_name)
+        if not cmakelists_generator:
+            console.print_error(f"Generator {cmake_build_context.builder_name} not found")
+            return False
+
+        generate_context = cmake_build_context.cmakelist_generate_context
+        context = CMakeContext(current_directory=cmake_build_context.current_directory, 
+                               toolchain=cmake_build_context.toolchain, 
+                               project=cmake_build_context.project,
+                               cmake_generator_name=cmake_build_context.cmake_generator_name,
+                               profile_name=cmake_build_context.profile_name)
+        superbuild_directory = cmake_build_context.superbuild_directory
+        build_directory = superbuild_directory / "build"
+        if (configure_args := self._get_configure_args(generate_context.cmake_generator_name, context=context, source_directory=superbuild_directory)) is None:
+            return False
+
+        # Nothing changed since the last build, CMake is not started
+        toolchain_digest = generate_context.toolchain_digest
+        build_fingerprint = BuildFingerprint(build_directory, cmake_build_context.profile_name)
+        build_fingerprint.load()
+        if build_fingerprint.is_fresh(configure_args, toolchain_digest):
+            console.print_step("✔️  Build is up-to-date")
+            return True
+        compiler_changed = build_fingerprint.is_compiler_changed(toolchain_digest)
+        build_fingerprint.invalidate()
+
+        if (is_generated_changed := cmakelists_generator.generate_superbuild(generate_context, cmake_build_context.root_projects, superbuild_directory)) is None:
+            return False
+
+        # The compiler binary changed, CMake must detect it again and all objects must be compiled again
+        if compiler_changed:
+            console.print_step("♻️  Compiler changed, configure and build from scratch")
+            self._remove_cmake_cache(build_directory)
+
+        # Record the inputs before the build, a file modified during the build makes the next build run
+        projects = [project for level in ProjectGraph.levels(cmake_build_context.root_projects) for project in level]
+        build_fingerprint.add_inputs(projects=projects,
+                                     current_directory=cmake_build_context.current_directory,
+                                     toolchain=cmake_build_context.toolchain,
+                                     cmake_generator_name=generate_context.cmake_generator_name,
+                                     profile_name=generate_context.profile_name)
+        build_fingerprint.add_files([superbuild_directory / "CMakeLists.txt"])
+        build_fingerprint.add_compiler_dependencies(build_directory, generate_context.cmake_generator_name)
+
+        os.makedirs(build_directory, exist_ok=True)
+        # Configure only when a generated file changed on disk or CMake never configured the build directory
+        if is_generated_changed or not (build_directory / "CMakeCache.txt").exists():
+            if not self._configure(generate_context.cmake_generator_name, context, configure_args, build_directory):
+                return False
+        else:            
+            console.print_step(f"✔️  No CMake configure required") 
+
+        # Build all targets at once
+        console.print_step("🏗️  CMake build...")
+        args = ["--build", ".", "--config", cmake_build_context.profile_name, "--parallel"]
+        if not run_process("cmake", args, build_directory) == 0:
+            return False
+
+        build_fingerprint.add_compiler_dependencies(build_directory, generate_context.cmake_generator_name)
+        build_fingerprint.add_artifacts(projects=projects,
+                                        current_directory=cmake_build_context.current_directory,
+                                        toolchain=cmake_build_context.toolchain,
+                                        cmake_generator_name=generate_context.cmake_generator_name,
+                                        profile_name=cmake_build_context.profile_name)
+        build_fingerprint.save(configure_args, toolchain_digest)
+        return True
+
     def build(self, kiss_build_context: KissBuildContext, cli_args: argparse.Namespace) -> bool:
         if( cmake_build_context := CMakeBuildContext.from_cli_args(kiss_build_context, cli_args)) is None:
             return False
         
         console.print_step(f" - CMake Generator :  {cmake_build_context.cmake_generator_name.name}\n")
+        if cmake_build_context.superbuild:
+            return self.build_superbuild(cmake_build_context=cmake_build_context)
         return self.build_project(cmake_build_context=cmake_build_context)
\ No newline at end of file
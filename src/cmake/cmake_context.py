@@ -4,19 +4,22 @@ from project import Project
 from toolchain import Toolchain
 
 class CMakeContext:
-    def __init__(self, current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name:str):
+    def __init__(self, current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name: CMakeGeneratorName, profile_name: str):
         self._current_directory = current_directory
         self._cmake_generator_name = cmake_generator_name or CMakeGeneratorName.create(toolchain=toolchain)
         self._root_build_directory = self.resolveRootBuildDirectory(current_directory=current_directory)
         self._build_directory = self.resolveProjectBuildDirectory(current_directory=current_directory, 
                                                                   toolchain=toolchain, project=project, 
-                                                                  cmake_generator_name=self._cmake_generator_name)
+                                                                  cmake_generator_name=self._cmake_generator_name,
+                                                                  profile_name=profile_name)
         self._cmakelists_directory =  self.resolveCMakeListsDirectory(current_directory=current_directory, 
                                                                       toolchain=toolchain, 
                                                                       project=project, 
-                                                                      cmake_generator_name=self._cmake_generator_name)
+                                                                      cmake_generator_name=self._cmake_generator_name,
+                                                                      profile_name=profile_name)
         self._project = project
         self._toolchain = toolchain
+        self._profile_name = profile_name
         self._cmakefile = self._cmakelists_directory / "CMakeLists.txt"
         self._cmakecache = self._build_directory / "CMakeCache.txt"
         self._install_directory = self._root_build_directory / "install"
@@ -32,34 +35,48 @@ class CMakeContext:
         return CMakeContext.resolveRootBuildDirectory(current_directory=current_directory) / toolchain.target.name / toolchain.compiler.name / "cmake"
     
     @staticmethod
-    def resolveProjectBuildDirectory(current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name: CMakeGeneratorName) -> Path:
+    def resolveProjectBuildDirectory(current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name: CMakeGeneratorName, profile_name: str) -> Path:
         return CMakeContext.resolveCMakeListsDirectory(current_directory=current_directory, 
                                                        toolchain=toolchain, 
                                                        project=project,
-                                                       cmake_generator_name=cmake_generator_name) / "build"
+                                                       cmake_generator_name=cmake_generator_name,
+                                                       profile_name=profile_name) / "build"
     
+    # Single profile generators have a directory per profile, the profile is ignored by multi profile generators
     @staticmethod   
-    def resolveCMakeListsDirectory(current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name: CMakeGeneratorName) -> Path:
+    def resolveCMakeListsDirectory(current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name: CMakeGeneratorName, profile_name: str) -> Path:
         if cmake_generator_name.is_single_profile():
             return CMakeContext.resolveCMakeBuildDirectory(current_directory=current_directory, 
-                                                           toolchain=toolchain) / f"{project.name}_{project.filehash_short:08x}" / toolchain.profile.name
+                                                           toolchain=toolchain) / f"{project.name}_{project.filehash_short:08x}" / profile_name
         else:
            return CMakeContext.resolveCMakeBuildDirectory(current_directory=current_directory, 
                                                           toolchain=toolchain) / f"{project.name}_{project.filehash_short:08x}"
     
+    # Directory of the superbuild CMakeLists.txt that adds all projects of a build in a single CMake tree
+    @staticmethod
+    def resolveSuperbuildDirectory(current_directory: Path, toolchain: Toolchain, cmake_generator_name: CMakeGeneratorName, profile_name: str) -> Path:
+        if cmake_generator_name.is_single_profile():
+            return CMakeContext.resolveCMakeBuildDirectory(current_directory=current_directory, 
+                                                           toolchain=toolchain) / "superbuild" / profile_name
+        else:
+            return CMakeContext.resolveCMakeBuildDirectory(current_directory=current_directory, 
+                                                           toolchain=toolchain) / "superbuild"
+
     @staticmethod   
-    def resolveCMakefile(current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name: CMakeGeneratorName) -> Path:
+    def resolveCMakefile(current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name: CMakeGeneratorName, profile_name: str) -> Path:
         return CMakeContext.resolveCMakeListsDirectory(current_directory=current_directory, 
                                                        toolchain=toolchain, 
                                                        project=project, 
-                                                       cmake_generator_name=cmake_generator_name) / "CMakeLists.txt"
+                                                       cmake_generator_name=cmake_generator_name,
+                                                       profile_name=profile_name) / "CMakeLists.txt"
     
     @staticmethod
-    def resolveCMakeCacheDirectory(current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name: CMakeGeneratorName):
+    def resolveCMakeCacheDirectory(current_directory: Path, toolchain: Toolchain, project: Project, cmake_generator_name: CMakeGeneratorName, profile_name: str):
         return CMakeContext.resolveProjectBuildDirectory(current_directory=current_directory, 
                                                          toolchain=toolchain, 
                                                          project=project, 
-                                                         cmake_generator_name=cmake_generator_name) / "CMakeCache.txt"
+                                                         cmake_generator_name=cmake_generator_name,
+                                                         profile_name=profile_name) / "CMakeCache.txt"
     
     def output_directory_for_profile(self, profile: str) -> str: 
         if self.cmake_generator_name.is_single_profile():
@@ -107,5 +124,9 @@ class CMakeContext:
     @property
     def toolchain(self) -> Toolchain:
         return self._toolchain
+
+    @property
+    def profile_name(self) -> str:
+        return self._profile_name
     
     
\ No newline at end of file
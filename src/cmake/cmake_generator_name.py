@@ -1,4 +1,7 @@
 
+import argparse
+import functools
+import shutil
 from typing import Optional, Self
 import console
 from toolchain.target.target_registry import Target
@@ -82,6 +85,13 @@ class CMakeGeneratorName:
             console.print_error(f"Unsupported target platform: {target.platform}")
             return []
         
+    # ninja is looked for in the PATH once
+    @staticmethod
+    @functools.cache
+    def is_ninja_available() -> bool:
+        return shutil.which("ninja") is not None
+
+    # 'Ninja Multi-Config' is preferred for GNU toolsets, a single configure serves all profiles
     @staticmethod
     def create(toolchain: Toolchain) -> Optional[Self]:
         if isinstance(toolchain.toolset, VSToolset):
@@ -92,8 +102,36 @@ class CMakeGeneratorName:
                 year = int(toolchain.toolset.product_line_version)
             return CMakeGeneratorName(f"{toolchain.toolset.product_name} {toolchain.toolset.major_version} {year}")
         elif isinstance(toolchain.toolset, GNUToolset):
-           return CMakeGeneratorName("Unix Makefiles")
+            if CMakeGeneratorName.is_ninja_available():
+                return CMakeGeneratorName("Ninja Multi-Config")
+            return CMakeGeneratorName("Unix Makefiles")
         else:
             console.print_error(f"Unsupported toolset: {toolchain.toolset.__class__.__name__}")
             return None
         
+
+    # Add '-g' to choose the CMake generator, the name is in 'cmake_generator_name' of the arguments
+    @staticmethod
+    def add_cli_argument_to_parser(parser: argparse.ArgumentParser):
+        generator_name_list = list[str]()
+        def generator_help_string() -> str:
+            lines = []
+            for target in Toolchain.available_target_list():
+                list_names = CMakeGeneratorName.available_generator_for_platform_target(target)
+                generator_name_list.extend(list_names)
+                lines.append(f" - {target.name} -> {{{', '.join(list_names)}}}")
+            return "\n".join(lines)
+        parser.formatter_class=argparse.RawTextHelpFormatter
+        parser.add_argument("-g", "--generator",
+                            type=str,
+                            dest="cmake_generator_name",
+                            choices=generator_name_list,
+                            help="Choose CMake generator based on platform:\n" + generator_help_string() + "\n"
+                                 "GCC and Clang use 'Ninja Multi-Config' when ninja is found, 'Unix Makefiles' otherwise")
+
+    # Generator chosen with '-g', None to use the default generator of the toolchain
+    @staticmethod
+    def from_cli_args(cli_args: argparse.Namespace) -> Optional[Self]:
+        if (name := getattr(cli_args, "cmake_generator_name", None)) is None:
+            return None
+        return CMakeGeneratorName(name)
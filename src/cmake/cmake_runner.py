@@ -35,18 +35,21 @@ class CMakeRunner(BaseRunner):
                                                         project_name=run_context.project.name,
                                                         builder_name=run_context.runner_name,
                                                         toolchain=run_context.toolchain,
-                                                        cmake_generator_name=None)
-        cmake_builder.build_project(cmake_build_context)
+                                                        cmake_generator_name=None,
+                                                        profile_name=run_context.profile_name)
+        if cmake_build_context is None or not cmake_builder.build_project(cmake_build_context):
+            exit(1)
         
         context = CMakeContext(current_directory=run_context.current_directory, 
                             toolchain=run_context.toolchain, 
                             project=run_context.project,
-                            cmake_generator_name=None)
+                            cmake_generator_name=cmake_build_context.cmake_generator_name,
+                            profile_name=run_context.profile_name)
         
         if run_context.toolchain.target.is_windows_os():
-            binary_path = Path(cmake_build_context.output_directory_for_profile(run_context.toolchain.profile.name)) / f"{run_context.project.name}.exe"
+            binary_path = Path(cmake_build_context.output_directory_for_profile(run_context.profile_name)) / f"{run_context.project.name}.exe"
         else:
-            binary_path = Path(cmake_build_context.output_directory_for_profile(run_context.toolchain.profile.name)) / run_context.project.name
+            binary_path = Path(cmake_build_context.output_directory_for_profile(run_context.profile_name)) / run_context.project.name
         console.print_step(f"▶ Run {Path(*binary_path.parts[-2:])} ({context.toolchain.compiler.name})...")
 
         # Add DLL path to PATH on Windows
@@ -56,8 +59,9 @@ class CMakeRunner(BaseRunner):
            
             # Add ASAN path
             cmakelist_generate_context = cmake_build_context.cmakelist_generate_context 
-            if cmakelist_generate_context.toolchain.profile.is_feature_enabled(project_type_name=cmakelist_generate_context.project.type, 
-                                                                               feature_name="ASAN"):
+            profile = cmakelist_generate_context.toolchain.get_profile(run_context.profile_name)
+            if profile is not None and profile.is_feature_enabled(project_type_name=cmakelist_generate_context.project.type, 
+                                                                  feature_name="ASAN"):
                 if (dll_path := asan.get_msvc_asan_dynamic_dll_path(cmakelist_generate_context.toolchain)) is None:
                     exit(1)
                 asan_lib_path = str(Path(dll_path).parent)
@@ -70,8 +74,10 @@ class CMakeRunner(BaseRunner):
                     # Add the DLL path to PATH
                     proj_context = CMakeContext(current_directory=run_context.current_directory, 
                                                 toolchain=run_context.toolchain, 
-                                                project=project)
-                    dll_paths.append(proj_context.output_directory_for_profile(run_context.toolchain.profile.name))  
+                                                project=project,
+                                                cmake_generator_name=cmake_build_context.cmake_generator_name,
+                                                profile_name=run_context.profile_name)
+                    dll_paths.append(proj_context.output_directory_for_profile(run_context.profile_name))  
 
             new_path = ";".join(dll_paths + [existing_path])
             if dll_paths:  
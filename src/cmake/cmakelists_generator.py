@@ -1,6 +1,8 @@
 
 import argparse
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Self
 import asan
@@ -10,9 +12,13 @@ from cmake.cmake_generator_name import CMakeGeneratorName
 from cmake.fingerprint import Fingerprint
 import console
 from generate import KissGenerateContext
+from generated_file import write_if_changed
 from generator import BaseGenerator
 from project import  BinProject, LibProject, Project, ProjectType
+from project_graph import ProjectGraph
+from project_sources import resolve_sources
 from toolchain import Toolchain
+from toolchain.toolchain_digest import ToolchainDigest
 
 class CMakeListsGenerateContext(KissGenerateContext):
     def __init__(self, 
@@ -21,7 +27,7 @@ class CMakeListsGenerateContext(KissGenerateContext):
                  generator_name: str, 
                  profile_name:str,
                  toolchain: Toolchain, 
-                 cmake_generator_name:str):
+                 cmake_generator_name: Optional[CMakeGeneratorName]):
         super().__init__(current_directory=current_directory,
                          project=project,
                          generator_name=generator_name,
@@ -30,7 +36,11 @@ class CMakeListsGenerateContext(KissGenerateContext):
         self._cmake_context = CMakeContext(current_directory=current_directory, 
                                            toolchain=toolchain, 
                                            project=project,
-                                           cmake_generator_name=cmake_generator_name)
+                                           cmake_generator_name=cmake_generator_name,
+                                           profile_name=profile_name)
+        self._toolchain_digest: Optional[ToolchainDigest] = None
+        # True when the generation changed the content of the generated files
+        self.cmakefile_changed = False
     
     @property
     def cmakefile(self) -> Path:
@@ -65,10 +75,22 @@ class CMakeListsGenerateContext(KissGenerateContext):
         self._cmake_context = CMakeContext(current_directory=self._cmake_context.current_directory, 
                                            toolchain=self._cmake_context.toolchain, 
                                            project=value,
-                                           cmake_generator_name=self.cmake_generator_name)
+                                           cmake_generator_name=self.cmake_generator_name,
+                                           profile_name=self.profile_name)
 
     def output_directory_for_profile(self, config: str) -> str: 
         return self._cmake_context.output_directory_for_profile(config)
+
+    # Digest of the toolchain with the profiles written in generated files: all profiles for multi profile generators
+    @property
+    def toolchain_digest(self) -> ToolchainDigest:
+        if self._toolchain_digest is None:
+            if self.cmake_generator_name.is_multi_profile():
+                profile_names = [profile.name for profile in self.toolchain.compiler.profiles]
+            else:
+                profile_names = [self.profile_name]
+            self._toolchain_digest = ToolchainDigest.create(self.toolchain, profile_names)
+        return self._toolchain_digest
         
     @classmethod
     def create(cls, 
@@ -77,7 +99,7 @@ class CMakeListsGenerateContext(KissGenerateContext):
                generator_name: str, 
                toolchain: Toolchain, 
                profile_name: str,
-               cmake_generator_name:str) -> Self | None:
+               cmake_generator_name: Optional[CMakeGeneratorName]) -> Self | None:
         project_to_generate = super().find_target_project(current_directory, project_name)
         if not project_to_generate:
             return None
@@ -91,12 +113,11 @@ class CMakeListsGenerateContext(KissGenerateContext):
     
     @staticmethod
     def from_cli_args(kiss_generate_context: KissGenerateContext, cli_args: argparse.Namespace) -> Optional[Self] :
-        cmake_generator_name  = getattr(cli_args, "generator_name", None)
         return CMakeListsGenerateContext(current_directory=kiss_generate_context.current_directory,
                                          project=kiss_generate_context.project,
                                          generator_name=kiss_generate_context.generator_name,
                                          toolchain=kiss_generate_context.toolchain,
-                                         cmake_generator_name=cmake_generator_name,
+                                         cmake_generator_name=CMakeGeneratorName.from_cli_args(cli_args),
                                          profile_name=kiss_generate_context.profile_name)
     
 
@@ -105,72 +126,14 @@ class CMakeListsGenerateContext(KissGenerateContext):
 class CMakeListsGenerator(BaseGenerator):
     @classmethod
     def add_cli_argument_to_parser(cls, parser: KissParser):
-        pass
+        CMakeGeneratorName.add_cli_argument_to_parser(parser)
+        parser.add_argument("--superbuild",
+                            action="store_true",
+                            help="generate all projects of the directory and the superbuild CMakeLists.txt that adds them in a single CMake tree")
     
     def __init__(self):
         super().__init__("cmake", "Generate cmake CMakeLists.txt")
 
-    @staticmethod
-    def _split_path_with_pattern(path: Path):
-        parts = path.parts
-
-        # Chercher le premier composant qui contient '*' ou '?'
-        base = Path() 
-        pattern = None
-        rest = None
-        for i, part in enumerate(parts):
-            if '*' in part or '?' in part:
-                pattern = str(part)
-                rest = Path(*parts[i+1:]) if i + 1 < len(parts) else None
-                break
-            else:
-                base = base / part
-
-        
-        # Si aucun wildcard
-        return base, pattern, rest
-    
-    @staticmethod
-    def _resolve_glob_source_path(base, pattern, rest):
-        all_files = set()
-
-        if "**" in pattern:
-            pattern = pattern.replace("**", "**/*")
-            
-        # glob the pattern from base
-        for f in  base.glob(pattern):
-            # It's a file, add it
-            if f.is_file():
-                all_files.add(f'"{f.resolve().as_posix()}"')
-            # It's a directory and we have rest
-            # Add the rest avec the current directory and reapply the glob
-            elif f.is_dir() and rest:
-                src = f / rest
-                base_d, pattern_d, rest_d = CMakeListsGenerator._split_path_with_pattern(src)
-                all_files.update(CMakeListsGenerator._resolve_glob_source_path(base_d, pattern_d, rest_d))
-        return all_files
-    
-    @staticmethod
-    def _resolve_sources(src_list: list[Path], project_name: str) -> Optional[list[str]]: 
-        all_files = set()
-        for src in src_list:
-            base, pattern, rest = CMakeListsGenerator._split_path_with_pattern(src)
-
-            # We have a pattern like "**", "*" or "?"
-            if pattern:
-                all_files.update(CMakeListsGenerator._resolve_glob_source_path(base, pattern, rest))
-           
-            #  There is not pattern and it's a file, just add it
-            else:
-                if not src.exists():
-                    console.print_error(f"Error when generating CMake file for {project_name}: file {src} not found")
-                    return None
-                if base.is_file(): 
-                    all_files.add(f'"{base.resolve().as_posix()}"')
-
-        return list(all_files)
-    
-    
     def _generateConfigProject(self, cmakelist_generate_context: CMakeListsGenerateContext) -> bool:
         match cmakelist_generate_context.project.type:
             case ProjectType.bin:
@@ -185,8 +148,8 @@ class CMakeListsGenerator(BaseGenerator):
         toolchain: Toolchain = cmakelist_generate_context.toolchain
 
         os.makedirs(cmakelist_generate_context.cmakelists_directory, exist_ok=True)
-        # Write the CMakeLists.txt file
-        with open(cmakelist_generate_context.cmakefile, "w", encoding="utf-8") as f:
+        # Render the CMakeLists.txt file in memory, it is written only when its content changed
+        with io.StringIO() as f:
              # Write CMake common
             f.write("cmake_minimum_required(VERSION 3.18)\n")
             
@@ -198,11 +161,11 @@ class CMakeListsGenerator(BaseGenerator):
 
             # Write project sources
             if project.sources:
-                if (normalized_src_list := self._resolve_sources(project.sources, project.name)) is None:
+                if (normalized_src_list := resolve_sources(project.sources, project.name)) is None:
                     return False
                 src_str:str =""
                 for src in normalized_src_list:
-                    src_str += f"\n\t{src}"
+                    src_str += f'\n\t"{src.as_posix()}"'
                 f.write(f"add_executable({project.name} {src_str})\n")
                 f.write("\n")
             
@@ -222,8 +185,8 @@ class CMakeListsGenerator(BaseGenerator):
                     cxx_linker_flags = profile.linker_flags_for_project_type(project.type)
                     f.write(f"set(CMAKE_EXE_LINKER_FLAGS_{upper_profile_name} \"{' '.join(cxx_linker_flags)}\" CACHE STRING \"\" FORCE)\n")                    
             else:
-                if( profile := toolchain.get_profile(cmakelist_generate_context.toolchain.profile.name)) is None:
-                    console.print_warning(f"Profile {cmakelist_generate_context.toolchain.profile.name} not found in {self.name}")
+                if( profile := toolchain.get_profile(cmakelist_generate_context.profile_name)) is None:
+                    console.print_warning(f"Profile {cmakelist_generate_context.profile_name} not found in {self.name}")
                     return False
                 cxx_compiler_flags = profile.compiler_flags_for_project_type(project.type)
                 f.write(f"target_compile_options({project.name} PRIVATE {' '.join(cxx_compiler_flags)})\n")
@@ -263,7 +226,7 @@ class CMakeListsGenerator(BaseGenerator):
             else:
                 f.write(f"set_target_properties({project.name} PROPERTIES OUTPUT_NAME {project.name})\n")
                 f.write(f"set_target_properties({project.name} PROPERTIES\n")
-                output_directory = cmakelist_generate_context.output_directory_for_profile(cmakelist_generate_context.toolchain.profile.name)
+                output_directory = cmakelist_generate_context.output_directory_for_profile(cmakelist_generate_context.profile_name)
                 f.write(f"  RUNTIME_OUTPUT_DIRECTORY   \"{output_directory}\"\n")
                 f.write(")\n")
             f.write("\n")
@@ -273,11 +236,13 @@ class CMakeListsGenerator(BaseGenerator):
                 dep_cmakelist_dir = CMakeContext.resolveCMakeListsDirectory(current_directory=cmakelist_generate_context.current_directory,
                                                                         toolchain=toolchain,
                                                                         project=dep_project,
-                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name)
+                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name,
+                                                                        profile_name=cmakelist_generate_context.profile_name)
                 dep_build_dir = CMakeContext.resolveProjectBuildDirectory(current_directory=cmakelist_generate_context.current_directory,
                                                                         toolchain=toolchain,
                                                                         project=dep_project, 
-                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name)
+                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name,
+                                                                        profile_name=cmakelist_generate_context.profile_name)
             
                 f.write(f"# Add {dep_project.name} dependency\n")
                 f.write(f"if(NOT TARGET {dep_project.name})\n")
@@ -290,6 +255,7 @@ class CMakeListsGenerator(BaseGenerator):
                     f.write(f"target_link_libraries({project.name} PRIVATE {dep_project.name})\n") 
                     f.write(f"target_include_directories({project.name} PRIVATE $<TARGET_PROPERTY:{dep_project.name},INTERFACE_INCLUDE_DIRECTORIES>)\n")
                     f.write("\n")
+            cmakelist_generate_context.cmakefile_changed = write_if_changed(cmakelist_generate_context.cmakefile, f.getvalue())
 
         return True
                 
@@ -298,8 +264,8 @@ class CMakeListsGenerator(BaseGenerator):
         toolchain: Toolchain = cmakelist_generate_context.toolchain
 
         os.makedirs(cmakelist_generate_context.cmakelists_directory, exist_ok=True)
-        # Write the CMakeLists.txt file
-        with open(cmakelist_generate_context.cmakefile, "w", encoding="utf-8") as f:
+        # Render the CMakeLists.txt file in memory, it is written only when its content changed
+        with io.StringIO() as f:
            # Write CMake common
             f.write("cmake_minimum_required(VERSION 3.18)\n")
 
@@ -310,11 +276,11 @@ class CMakeListsGenerator(BaseGenerator):
 
             # Write project sources
             if project.sources:
-                if (normalized_src_list := self._resolve_sources(project.sources, project.name)) is None:
+                if (normalized_src_list := resolve_sources(project.sources, project.name)) is None:
                     return False
                 src_str:str =""
                 for src in normalized_src_list:
-                    src_str += f"\n\t{src}"
+                    src_str += f'\n\t"{src.as_posix()}"'
                 f.write(f"add_library({project.name} STATIC {src_str})\n")
 
             # Create per profile configurations for multiprofile generators
@@ -331,8 +297,8 @@ class CMakeListsGenerator(BaseGenerator):
                     cxx_compiler_flags = profile.compiler_flags_for_project_type(project.type)
                     f.write(f"set(CMAKE_CXX_FLAGS_{upper_profile_name} \"{' '.join(cxx_compiler_flags)}\" CACHE STRING \"\" FORCE)\n")
             else:
-                if( profile := toolchain.get_profile(cmakelist_generate_context.toolchain.profile.name)) is None:
-                    console.print_error(f"Profile {cmakelist_generate_context.toolchain.profile.name} not found in {self.name}")
+                if( profile := toolchain.get_profile(cmakelist_generate_context.profile_name)) is None:
+                    console.print_error(f"Profile {cmakelist_generate_context.profile_name} not found in {self.name}")
                     return False
                 cxx_compiler_flags = profile.compiler_flags_for_project_type(project.type)
                 f.write(f"target_compile_options({project.name} PRIVATE {' '.join(cxx_compiler_flags)})\n")
@@ -358,7 +324,7 @@ class CMakeListsGenerator(BaseGenerator):
             else:
                 f.write(f"set_target_properties({project.name} PROPERTIES OUTPUT_NAME {project.name})\n")
                 f.write(f"set_target_properties({project.name} PROPERTIES\n")
-                output_directory = cmakelist_generate_context.output_directory_for_profile(cmakelist_generate_context.toolchain.profile.name)
+                output_directory = cmakelist_generate_context.output_directory_for_profile(cmakelist_generate_context.profile_name)
                 f.write(f"  ARCHIVE_OUTPUT_DIRECTORY   \"{output_directory}\"\n")
                 f.write(")\n")
             f.write("\n")
@@ -368,11 +334,13 @@ class CMakeListsGenerator(BaseGenerator):
                 dep_cmakelist_dir = CMakeContext.resolveCMakeListsDirectory(current_directory=cmakelist_generate_context.current_directory,
                                                                         toolchain=toolchain,
                                                                         project=dep_project,
-                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name)
+                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name,
+                                                                        profile_name=cmakelist_generate_context.profile_name)
                 dep_build_dir = CMakeContext.resolveProjectBuildDirectory(current_directory=cmakelist_generate_context.current_directory,
                                                                         toolchain=toolchain,
                                                                         project=dep_project,
-                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name)
+                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name,
+                                                                        profile_name=cmakelist_generate_context.profile_name)
                 f.write(f"# Add {dep_project.name} dependency\n")
                 f.write(f"if(NOT TARGET {dep_project.name})\n")
                 f.write(f"  add_subdirectory(\"{dep_cmakelist_dir.resolve().as_posix()}\" \"{dep_build_dir.resolve().as_posix()}\")\n")
@@ -421,11 +389,13 @@ class CMakeListsGenerator(BaseGenerator):
             f.write(f" \"${{CMAKE_CURRENT_BINARY_DIR}}/{project.name}ConfigVersion.cmake\"\n")
             f.write(f" DESTINATION {project.name}/cmake\n") 
             f.write(")\n")
+            cmakelist_generate_context.cmakefile_changed = write_if_changed(cmakelist_generate_context.cmakefile, f.getvalue())
         
-        with open(cmakelist_generate_context.cmakelists_directory / f"{project.name}Config.cmake.in", "w", encoding="utf-8") as f:
+        with io.StringIO() as f:
             f.write(f"@PACKAGE_INIT@\n")
             f.write(f"include(\"${{CMAKE_CURRENT_LIST_DIR}}/{project.name}Targets.cmake\")\n")
             f.write(")\n")
+            cmakelist_generate_context.cmakefile_changed |= write_if_changed(cmakelist_generate_context.cmakelists_directory / f"{project.name}Config.cmake.in", f.getvalue())
 
         return True
     
@@ -434,8 +404,8 @@ class CMakeListsGenerator(BaseGenerator):
         toolchain: Toolchain = cmakelist_generate_context.toolchain
 
         os.makedirs(cmakelist_generate_context.cmakelists_directory, exist_ok=True)
-        # Write the CMakeLists.txt file
-        with open(cmakelist_generate_context.cmakefile, "w", encoding="utf-8") as f:
+        # Render the CMakeLists.txt file in memory, it is written only when its content changed
+        with io.StringIO() as f:
            # Write CMake common
             f.write("cmake_minimum_required(VERSION 3.18)\n")
 
@@ -446,11 +416,11 @@ class CMakeListsGenerator(BaseGenerator):
 
             # Write project sources
             if project.sources:
-                if (normalized_src_list := self._resolve_sources(project.sources, project.name)) is None:
+                if (normalized_src_list := resolve_sources(project.sources, project.name)) is None:
                     return False
                 src_str:str =""
                 for src in normalized_src_list:
-                    src_str += f"\n\t{src}"
+                    src_str += f'\n\t"{src.as_posix()}"'
                 f.write(f"add_library({project.name} SHARED {src_str})\n")
 
             # Create per profile configurations for multiprofile generators
@@ -468,8 +438,8 @@ class CMakeListsGenerator(BaseGenerator):
                     cxx_compiler_flags = profile.compiler_flags_for_project_type(project.type)
                     f.write(f"set(CMAKE_CXX_FLAGS_{upper_profile_name} \"{' '.join(cxx_compiler_flags)}\" CACHE STRING \"\" FORCE)\n")
             else:
-                if( profile := toolchain.get_profile(cmakelist_generate_context.toolchain.profile.name)) is None:
-                    console.print_error(f"Profile {cmakelist_generate_context.toolchain.profile.name} not found in {self.name}")
+                if( profile := toolchain.get_profile(cmakelist_generate_context.profile_name)) is None:
+                    console.print_error(f"Profile {cmakelist_generate_context.profile_name} not found in {self.name}")
                     return False
                 cxx_compiler_flags = profile.compiler_flags_for_project_type(project.type)
                 f.write(f"target_compile_options({project.name} PRIVATE {' '.join(cxx_compiler_flags)})\n")
@@ -515,7 +485,7 @@ class CMakeListsGenerator(BaseGenerator):
             else:
                 f.write(f"set_target_properties({project.name} PROPERTIES OUTPUT_NAME {project.name})\n")
                 f.write(f"set_target_properties({project.name} PROPERTIES\n")
-                output_directory = cmakelist_generate_context.output_directory_for_profile(cmakelist_generate_context.toolchain.profile.name)
+                output_directory = cmakelist_generate_context.output_directory_for_profile(cmakelist_generate_context.profile_name)
                 f.write(f"  LIBRARY_OUTPUT_DIRECTORY   \"{output_directory}\"\n")
                 f.write(f"  RUNTIME_OUTPUT_DIRECTORY   \"{output_directory}\"\n")
                 f.write(")\n")
@@ -526,11 +496,13 @@ class CMakeListsGenerator(BaseGenerator):
                 dep_cmakelist_dir = CMakeContext.resolveCMakeListsDirectory(current_directory=cmakelist_generate_context.current_directory,
                                                                         toolchain=toolchain,
                                                                         project=dep_project,
-                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name)
+                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name,
+                                                                        profile_name=cmakelist_generate_context.profile_name)
                 dep_build_dir = CMakeContext.resolveProjectBuildDirectory(current_directory=cmakelist_generate_context.current_directory,
                                                                         toolchain=toolchain,
                                                                         project=dep_project,
-                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name)
+                                                                        cmake_generator_name=cmakelist_generate_context.cmake_generator_name,
+                                                                        profile_name=cmakelist_generate_context.profile_name)
                 f.write(f"# Add {dep_project.name} dependency\n")
                 f.write(f"if(NOT TARGET {dep_project.name})\n")
                 f.write(f"  add_subdirectory(\"{dep_cmakelist_dir.resolve().as_posix()}\" \"{dep_build_dir.resolve().as_posix()}\")\n")
@@ -579,14 +551,22 @@ class CMakeListsGenerator(BaseGenerator):
             f.write(f" \"${{CMAKE_CURRENT_BINARY_DIR}}/{project.name}ConfigVersion.cmake\"\n")
             f.write(f" DESTINATION {project.name}/cmake\n") 
             f.write(")\n")
+            cmakelist_generate_context.cmakefile_changed = write_if_changed(cmakelist_generate_context.cmakefile, f.getvalue())
         
-        with open(cmakelist_generate_context.cmakelists_directory / f"{project.name}Config.cmake.in", "w", encoding="utf-8") as f:
+        with io.StringIO() as f:
             f.write(f"@PACKAGE_INIT@\n")
             f.write(f"include(\"${{CMAKE_CURRENT_LIST_DIR}}/{project.name}Targets.cmake\")\n")
             f.write(")\n")
+            cmakelist_generate_context.cmakefile_changed |= write_if_changed(cmakelist_generate_context.cmakelists_directory / f"{project.name}Config.cmake.in", f.getvalue())
 
         return True
 
+    # Key of the toolchain configuration used to generate the CMakeLists.txt file in the fingerprint
+    @staticmethod
+    def _toolchain_key(cmakefile: Path) -> str:
+        return f"toolchain:{cmakefile.resolve()}"
+
+    # Return the projects whose generated files changed on disk, in the topological order
     def generate_project(self, cmakelist_generate_context: CMakeListsGenerateContext) -> Optional[list[Project]]:
         # Create the finger print and load it
         fingerprint = Fingerprint(cmakelist_generate_context.cmake_root_build_directory)
@@ -601,40 +581,97 @@ class CMakeListsGenerator(BaseGenerator):
         # if A, C, E are unfresh (order is the same as project_list_to_generate)
         # unfreshlist is A < C < E 
         unfreshlist : list[Project] = list()
-        unfreshflags: list[bool] = [False] * len(project_list_to_generate)
-        for i, project in enumerate(project_list_to_generate):
+        unfresh_ids = set[int]()
+        toolchain_configuration = cmakelist_generate_context.toolchain_digest.configuration
+        for project in project_list_to_generate:
             # If the project is not fresh anymore add it to refresh
-            if not (fingerprint.is_fresh_file(CMakeContext.resolveCMakefile(current_directory=cmakelist_generate_context.current_directory, 
-                                                                            toolchain=cmakelist_generate_context.toolchain, 
-                                                                            project=project, 
-                                                                            cmake_generator_name=cmakelist_generate_context.cmake_generator_name)) and fingerprint.is_fresh_file(project.file)):
-                unfreshflags[i] = True
-            else:
-                # If one of the dependency of this project is unfresh, we also mark it as unfresh
-                for deps_project in project.dependencies:
-                    for unfresh_project in unfreshlist:
-                        if unfresh_project is deps_project:
-                            unfreshflags[i] = True
-                            break
-            if unfreshflags[i] == True:
+            # If one of the dependency of this project is unfresh, we also mark it as unfresh
+            # If the flags or the toolchain file changed, we also mark it as unfresh
+            cmakefile = CMakeContext.resolveCMakefile(current_directory=cmakelist_generate_context.current_directory, 
+                                                      toolchain=cmakelist_generate_context.toolchain, 
+                                                      project=project, 
+                                                      cmake_generator_name=cmakelist_generate_context.cmake_generator_name,
+                                                      profile_name=cmakelist_generate_context.profile_name)
+            if (not (fingerprint.is_fresh_file(cmakefile) and fingerprint.is_fresh_file(project.file)
+                     and fingerprint.is_fresh_value(self._toolchain_key(cmakefile), toolchain_configuration))
+                or any(id(deps_project) in unfresh_ids for deps_project in project.dependencies)):
                 unfreshlist.append(project)
+                unfresh_ids.add(id(project))
 
-        # Generate all unfresh project in order
+        # Generate all unfresh project level by level, projects of a level don't depend on each other so they are generated concurrently
+        # An unfresh project may generate the same content, its files are then not written
+        changed_ids = set[int]()
         if unfreshlist:
             console.print_step("⚙️  Generate CMakeLists.txt...")
-            for project in unfreshlist:
-                console.print_tips(f"  📝 {project.name}")
-                cmakelist_generate_context.project = project
-                if not self._generateConfigProject(cmakelist_generate_context):
-                    return None
-                fingerprint.update_file(cmakelist_generate_context.cmakefile)
-                fingerprint.update_file(project.file)
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+                for level in cmakelist_generate_context.project.dependency_levels():
+                    project_contexts = list[CMakeListsGenerateContext]()
+                    for project in level:
+                        if id(project) in unfresh_ids:
+                            console.print_tips(f"  📝 {project.name}")
+                            project_contexts.append(CMakeListsGenerateContext(current_directory=cmakelist_generate_context.current_directory,
+                                                                              project=project,
+                                                                              generator_name=cmakelist_generate_context.generator_name,
+                                                                              profile_name=cmakelist_generate_context.profile_name,
+                                                                              toolchain=cmakelist_generate_context.toolchain,
+                                                                              cmake_generator_name=cmakelist_generate_context.cmake_generator_name))
+                    if not all(executor.map(self._generateConfigProject, project_contexts)):
+                        return None
+                    for project_context in project_contexts:
+                        if project_context.cmakefile_changed:
+                            changed_ids.add(id(project_context.project))
+                        fingerprint.update_file(project_context.cmakefile)
+                        fingerprint.update_file(project_context.project.file)
+                        fingerprint.update_value(self._toolchain_key(project_context.cmakefile), toolchain_configuration)
             fingerprint.save()
         else:
             console.print_step(f"✔️  All CMakeLists.txt are up-to-date")
-        return unfreshlist
+        return [project for project in unfreshlist if id(project) in changed_ids]
+
+    # Generate the CMakeLists.txt of the root projects and their dependencies,
+    # and the superbuild CMakeLists.txt that adds all of them in a single CMake tree, so each project is configured once
+    # Return True if a generated file changed on disk, None on error
+    def generate_superbuild(self, cmakelist_generate_context: CMakeListsGenerateContext, root_projects: list[Project], superbuild_directory: Path) -> Optional[bool]:
+        changed = False
+        for root_project in root_projects:
+            root_context = CMakeListsGenerateContext(current_directory=cmakelist_generate_context.current_directory,
+                                                     project=root_project,
+                                                     generator_name=cmakelist_generate_context.generator_name,
+                                                     profile_name=cmakelist_generate_context.profile_name,
+                                                     toolchain=cmakelist_generate_context.toolchain,
+                                                     cmake_generator_name=cmakelist_generate_context.cmake_generator_name)
+            if (changed_projects := self.generate_project(root_context)) is None:
+                return None
+            changed |= bool(changed_projects)
+
+        toolchain = cmakelist_generate_context.toolchain
+        with io.StringIO() as f:
+            f.write("cmake_minimum_required(VERSION 3.18)\n")
+            f.write("project(kiss_superbuild LANGUAGES CXX )\n")
+            f.write("\n")
+            if cmakelist_generate_context.cmake_generator_name.is_multi_profile():
+                f.write(f"set(CMAKE_CONFIGURATION_TYPES {';'.join(profile.name for profile in toolchain.compiler.profiles)} CACHE STRING \"\" FORCE)\n")
+                f.write("\n")
+            # Dependencies are added before the projects that use them, 'if(NOT TARGET)' of projects don't add them again
+            f.write("# Projects in dependency order\n")
+            for level in ProjectGraph.levels(root_projects):
+                for project in level:
+                    cmakelists_directory = CMakeContext.resolveCMakeListsDirectory(current_directory=cmakelist_generate_context.current_directory,
+                                                                                   toolchain=toolchain,
+                                                                                   project=project,
+                                                                                   cmake_generator_name=cmakelist_generate_context.cmake_generator_name,
+                                                                                   profile_name=cmakelist_generate_context.profile_name)
+                    f.write(f"add_subdirectory(\"{cmakelists_directory.resolve().as_posix()}\" \"{project.name}_{project.filehash_short:08x}\")\n")
+            changed |= write_if_changed(superbuild_directory / "CMakeLists.txt", f.getvalue())
+        return changed
 
     def generate(self, kiss_generate_context: KissGenerateContext, cli_args: argparse.Namespace)-> bool:
         if( cmakelist_generate_context := CMakeListsGenerateContext.from_cli_args(kiss_generate_context, cli_args)) is None:
             return False
+        if getattr(cli_args, "superbuild", False):
+            superbuild_directory = CMakeContext.resolveSuperbuildDirectory(current_directory=cmakelist_generate_context.current_directory,
+                                                                           toolchain=cmakelist_generate_context.toolchain,
+                                                                           cmake_generator_name=cmakelist_generate_context.cmake_generator_name,
+                                                                           profile_name=cmakelist_generate_context.profile_name)
+            return self.generate_superbuild(cmakelist_generate_context, kiss_generate_context.root_projects, superbuild_directory) is not None
         return self.generate_project(cmakelist_generate_context=cmakelist_generate_context) is not None
\ No newline at end of file
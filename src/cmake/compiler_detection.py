@@ -0,0 +1,104 @@
+############################################################
+# CompilerDetectionCache runs the compiler identification and ABI detection of CMake once per toolchain and compiler binaries.
+# What CMake learned is kept in an initial cache file ('cmake -C') in the kiss cache directory:
+# - The file is named from the digest of the compiler binaries, the CMake binary and the arguments that select the compiler
+# - It sets CMAKE_CXX_COMPILER_ID_RUN and CMAKE_CXX_COMPILER_FORCED with the detected values,
+#   so a new CMake tree configured with it neither identifies nor tests the compiler again
+# - A failed detection is kept in a '.failed' file with the same name, it is not tried again for the same binaries
+# Only CXX is detected, projects generated by kiss only enable CXX.
+############################################################
+import hashlib
+import json
+import re
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+from cache import cache_directory
+import console
+from generated_file import write_if_changed
+from process import run_process
+from toolchain import Toolchain
+from toolchain.toolchain_digest import ToolchainDigest
+
+COMPILER_DETECTION_DIRECTORY = Path("cmake_compiler_detection")
+
+# 'set(<variable> <value>)' lines of the CMake<LANG>Compiler.cmake file written by CMake
+_SET_REGEX = re.compile(r"^set\((CMAKE_\w+) (.*)\)$", re.MULTILINE)
+
+# Variables of the directory where CMake loaded the language, they are not cached
+_NOT_CACHED_VARIABLES = {"CMAKE_CXX_COMPILER_LOADED"}
+
+class CompilerDetectionCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> Path:
+        return cache_directory() / COMPILER_DETECTION_DIRECTORY
+
+    @staticmethod
+    def _key(toolchain: Toolchain, detection_args: list[str]) -> str:
+        data = {
+            "compiler": ToolchainDigest.create(toolchain, []).compiler,
+            "cmake": ToolchainDigest._binary_identity(Path("cmake"), ["--version"]),
+            "arguments": detection_args
+        }
+        return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+    # Content of the initial cache file from the CMakeCXXCompiler.cmake file of a configured tree, None if the compiler was not identified
+    @staticmethod
+    def _initial_cache(compiler_file_content: str) -> Optional[str]:
+        variables = dict[str, str]()
+        for name, value in _SET_REGEX.findall(compiler_file_content):
+            if name not in _NOT_CACHED_VARIABLES:
+                variables[name] = value if value.startswith('"') else f'"{value}"'
+        if variables.get("CMAKE_CXX_COMPILER_ID", '""') == '""':
+            return None
+        lines = ["# Generated by kiss from the compiler detection of CMake, don't edit"]
+        lines.extend(f'set({name} {value} CACHE INTERNAL "")' for name, value in variables.items())
+        lines.append('set(CMAKE_CXX_COMPILER_FORCED TRUE CACHE INTERNAL "")')
+        return "\n".join(lines) + "\n"
+
+    # Configure an empty CXX project and write what CMake detected in the initial cache file
+    def _detect(self, detection_args: list[str], initial_cache_file: Path) -> bool:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.TemporaryDirectory(prefix="detect_", dir=self.directory) as directory:
+            source_directory = Path(directory) / "source"
+            build_directory = Path(directory) / "build"
+            source_directory.mkdir()
+            build_directory.mkdir()
+            (source_directory / "CMakeLists.txt").write_text("cmake_minimum_required(VERSION 3.18)\n"
+                                                             "project(kiss_compiler_detection LANGUAGES CXX)\n", encoding="utf-8")
+            console.print_step("🔎 Detect the compiler with CMake...")
+            if run_process("cmake", ["--no-warn-unused-cli", "-S", str(source_directory)] + detection_args, build_directory) != 0:
+                return False
+            if not (compiler_files := list(build_directory.glob("CMakeFiles/*/CMakeCXXCompiler.cmake"))):
+                return False
+            if (content := self._initial_cache(compiler_files[0].read_text(encoding="utf-8"))) is None:
+                return False
+        write_if_changed(initial_cache_file, content)
+        return True
+
+    # Initial cache file with the compiler detected by CMake for the arguments, the compiler is detected if the file doesn't exist
+    # Return None if the compiler can't be detected, CMake then detects it in each tree
+    def initial_cache_file(self, toolchain: Toolchain, detection_args: list[str]) -> Optional[Path]:
+        key = self._key(toolchain, detection_args)
+        initial_cache_file = self.directory / f"{key}.cmake"
+        failed_file = self.directory / f"{key}.failed"
+        with self._lock:
+            if initial_cache_file.exists():
+                return initial_cache_file
+            if failed_file.exists():
+                return None
+            try:
+                if self._detect(detection_args, initial_cache_file):
+                    return initial_cache_file
+                write_if_changed(failed_file, " ".join(detection_args) + "\n")
+            except OSError as e:
+                console.print_warning(f"⚠️  Warning: Unable to save the compiler detection in {self.directory}: {e}")
+                return None
+        console.print_warning(f"⚠️  Warning: Compiler detection failed, CMake detects the compiler in each tree")
+        return None
+
+CompilerDetectionCache = CompilerDetectionCache()
@@ -1,83 +1,381 @@
 import hashlib
 import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
 from pathlib import Path
+from typing import Callable, Iterable, NamedTuple, Optional
 
 import console
+from cmake.fingerprint_store import FingerprintStore, FingerprintStoreError
 
-FINGERPRINT_FILE = Path("fingerprint.json")
+# Scope of the fingerprint of generated files in the store of the build directory
+FINGERPRINT_SCOPE = "fingerprint"
 
+# Algorithm of entries written before the algorithm was stored
+LEGACY_HASH_ALGORITHM = "sha256"
+
+# Hash algorithms by name, a hash algorithm create an object with 'update' and 'hexdigest' like hashlib does
+HASH_ALGORITHMS: dict[str, Callable] = {
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+}
+
+# xxhash is an optional dependency, its algorithms are available when it is installed
+try:
+    import xxhash
+    HASH_ALGORITHMS["xxh3_128"] = xxhash.xxh3_128
+    HASH_ALGORITHMS["xxh64"] = xxhash.xxh64
+except ImportError:
+    pass
+
+DEFAULT_HASH_ALGORITHM = "blake2b"
+
+# Files smaller than this are read at once, larger files are mapped in memory
+MMAP_THRESHOLD = 1024 * 1024
+
+# Number of files hashed by a thread at a time, fewer files than two batches are hashed by the calling thread
+_HASH_BATCH_SIZE = 32
+
+# Hash of the file, size is the size of the file if it is already known
+def _hash_file(file: str | Path, hash_algorithm: str, size: Optional[int] = None) -> str:
+    h = HASH_ALGORITHMS[hash_algorithm]()
+    with open(file, "rb") as f:
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            h.update(f.read())
+        else:
+            # hashlib releases the GIL while hashing the mapped file
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                h.update(mapped_file)
+    return h.hexdigest()
+
+def _hash_batch(batch: list[tuple[str | Path, Optional[int]]], hash_algorithm: str) -> list[tuple[str | Path, str]]:
+    hashes = list[tuple[str | Path, str]]()
+    for file, size in batch:
+        try:
+            hashes.append((file, _hash_file(file, hash_algorithm, size)))
+        except (OSError, ValueError):
+            pass
+    return hashes
+
+def _hash_files_with_size(files: list[tuple[str | Path, Optional[int]]], hash_algorithm: str, jobs: Optional[int]) -> dict:
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(files) < 2 * _HASH_BATCH_SIZE:
+        return dict(_hash_batch(files, hash_algorithm))
+    batches = [files[i:i + _HASH_BATCH_SIZE] for i in range(0, len(files), _HASH_BATCH_SIZE)]
+    hashes = {}
+    with ThreadPoolExecutor(max_workers=min(jobs, len(batches))) as executor:
+        for batch_hashes in executor.map(lambda batch: _hash_batch(batch, hash_algorithm), batches):
+            hashes.update(batch_hashes)
+    return hashes
+
+# Hash the files concurrently, files that can't be read are not in the result
+def hash_files(files: Iterable[str | Path], hash_algorithm: str = DEFAULT_HASH_ALGORITHM, jobs: Optional[int] = None) -> dict:
+    return _hash_files_with_size([(file, None) for file in files], hash_algorithm, jobs)
+
+# How the freshness of a file is checked:
+# - trust_stat: a file is fresh if its size and mtime did not change, files are never read
+# - stat_hash: a file is fresh if its size and mtime did not change, otherwise its hash is compared (a touched file is still fresh)
+# - always_hash: a file is fresh if its hash did not change, files are always read
+class FingerprintMode(str, Enum):
+    trust_stat = "trust-stat"
+    stat_hash = "stat+hash"
+    always_hash = "always-hash"
+
+    def __str__(self):
+        return self.value
+
+class FingerprintStats:
+    def __init__(self):
+        # Files found fresh with their size and mtime only
+        self.stat_hits = 0
+        # Files whose size or mtime changed
+        self.stat_misses = 0
+        # Files hashed, each one is a full read of the file
+        self.hash_computations = 0
+        self.hashed_bytes = 0
+
+# How each mode checks the freshness of a file:
+# - trust_stat_when_same: a file with the same size and mtime is fresh without being read
+# - hash_when_untrusted: the hash of a file whose stat is not trusted is compared with the stored hash
+# - store_hash: the hash is stored in the entry, it is reused while the stat doesn't change if the stat is trusted
+class _FreshnessFlags(NamedTuple):
+    trust_stat_when_same: bool
+    hash_when_untrusted: bool
+    store_hash: bool
+
+_FRESHNESS_FLAGS: dict[FingerprintMode, _FreshnessFlags] = {
+    FingerprintMode.trust_stat: _FreshnessFlags(trust_stat_when_same=True, hash_when_untrusted=False, store_hash=False),
+    FingerprintMode.stat_hash: _FreshnessFlags(trust_stat_when_same=True, hash_when_untrusted=True, store_hash=True),
+    FingerprintMode.always_hash: _FreshnessFlags(trust_stat_when_same=False, hash_when_untrusted=True, store_hash=True),
+}
+
+# Default mode and hash algorithm of fingerprints, set by the command line
+class FingerprintOptions:
+    def __init__(self):
+        self._mode = FingerprintMode.stat_hash
+        self._hash_algorithm = DEFAULT_HASH_ALGORITHM
+
+    @property
+    def mode(self) -> FingerprintMode:
+        return self._mode
+
+    @mode.setter
+    def mode(self, value: FingerprintMode):
+        self._mode = FingerprintMode(value)
+
+    @property
+    def hash_algorithm(self) -> str:
+        return self._hash_algorithm
+
+    @hash_algorithm.setter
+    def hash_algorithm(self, value: str):
+        if value not in HASH_ALGORITHMS:
+            raise ValueError(f"Unknown hash algorithm '{value}'")
+        self._hash_algorithm = value
+
+FingerprintOptions = FingerprintOptions()
+
+# Fingerprint of files, directories and values, stored in the FingerprintStore of the fingerprint directory
+# Entries are kept in memory, only entries updated or removed since they were loaded are written by save
 class Fingerprint:
-    def __init__(self, fingerprint_directory : Path):
+    def __init__(self, fingerprint_directory : Path, mode: Optional[FingerprintMode] = None, hash_algorithm: Optional[str] = None, scope: str = FINGERPRINT_SCOPE):
         self.fingerprint_directory_ = fingerprint_directory
-        self.fingerprint_file_ = fingerprint_directory / FINGERPRINT_FILE
-
-    def load_or_create(self) : 
-        # Create file if not exist
-        if self.fingerprint_file_.exists():
-            with self.fingerprint_file_.open("r", encoding="utf-8") as f:
-                try:
-                    self.json_ = json.load(f)
-                except json.JSONDecodeError as e:
-                    console.print_error(f"Error when loading {self.fingerprint_file_}. Ignore it.\n{e}")
-                    self.json_ = {}
-        else: 
-            self.fingerprint_directory_.mkdir(parents=True, exist_ok=True)
-            self.fingerprint_file_.write_text("{}", encoding="utf-8")
-            self.json_ = {}
+        self.scope_ = scope
+        self.store_ = FingerprintStore(fingerprint_directory)
+        self.mode_ = FingerprintMode(mode) if mode is not None else FingerprintOptions.mode
+        self.hash_algorithm_ = hash_algorithm if hash_algorithm is not None else FingerprintOptions.hash_algorithm
+        if self.hash_algorithm_ not in HASH_ALGORITHMS:
+            raise ValueError(f"Unknown hash algorithm '{self.hash_algorithm_}'")
+        self.freshness_flags_ = _FRESHNESS_FLAGS[self.mode_]
+        self.stats_ = FingerprintStats()
+        self.entries_: dict[str, dict] = {}
+        self.updated_keys_ = set[str]()
+        self.removed_keys_ = set[str]()
+
+    @property
+    def mode(self) -> FingerprintMode:
+        return self.mode_
+
+    @property
+    def hash_algorithm(self) -> str:
+        return self.hash_algorithm_
+
+    @property
+    def scope(self) -> str:
+        return self.scope_
+
+    @property
+    def store(self) -> FingerprintStore:
+        return self.store_
+
+    @property
+    def stats(self) -> FingerprintStats:
+        return self.stats_
+
+    # Json file of the scope written by previous versions of kiss
+    @property
+    def legacy_file(self) -> Path:
+        return self.fingerprint_directory_ / f"{self.scope_}.json"
+
+    # Move the entries of the legacy json file to the store
+    def _migrate_legacy_file(self):
+        try:
+            with self.legacy_file.open("r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, json.JSONDecodeError) as e:
+            console.print_warning(f"⚠️  Warning: Ignoring invalid fingerprint file {self.legacy_file}: {e}")
+            entries = {}
+        if isinstance(entries, dict):
+            for entry in entries.values():
+                if "hash" in entry:
+                    entry.setdefault("hash_algorithm", LEGACY_HASH_ALGORITHM)
+            self.store_.update(self.scope_, entries, set())
+        self.legacy_file.unlink(missing_ok=True)
+
+    def load_or_create(self) :
+        self.updated_keys_.clear()
+        self.removed_keys_.clear()
+        try:
+            self._migrate_legacy_file()
+            self.entries_ = self.store_.load(self.scope_)
+        except FingerprintStoreError as e:
+            console.print_error(f"Error when loading {self.store_.file}. Ignore it.\n{e}")
+            self.entries_ = {}
 
     def save(self):
-        with self.fingerprint_file_.open("w", encoding="utf-8") as f:
-            json.dump(self.json_, f, indent=2)
-    
+        try:
+            self.store_.update(self.scope_, {key: self.entries_[key] for key in self.updated_keys_ if key in self.entries_}, self.removed_keys_)
+        except FingerprintStoreError as e:
+            console.print_error(f"Error when saving {self.store_.file}.\n{e}")
+            return
+        self.updated_keys_.clear()
+        self.removed_keys_.clear()
+
+    # Remove the entries of the scope from the store, entries in memory are kept and written again by save
+    def clear_store(self):
+        try:
+            self.store_.clear(self.scope_)
+        except FingerprintStoreError as e:
+            console.print_error(f"Error when saving {self.store_.file}.\n{e}")
+            return
+        self.updated_keys_.update(self.entries_)
+        self.removed_keys_.clear()
+
+    def _set_entry(self, key: str, entry: dict):
+        self.entries_[key] = entry
+        self.updated_keys_.add(key)
+        self.removed_keys_.discard(key)
+
     @staticmethod
-    def compute_file_hash(file_to_hash : Path) -> str:
-        h = hashlib.new("sha256")
-        file_to_hash = file_to_hash.resolve()
-        if not file_to_hash.exists():
-            raise FileNotFoundError(file_to_hash)
-        with file_to_hash.open("rb") as f:
-            for chunk in iter(lambda: f.read(1024 * 1024), b""):
-                h.update(chunk)
-        digest = h.hexdigest()
-        return digest
+    def compute_file_hash(file_to_hash : Path, hash_algorithm: str = LEGACY_HASH_ALGORITHM) -> str:
+        return _hash_file(file_to_hash, hash_algorithm)
 
-    def is_fresh_file(self, filename: Path) -> bool:
-        filename = filename.resolve()
-        if not filename.exists():
+    def _hash(self, filename: str, size: int) -> str:
+        self.stats_.hash_computations += 1
+        self.stats_.hashed_bytes += size
+        return _hash_file(filename, self.hash_algorithm_, size)
+
+    # Hash of files by name, files are given with their size
+    def _hash_files(self, files: list[tuple[str, int]]) -> dict[str, str]:
+        if not files:
+            return {}
+        self.stats_.hash_computations += len(files)
+        self.stats_.hashed_bytes += sum(size for _, size in files)
+        return _hash_files_with_size(files, self.hash_algorithm_, None)
+
+    # Stored hash of the entry, None if it was computed with another algorithm
+    def _stored_hash(self, entry: dict) -> Optional[str]:
+        if entry.get("hash_algorithm", LEGACY_HASH_ALGORITHM) != self.hash_algorithm_:
+            return None
+        return entry.get("hash")
+
+    # Freshness of a file entry known with its stat only, or the stat of the file when its hash must be compared
+    def _check_stat(self, filename: str, entry: dict) -> bool | os.stat_result:
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return False
+
+        same_stat = entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns
+        if same_stat:
+            self.stats_.stat_hits += 1
+        else:
+            self.stats_.stat_misses += 1
+        if same_stat and self.freshness_flags_.trust_stat_when_same:
+            return True
+        if not self.freshness_flags_.hash_when_untrusted or self._stored_hash(entry) is None:
             return False
-        key = str(filename)
+        return stat
+
+    # Same content with another stat, the new stat is trusted next time
+    def _refresh_stat(self, filename: str, entry: dict, stat: os.stat_result):
+        if entry.get("size") != stat.st_size or entry.get("mtime_ns") != stat.st_mtime_ns:
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            self.updated_keys_.add(filename)
 
-        if key not in self.json_:
+    def is_fresh_file(self, filename: Path) -> bool:
+        key = str(filename.resolve())
+        if (entry := self.entries_.get(key)) is None:
             return False
+        if isinstance(stat := self._check_stat(key, entry), bool):
+            return stat
+        if self._hash(key, stat.st_size) != self._stored_hash(entry):
+            return False
+        self._refresh_stat(key, entry, stat)
+        return True
 
-        entry = self.json_[key]
+    def update_file(self, filename: Path):
+        self.update_files([filename.resolve()])
 
-        # récupération des métadonnées stockées
-        stored_size = entry.get("size")
-        stored_mtime = entry.get("mtime_ns")
+    # Update the entries of resolved files, files that must be hashed are hashed concurrently
+    def update_files(self, files: Iterable[str | Path]):
+        store_hash = self.freshness_flags_.store_hash
+        reuse_hash = store_hash and self.freshness_flags_.trust_stat_when_same
+        updates = list[tuple[str, os.stat_result, Optional[str]]]()
+        files_to_hash = list[tuple[str, int]]()
+        for file in files:
+            key = str(file)
+            stat = os.stat(key)
+            file_hash = None
+            # The hash is reused while the file keeps the same size and mtime
+            if reuse_hash and (entry := self.entries_.get(key)) is not None and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+                file_hash = self._stored_hash(entry)
+            if store_hash and file_hash is None:
+                files_to_hash.append((key, stat.st_size))
+            updates.append((key, stat, file_hash))
+        hashes = self._hash_files(files_to_hash)
+        for key, stat, file_hash in updates:
+            self._set_entry(key, {
+                    "file": key,
+                    "hash": file_hash if file_hash is not None else hashes.get(key),
+                    "hash_algorithm": self.hash_algorithm_,
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+            })
 
-        # récupération des métadonnées actuelles
-        stat = filename.stat()
-        current_size = stat.st_size
-        current_mtime = stat.st_mtime_ns
+    # A directory is fresh while its modification time doesn't change, i.e. no entry was added, removed or renamed
+    def update_directory(self, directory: Path):
+        directory = directory.resolve()
+        key = str(directory)
+        self._set_entry(key, {
+                "directory": key,
+                "mtime_ns": directory.stat().st_mtime_ns,
+        })
 
-        # Si size ou mtime diffèrent → fichier modifié
-        if stored_size != current_size or stored_mtime != current_mtime:
+    def _is_fresh_directory_entry(self, directory: str, entry: dict) -> bool:
+        try:
+            return os.stat(directory).st_mtime_ns == entry.get("mtime_ns")
+        except OSError:
             return False
 
-        # Sinon, vérification du hash (inutile dans la plupart des cas)
-        current_hash = self.compute_file_hash(filename)
-        stored_hash = entry.get("hash")
-        return stored_hash == current_hash
-    
-    def update_file(self, filename: Path):
-        filename = filename.resolve()
-        key = str(filename)
-        file_hash = self.compute_file_hash(filename)
-        stat = filename.stat()
-        self.json_[key] = {
-                "file": key,
-                "hash": file_hash,
-                "size": stat.st_size,
-                "mtime_ns": stat.st_mtime_ns,
-        }
\ No newline at end of file
+    # Values that are not files, like command line arguments, are compared as json
+    def is_fresh_value(self, key: str, value) -> bool:
+        entry = self.entries_.get(key)
+        return entry is not None and entry.get("value") == json.loads(json.dumps(value))
+
+    # Stored value of the key, None if there is no value
+    def value(self, key: str):
+        return (self.entries_.get(key) or {}).get("value")
+
+    def update_value(self, key: str, value):
+        self._set_entry(key, {"value": value})
+
+    # Keep only the entries of the keys, files are given by their resolved path
+    def retain(self, keys: set[str]):
+        removed_keys = [key for key in self.entries_ if key not in keys]
+        for key in removed_keys:
+            del self.entries_[key]
+            self.updated_keys_.discard(key)
+        self.removed_keys_.update(removed_keys)
+
+    # All files and directories recorded are fresh, values are not checked
+    # An empty fingerprint is never fresh
+    def is_fresh(self) -> bool:
+        if not self.entries_:
+            return False
+        # Files whose hash must be compared are hashed concurrently once all stats are checked
+        files_to_compare = list[tuple[str, dict, os.stat_result]]()
+        for key, entry in self.entries_.items():
+            if "value" in entry:
+                continue
+            if "directory" in entry:
+                if not self._is_fresh_directory_entry(key, entry):
+                    return False
+            elif isinstance(stat := self._check_stat(key, entry), bool):
+                if not stat:
+                    return False
+            else:
+                files_to_compare.append((key, entry, stat))
+        hashes = self._hash_files([(key, stat.st_size) for key, _, stat in files_to_compare])
+        if any(hashes.get(key) != self._stored_hash(entry) for key, entry, _ in files_to_compare):
+            return False
+        for key, entry, stat in files_to_compare:
+            self._refresh_stat(key, entry, stat)
+        return True
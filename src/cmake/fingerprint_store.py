@@ -0,0 +1,121 @@
+
+############################################################
+# FingerprintStore keeps the fingerprints of a build directory in a SQLite database in WAL mode:
+# - Writes are atomic, an interrupted kiss never leaves a partial store
+# - Concurrent kiss processes (a debug and a release build of the same tree) wait for each other instead of losing updates
+# - Only the entries that changed are written
+# Entries are grouped by scope, each Fingerprint of the directory has its own scope.
+############################################################
+import json
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+FINGERPRINT_DATABASE = Path("fingerprint.db")
+
+# Increase it when the layout of the database changes, the database is then recreated
+_FINGERPRINT_DATABASE_VERSION = 1
+
+# Kind of entries
+_FILE = 0
+_DIRECTORY = 1
+_VALUE = 2
+
+# Error when the database can't be read or written
+class FingerprintStoreError(Exception):
+    pass
+
+def _entry_to_row(scope: str, key: str, entry: dict) -> tuple:
+    if "value" in entry:
+        return (scope, key, _VALUE, None, None, None, None, json.dumps(entry["value"], separators=(",", ":")))
+    if "directory" in entry:
+        return (scope, key, _DIRECTORY, None, entry.get("mtime_ns"), None, None, None)
+    file_hash = entry.get("hash")
+    return (scope, key, _FILE, entry.get("size"), entry.get("mtime_ns"), bytes.fromhex(file_hash) if file_hash else None, entry.get("hash_algorithm"), None)
+
+def _row_to_entry(key: str, kind: int, size: Optional[int], mtime_ns: Optional[int], file_hash: Optional[bytes], hash_algorithm: Optional[str], value: Optional[str]) -> dict:
+    if kind == _VALUE:
+        return {"value": json.loads(value)}
+    if kind == _DIRECTORY:
+        return {"directory": key, "mtime_ns": mtime_ns}
+    return {"file": key, "hash": file_hash.hex() if file_hash is not None else None, "hash_algorithm": hash_algorithm, "size": size, "mtime_ns": mtime_ns}
+
+class FingerprintStore:
+    def __init__(self, directory: Path):
+        self._file = directory / FINGERPRINT_DATABASE
+        self._connection: Optional[sqlite3.Connection] = None
+
+    @property
+    def file(self) -> Path:
+        return self._file
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is not None:
+            return self._connection
+        try:
+            self._file.parent.mkdir(parents=True, exist_ok=True)
+            # Wait for other kiss processes that write the database instead of failing
+            connection = sqlite3.connect(self._file, timeout=60, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            if connection.execute("PRAGMA user_version").fetchone()[0] != _FINGERPRINT_DATABASE_VERSION:
+                connection.execute("BEGIN IMMEDIATE")
+                # Another process may have created the table while waiting for the lock
+                if connection.execute("PRAGMA user_version").fetchone()[0] == _FINGERPRINT_DATABASE_VERSION:
+                    connection.execute("COMMIT")
+                    self._connection = connection
+                    return connection
+                connection.execute("DROP TABLE IF EXISTS entries")
+                connection.execute("""CREATE TABLE entries (
+                                          scope TEXT NOT NULL,
+                                          key TEXT NOT NULL,
+                                          kind INTEGER NOT NULL,
+                                          size INTEGER,
+                                          mtime_ns INTEGER,
+                                          hash BLOB,
+                                          hash_algorithm TEXT,
+                                          value TEXT,
+                                          PRIMARY KEY (scope, key)
+                                      ) WITHOUT ROWID""")
+                connection.execute(f"PRAGMA user_version={_FINGERPRINT_DATABASE_VERSION}")
+                connection.execute("COMMIT")
+        except sqlite3.Error as e:
+            raise FingerprintStoreError(f"Unable to open {self._file}: {e}")
+        self._connection = connection
+        return connection
+
+    def load(self, scope: str) -> dict[str, dict]:
+        try:
+            rows = self._connect().execute("SELECT key, kind, size, mtime_ns, hash, hash_algorithm, value FROM entries WHERE scope = ?", (scope,))
+            return {row[0]: _row_to_entry(*row) for row in rows}
+        except sqlite3.Error as e:
+            raise FingerprintStoreError(f"Unable to read {self._file}: {e}")
+
+    # Write the updated entries and remove the removed keys of the scope in a single transaction
+    def update(self, scope: str, entries: dict[str, dict], removed_keys: set[str]):
+        if not entries and not removed_keys:
+            return
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany("DELETE FROM entries WHERE scope = ? AND key = ?", ((scope, key) for key in removed_keys))
+                connection.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (_entry_to_row(scope, key, entry) for key, entry in entries.items()))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            raise FingerprintStoreError(f"Unable to write {self._file}: {e}")
+
+    # Remove all entries of the scope
+    def clear(self, scope: str):
+        try:
+            self._connect().execute("DELETE FROM entries WHERE scope = ?", (scope,))
+        except sqlite3.Error as e:
+            raise FingerprintStoreError(f"Unable to write {self._file}: {e}")
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
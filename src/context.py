@@ -13,8 +13,20 @@ class KissBaseContext:
     def current_directory(self) -> Path:
         return self._current_directory
     
+    # All projects described in the directory, their dependencies are loaded
+    def find_target_projects(current_directory: Path) -> Optional[list[Project]]:
+        ProjectRegistry.load_and_register_all_project_in_directory(current_directory=current_directory, load_dependencies=True, recursive=False)
+        if len(projects_in_directory := ProjectRegistry.projects_in_directory(current_directory=current_directory)) == 0:
+            console.print_error(f"No project found in {str(current_directory)}")
+            return None
+        return list(projects_in_directory)
+
     def find_target_project(current_directory: Path, project_name: str, filter: ProjectType = None) -> Optional[Project]:
         #### Find the project to generate
+        # If user provide a project name only load this project and its dependencies, the workspace index tells where it is described
+        if project_name:
+            if (project := ProjectRegistry.load_and_register_project_closure(current_directory=current_directory, project_name=project_name)) is not None:
+                return project
         ProjectRegistry.load_and_register_all_project_in_directory(current_directory=current_directory, load_dependencies=True, recursive=False)
         projects_in_directory = ProjectRegistry.projects_in_directory(current_directory=current_directory)
         if len(projects_in_directory) == 0:
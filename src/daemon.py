@@ -0,0 +1,192 @@
+
+############################################################
+# KissDaemon keeps projects and toolchains in memory and serves commands sent by 'daemon_client'
+# Requests are served one at a time:
+# - The standard input/output/error of the client replace the ones of the daemon while the command runs
+# - The current directory and the environment of the client are used while the command runs
+# - Registered projects are forgotten when a 'kiss.yaml' file changed
+# - Toolchains are loaded again when a toolchain file changed
+############################################################
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+import traceback
+from pathlib import Path
+import cli
+import console
+import daemon_client
+from cache import cache_directory
+from file_watcher import create_watcher
+from projectregistry import ProjectRegistry
+from toolchain import Toolchain
+
+DAEMON_SOCKET_FILE = Path("daemon.sock")
+
+# Maximum size of a request
+_MAX_REQUEST_SIZE = 16 * 1024 * 1024
+
+class KissDaemon:
+    # toolchains of toolchain_directory must be loaded and parser must be the parser of the kiss command line
+    def __init__(self, socket_path: Path, toolchain_directory: Path, parser: cli.KissParser, poll: bool):
+        self._socket_path = socket_path
+        self._toolchain_directory = toolchain_directory.absolute()
+        self._toolchain_files = set[Path]()
+        self._watcher = create_watcher(poll)
+        self._parser = parser
+
+    @property
+    def socket_path(self) -> Path:
+        return self._socket_path
+
+    def _watch_toolchains(self):
+        self._toolchain_files = set(self._toolchain_directory.glob("**/*.yaml"))
+        self._watcher.watch(self._toolchain_files)
+
+    # Forget what changed since the last request
+    def _refresh(self):
+        if not (changed_files := self._watcher.changed_files()):
+            return
+        if changed_files & self._toolchain_files:
+            console.print_step(f"Toolchains changed, reload {self._toolchain_directory}")
+            Toolchain.reload_all_toolchains_in_directory(self._toolchain_directory)
+            self._watch_toolchains()
+        if changed_files - self._toolchain_files:
+            console.print_step("Projects changed, clear registered projects")
+            ProjectRegistry.clear()
+
+    # Receive a request and the file descriptors of the client, None if the client sent nothing
+    @staticmethod
+    def _receive_request(connection: socket.socket) -> tuple[dict, list[int]] | None:
+        data, fds, _, _ = socket.recv_fds(connection, 65536, 3)
+        if not data:
+            return None
+        while data and not data.endswith(b"\n") and len(data) < _MAX_REQUEST_SIZE:
+            if not (chunk := connection.recv(65536)):
+                break
+            data += chunk
+        if not isinstance(request := json.loads(data), dict):
+            raise ValueError("the request is not an object")
+        return request, fds
+
+    # Run the command of the request with the standard streams, the directory and the environment of the client
+    def _run(self, request: dict, fds: list[int]) -> int:
+        from kiss import run_command
+        saved_fds = [os.dup(fd) for fd in range(3)]
+        saved_directory = os.getcwd()
+        saved_environ = dict(os.environ)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            for target_fd, fd in enumerate(fds):
+                os.dup2(fd, target_fd)
+            # A request with missing keys or a deleted current directory fails alone, the daemon keeps serving
+            try:
+                argv = request["argv"]
+                os.chdir(request["cwd"])
+                os.environ.clear()
+                os.environ.update(request["env"])
+            except (OSError, KeyError, TypeError, ValueError) as e:
+                console.print_error(f"Invalid request: {e!r}")
+                return 1
+            try:
+                args = cli.UserParams.from_args(argv, parser=self._parser)
+                if args.option not in daemon_client.DAEMON_COMMANDS:
+                    console.print_error(f"Command {args.option} is not served by the daemon")
+                    return 1
+                exit_code = run_command(args)
+            except SystemExit as e:
+                exit_code = e.code
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+            if exit_code is None:
+                return 0
+            if isinstance(exit_code, int):
+                return exit_code
+            console.print_error(str(exit_code))
+            return 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.environ.clear()
+            os.environ.update(saved_environ)
+            os.chdir(saved_directory)
+            for target_fd, fd in enumerate(saved_fds):
+                os.dup2(fd, target_fd)
+                os.close(fd)
+            for fd in fds:
+                os.close(fd)
+
+    def _serve(self, server: socket.socket):
+        while True:
+            connection, _ = server.accept()
+            with connection:
+                try:
+                    if (received := self._receive_request(connection)) is None:
+                        continue
+                    request, fds = received
+                except (OSError, ValueError) as e:
+                    console.print_warning(f"⚠️  Warning: Invalid request: {e}")
+                    continue
+                if request.get("stop"):
+                    connection.sendall(json.dumps({"exit": 0}).encode() + b"\n")
+                    return
+                start = time.perf_counter()
+                self._refresh()
+                exit_code = self._run(request, fds)
+                # Watch manifests of projects registered by the command
+                self._watcher.watch(ProjectRegistry.paths())
+                console.print(f"kiss {' '.join(map(str, request.get('argv') or []))} -> {exit_code} ({(time.perf_counter() - start) * 1000:.1f} ms)")
+                try:
+                    connection.sendall(json.dumps({"exit": exit_code}).encode() + b"\n")
+                except OSError:
+                    pass
+
+    def run(self) -> bool:
+        if daemon_client.is_running(str(self._socket_path)):
+            console.print_error(f"A daemon is already listening on {self._socket_path}")
+            return False
+        self._watch_toolchains()
+        self._socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self._socket_path.unlink(missing_ok=True)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            # Only the user can send commands to the daemon
+            previous_umask = os.umask(0o177)
+            try:
+                server.bind(str(self._socket_path))
+            finally:
+                os.umask(previous_umask)
+            server.listen()
+            console.print_success(f"Kiss daemon listening on {self._socket_path}")
+            console.print_tips(f"Set {daemon_client.DAEMON_SOCKET_ENV}={self._socket_path} to send commands to the daemon")
+            sys.stdout.flush()
+            try:
+                self._serve(server)
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self._socket_path.unlink(missing_ok=True)
+                self._watcher.close()
+        console.print_success("Kiss daemon stopped")
+        return True
+
+def default_socket_path() -> Path:
+    if (socket_path := os.environ.get(daemon_client.DAEMON_SOCKET_ENV)):
+        return Path(socket_path)
+    return cache_directory() / DAEMON_SOCKET_FILE
+
+def cmd_daemon(cli_args: argparse.Namespace, toolchain_directory: Path, parser: cli.KissParser) -> bool:
+    if not hasattr(socket, "AF_UNIX"):
+        console.print_error("The daemon requires unix sockets")
+        return False
+    socket_path = cli_args.socket or default_socket_path()
+    if cli_args.stop:
+        if not daemon_client.stop(str(socket_path)):
+            console.print_error(f"No daemon is listening on {socket_path}")
+            return False
+        console.print_success(f"Kiss daemon on {socket_path} stopped")
+        return True
+    return KissDaemon(socket_path=socket_path, toolchain_directory=toolchain_directory, parser=parser, poll=cli_args.poll).run()
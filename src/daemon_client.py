@@ -0,0 +1,65 @@
+
+############################################################
+# Client of the kiss daemon
+# This module only use a few modules of the standard library to keep the startup of a forwarded command fast
+# The client sends the command line, the current directory, the environment and its
+# standard input/output/error file descriptors, the daemon runs the command on them
+# and answers with the exit code
+############################################################
+import json
+import os
+import socket
+
+# Commands that the daemon can serve
+DAEMON_COMMANDS = frozenset(["list", "generate", "build", "run"])
+
+# Environment variable with the path of the daemon socket, commands are forwarded only if it is set
+DAEMON_SOCKET_ENV = "KISS_DAEMON_SOCKET"
+
+# Global options followed by a value
+_OPTIONS_WITH_VALUE = frozenset(["-d", "--dir", "--fingerprint", "--fingerprint-hash"])
+
+# Find the command in the command line arguments
+def find_command(argv: list[str]) -> str | None:
+    arguments = iter(argv)
+    for argument in arguments:
+        if argument in _OPTIONS_WITH_VALUE:
+            next(arguments, None)
+        elif not argument.startswith("-"):
+            return argument
+    return None
+
+def _send_request(socket_path: str, request: dict, fds: list[int]) -> int | None:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(socket_path))
+            data = json.dumps(request).encode() + b"\n"
+            if fds:
+                socket.send_fds(client, [data], fds)
+            else:
+                client.sendall(data)
+            response = b""
+            while not response.endswith(b"\n"):
+                if not (data := client.recv(4096)):
+                    return None
+                response += data
+    except OSError:
+        return None
+    return json.loads(response).get("exit")
+
+# Check if a daemon is listening on the socket
+def is_running(socket_path: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+
+# Send the command to the daemon, returns its exit code or None if the daemon is not reachable
+def forward(socket_path: str, argv: list[str]) -> int | None:
+    return _send_request(socket_path, {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}, [0, 1, 2])
+
+# Ask the daemon to stop, returns False if the daemon is not reachable
+def stop(socket_path: str) -> bool:
+    return _send_request(socket_path, {"stop": True}, []) is not None
@@ -0,0 +1,121 @@
+
+############################################################
+# Watchers detect files that changed since the last call of 'changed_files'
+# - InotifyWatcher use inotify on Linux, events are read without blocking when changes are requested
+# - PollingWatcher compare the size and the mtime of files, it works everywhere
+############################################################
+import ctypes
+import ctypes.util
+import os
+import platform
+import struct
+from pathlib import Path
+from typing import Iterable, Optional, Self
+
+class PollingWatcher:
+    def __init__(self):
+        self._files: dict[Path, Optional[tuple[int, int]]] = {}
+
+    @staticmethod
+    def _stat(file: Path) -> Optional[tuple[int, int]]:
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def watch(self, files: Iterable[Path]):
+        for file in files:
+            if file not in self._files:
+                self._files[file] = self._stat(file)
+
+    def changed_files(self) -> set[Path]:
+        changed_files = set[Path]()
+        for file, stat in self._files.items():
+            if (new_stat := self._stat(file)) != stat:
+                self._files[file] = new_stat
+                changed_files.add(file)
+        return changed_files
+
+    def close(self):
+        pass
+
+# inotify constants from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Directories of watched files are watched, so files replaced by a rename (like most editors do) are detected
+class InotifyWatcher:
+    def __init__(self, libc: ctypes.CDLL, fd: int):
+        self._libc = libc
+        self._fd = fd
+        self._directories: dict[int, Path] = {}
+        self._watch_descriptors: dict[Path, int] = {}
+        self._files = set[Path]()
+
+    # Create an InotifyWatcher, None if inotify is not available
+    @classmethod
+    def create(cls) -> Optional[Self]:
+        if platform.system() != "Linux":
+            return None
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        return cls(libc, fd)
+
+    def watch(self, files: Iterable[Path]):
+        for file in files:
+            if file in self._files:
+                continue
+            directory = file.parent
+            if directory not in self._watch_descriptors:
+                watch_descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+                if watch_descriptor < 0:
+                    continue
+                self._watch_descriptors[directory] = watch_descriptor
+                self._directories[watch_descriptor] = directory
+            self._files.add(file)
+
+    def changed_files(self) -> set[Path]:
+        changed_files = set[Path]()
+        while True:
+            try:
+                buffer = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                watch_descriptor, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b"\0")
+                offset += length
+                # Events were lost, consider that every file changed
+                if mask & _IN_Q_OVERFLOW:
+                    changed_files |= self._files
+                elif (directory := self._directories.get(watch_descriptor)) is not None and name:
+                    if (file := directory / os.fsdecode(name)) in self._files:
+                        changed_files.add(file)
+        return changed_files
+
+    def close(self):
+        os.close(self._fd)
+
+# Create the best watcher available
+def create_watcher(poll: bool = False) -> InotifyWatcher | PollingWatcher:
+    if not poll and (watcher := InotifyWatcher.create()) is not None:
+        return watcher
+    return PollingWatcher()
@@ -13,17 +13,24 @@ class KissGenerateContext(KissBaseContext):
                  project: Project, 
                  generator_name: str, 
                  profile_name:str,
-                 toolchain: Toolchain):
+                 toolchain: Toolchain,
+                 root_projects: Optional[list[Project]] = None):
         super().__init__(current_directory)
         self._project = project
         self._generator_name = generator_name
         self._toolchain = toolchain
         self._profile_name = profile_name
+        self._root_projects = root_projects or [project]
 
     @property
     def project(self) -> Project:
         return self._project
 
+    # Projects to generate with their dependencies, only the project unless all projects of the directory are generated
+    @property
+    def root_projects(self) -> list[Project]:
+        return self._root_projects
+
     @property
     def generator_name(self) -> str:
         return self._generator_name
@@ -42,11 +49,22 @@ class KissGenerateContext(KissBaseContext):
                project_name: str, 
                generator_name: str,
                profile_name:str,
-               toolchain: Toolchain) -> Optional[Self] :
+               toolchain: Toolchain,
+               all_projects: bool = False) -> Optional[Self] :
+        generator_name = generator_name if generator_name is not None else "cmake"
+        # Without project name, generate all projects of the directory
+        if all_projects and not project_name:
+            if not (root_projects := super().find_target_projects(current_directory)):
+                return None
+            return KissGenerateContext(current_directory=current_directory,
+                                       project=root_projects[0],
+                                       generator_name=generator_name,
+                                       profile_name=profile_name,
+                                       toolchain=toolchain,
+                                       root_projects=root_projects)
         project_to_generate = super().find_target_project(current_directory, project_name)
         if not project_to_generate:
             return None
-        generator_name = generator_name if generator_name is not None else "cmake"
         return KissGenerateContext(current_directory=current_directory,
                                    project=project_to_generate,
                                    generator_name=generator_name,
@@ -68,9 +86,10 @@ class KissGenerateContext(KissBaseContext):
             
         return KissGenerateContext.create(current_directory=cli_args.directory,
                                           project_name=cli_args.project_name,
-                                          generator_name=cli_args.generator_name,
+                                          generator_name=cli_args.generator,
                                           toolchain=toolchain,
-                                          profile_name=cli_args.profile)
+                                          profile_name=cli_args.profile,
+                                          all_projects=getattr(cli_args, "superbuild", False))
        
 
 def cmd_generate(cli_args: argparse.Namespace) -> bool:
@@ -0,0 +1,28 @@
+
+############################################################
+# Generated files are rendered in memory and written only when their content changed:
+# - An unchanged file keeps its modification time, tools that watch it (CMake, build systems) don't run again
+# - The file is replaced atomically, an interrupted kiss never leaves a partially written file
+############################################################
+import os
+import threading
+from pathlib import Path
+
+# Write the content in the file if it differs from the content on disk
+# Return True if the file was written
+def write_if_changed(file: Path, content: str) -> bool:
+    data = content.encode("utf-8")
+    try:
+        if file.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    file.parent.mkdir(parents=True, exist_ok=True)
+    temporary_file = file.with_name(f".{file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        temporary_file.write_bytes(data)
+        os.replace(temporary_file, file)
+    except BaseException:
+        temporary_file.unlink(missing_ok=True)
+        raise
+    return True
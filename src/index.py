@@ -0,0 +1,49 @@
+import argparse
+from pathlib import Path
+from typing import Optional, Self
+import console
+from context import KissBaseContext
+from yaml_file import IndexedProjectDiscovery, YamlProjectFile
+
+
+class KissIndexContext(KissBaseContext):
+    def __init__(self, current_directory:Path, rebuild:bool, project_name:Optional[str], jobs:int):
+        super().__init__(current_directory)
+        self._rebuild = rebuild
+        self._project_name = project_name
+        self._jobs = jobs
+
+    @property
+    def rebuild(self) -> bool : 
+        return self._rebuild
+
+    @property
+    def project_name(self) -> Optional[str] : 
+        return self._project_name
+
+    @property
+    def jobs(self) -> int : 
+        return self._jobs
+    
+    @classmethod
+    def from_cli_args(cls, cli_args: argparse.Namespace) -> Self:
+        return cls(current_directory=cli_args.directory, rebuild=cli_args.rebuild, project_name=cli_args.project_name, jobs=cli_args.jobs)
+
+def cmd_index(cli_args: argparse.Namespace) -> bool:
+    index_context = KissIndexContext.from_cli_args(cli_args)
+    discovery = IndexedProjectDiscovery(rebuild=index_context.rebuild)
+    all_yaml_projects = YamlProjectFile.load_yaml_projects_in_directory(directory=index_context.current_directory, recursive=True, load_dependencies=False, discovery=discovery, jobs=index_context.jobs)
+    index = discovery.index(index_context.current_directory)
+
+    project_count = sum(len(yaml_projects) for yaml_projects in all_yaml_projects.values())
+    console.print_success(f"Indexed {project_count} projects in {len(all_yaml_projects)} files ({discovery.scanned_count} directories scanned)")
+    console.print(f"Index : {index.file}")
+
+    # Find files that describe the project
+    if index_context.project_name:
+        if not (files := index.find_project_files(index_context.project_name)):
+            console.print_error(f"Project {index_context.project_name} not found in {index_context.current_directory}")
+            return False
+        for file in files:
+            console.print(f"  - {file}")
+    return True
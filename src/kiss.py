@@ -1,53 +1,97 @@
-from pathlib import Path
-import platform
+import os
 import sys
-from add import cmd_add
-from clean import cmd_clean
-from list import cmd_list
-from new import cmd_new
-from generate import cmd_generate
-from build import cmd_build
-import cli
-from run import cmd_run
-from toolchain import Toolchain
+import daemon_client
+# Other modules are imported when the command is not forwarded to the daemon
 
-def main():
+# Directory of toolchains files of the platform
+def toolchain_directory():
+    from pathlib import Path
+    import platform
     if platform.system() == "Windows":
-        Toolchain.load_all_toolchains_in_directory(Path("toolchains/windows"))
-    else:
-        Toolchain.load_all_toolchains_in_directory(Path("toolchains/linux"))
-    
-    # if not toolchain:
-    #     exit
-    args = cli.UserParams.from_args()
+        return Path("toolchains/windows")
+    return Path("toolchains/linux")
 
-    if args.option == "list": 
+# Run the command described by args
+# parser is the parser that created args
+def run_command(args, parser=None) -> int | None:
+    from add import cmd_add
+    from clean import cmd_clean
+    from list import cmd_list
+    from new import cmd_new
+    from generate import cmd_generate
+    from index import cmd_index
+    from lock import cmd_lock
+    from affected import cmd_affected
+    from check import cmd_check
+    from build import cmd_build
+    from run import cmd_run
+    from yaml_file import GitMirrorCache, ManifestCache
+    from cmake.fingerprint import FingerprintOptions
+
+    ManifestCache.enabled = not args.no_manifest_cache
+    GitMirrorCache.offline = args.offline
+    FingerprintOptions.mode = args.fingerprint_mode
+    FingerprintOptions.hash_algorithm = args.fingerprint_hash
+
+    if args.option == "list":
         cmd_list(cli_args=args)
-    
+
+    elif args.option == "index":
+        return (0 if cmd_index(cli_args=args) == True else 1)
+
     elif args.option == "new":
         cmd_new(cli_args=args)
-    
-    elif args.option == "add": 
+
+    elif args.option == "add":
         return (0 if cmd_add(cli_args=args) == True else 1)
-        
-    elif args.option == "generate": 
+
+    elif args.option == "lock":
+        return (0 if cmd_lock(cli_args=args) == True else 1)
+
+    elif args.option == "affected":
+        return (0 if cmd_affected(cli_args=args) == True else 1)
+
+    elif args.option == "check":
+        return (0 if cmd_check(cli_args=args) == True else 1)
+
+    elif args.option == "generate":
         return (0 if cmd_generate(cli_args=args) == True else 1)
-    
-    elif args.option == "build": 
+
+    elif args.option == "build":
         return (0 if cmd_build(cli_args=args) == True else 1)
-    
-    elif args.option == "run": 
+
+    elif args.option == "run":
         cmd_run(cli_args=args)
 
-    elif args.option == "clean": 
+    elif args.option == "clean":
         cmd_clean(cli_args=args)
 
-    elif args.option == "test": 
+    elif args.option == "daemon":
+        from daemon import cmd_daemon
+        return (0 if cmd_daemon(cli_args=args, toolchain_directory=toolchain_directory(), parser=parser) == True else 1)
+
+    elif args.option == "test":
         pass
-    elif args.option == "install":    
-        pass 
-    elif args.option == "package": 
+    elif args.option == "install":
         pass
-            
+    elif args.option == "package":
+        pass
+
+def main():
+    # Forward the command to the daemon if one is running, modules are imported only if the command is run here
+    if (socket_path := os.environ.get(daemon_client.DAEMON_SOCKET_ENV)) and daemon_client.find_command(sys.argv[1:]) in daemon_client.DAEMON_COMMANDS:
+        if (exit_code := daemon_client.forward(socket_path, sys.argv[1:])) is not None:
+            return exit_code
+
+    import cli
+    from toolchain import Toolchain
+    Toolchain.load_all_toolchains_in_directory(toolchain_directory())
+
+    # if not toolchain:
+    #     exit
+    parser = cli.UserParams.create_parser()
+    args = cli.UserParams.from_args(parser=parser)
+    return run_command(args, parser)
+
 if __name__ == "__main__":
-    raise SystemExit(main()) 
\ No newline at end of file
+    raise SystemExit(main())
@@ -4,14 +4,19 @@ from typing import Self
 import cli
 import console
 from context import KissBaseContext
-from yaml_file import YamlProjectFile, YamlGitDependency, YamlPathDependency, YamlProjectType
+from project_graph import ProjectGraph
+from projectregistry import ProjectRegistry
+from yaml_file import IndexedProjectDiscovery, ProjectDiscovery, YamlProject, YamlProjectFile, YamlGitDependency, YamlPathDependency, YamlProjectType
 
 
 class KissListContext(KissBaseContext):
-    def __init__(self, current_directory:Path, recursive:bool, list_dependencies:bool):
+    def __init__(self, current_directory:Path, recursive:bool, list_dependencies:bool, list_levels:bool, stop_at_project:bool, jobs:int):
         super().__init__(current_directory)
         self._recursive = recursive
         self._list_dependencies = list_dependencies
+        self._list_levels = list_levels
+        self._stop_at_project = stop_at_project
+        self._jobs = jobs
 
     @property
     def recursive(self) -> bool : 
@@ -20,14 +25,31 @@ class KissListContext(KissBaseContext):
     @property
     def list_dependencies(self) -> bool : 
         return self._list_dependencies
+
+    @property
+    def list_levels(self) -> bool : 
+        return self._list_levels
+
+    @property
+    def stop_at_project(self) -> bool : 
+        return self._stop_at_project
+
+    @property
+    def jobs(self) -> int : 
+        return self._jobs
     
     @classmethod
     def from_cli_args(cls, cli_args: argparse.Namespace) -> Self:
-        return cls(current_directory=cli_args.directory, recursive=cli_args.recursive, list_dependencies=cli_args.list_dependencies)
+        return cls(current_directory=cli_args.directory, recursive=cli_args.recursive, list_dependencies=cli_args.list_dependencies, list_levels=cli_args.list_levels, stop_at_project=cli_args.stop_at_project, jobs=cli_args.jobs)
     
 def cmd_list(cli_args: argparse.Namespace):
     list_context = KissListContext.from_cli_args(cli_args)
-    all_yaml_projects = YamlProjectFile.load_yaml_projects_in_directory(directory=list_context.current_directory, recursive=list_context.recursive, load_dependencies=list_context.list_dependencies)
+    # Recursive listing reuse the workspace index to scan only directories that changed
+    if list_context.recursive:
+        discovery = IndexedProjectDiscovery(stop_at_project=list_context.stop_at_project)
+    else:
+        discovery = ProjectDiscovery(stop_at_project=list_context.stop_at_project)
+    all_yaml_projects = YamlProjectFile.load_yaml_projects_in_directory(directory=list_context.current_directory, recursive=list_context.recursive, load_dependencies=list_context.list_dependencies or list_context.list_levels, discovery=discovery, jobs=list_context.jobs)
     if not all_yaml_projects:
         console.print_success(f"No project found in '{list_context.current_directory}'")
     else:
@@ -57,6 +79,8 @@ def cmd_list(cli_args: argparse.Namespace):
                                 case YamlGitDependency():
                                     console.print(f"        git : {dep.git}")
                                     console.print(f"        branch : {dep.branch}")
+                                    if dep.commit:
+                                        console.print(f"        commit : {dep.commit}")
                     else:
                         console.print(f"    - dependencies : []")
                     match project.type:
@@ -68,5 +92,15 @@ def cmd_list(cli_args: argparse.Namespace):
                         case YamlProjectType.dyn:
                             console.print(f"    - sources : {[str(p) for p in project.sources]}")
                             console.print(f"    - interface directories : {[str(p) for p in project.interface_directories]}")
-                    
+        if list_context.list_levels:
+            _print_dependency_levels(all_yaml_projects)
+
+# Print the dependency levels of the listed projects, projects of a level can be built concurrently
+def _print_dependency_levels(all_yaml_projects: dict[Path, list[YamlProject]]):
+    ProjectRegistry.register_yaml_projects(all_yaml_projects)
+    projects = [ProjectRegistry.get_project_in_file(file, yaml_project.name) for file, yaml_project_list in all_yaml_projects.items() for yaml_project in yaml_project_list]
+    dependency_levels = ProjectGraph.levels(projects)
+    console.print_success(f"Dependency levels (critical path : {dependency_levels.critical_path_length} projects)")
+    for depth, level in enumerate(dependency_levels):
+        console.print(f"  - level {depth} : {', '.join(project.name for project in level)}")
 
@@ -0,0 +1,44 @@
+import argparse
+from pathlib import Path
+from typing import Self
+import console
+from context import KissBaseContext
+from yaml_file import LockFile, YamlProjectFile
+
+
+class KissLockContext(KissBaseContext):
+    def __init__(self, current_directory:Path, check:bool):
+        super().__init__(current_directory)
+        self._check = check
+
+    @property
+    def check(self) -> bool : 
+        return self._check
+
+    @classmethod
+    def from_cli_args(cls, cli_args: argparse.Namespace) -> Self:
+        return cls(current_directory=cli_args.directory, check=cli_args.check)
+
+def cmd_lock(cli_args: argparse.Namespace) -> bool:
+    lock_context = KissLockContext.from_cli_args(cli_args)
+    # Resolve all dependencies again, ignoring the current lock file
+    all_yaml_projects = YamlProjectFile.load_yaml_projects_in_directory(directory=lock_context.current_directory, load_dependencies=True, recursive=False, use_lock_file=False)
+    if not all_yaml_projects:
+        console.print_error(f"No project found in {str(lock_context.current_directory)}")
+        return False
+    lock_file = LockFile.create(lock_context.current_directory, all_yaml_projects)
+
+    if lock_context.check:
+        if (current_lock_file := LockFile.load(lock_context.current_directory)) is None:
+            console.print_error(f"No lock file {lock_file.file}")
+            return False
+        if current_lock_file.digest != lock_file.digest:
+            console.print_error(f"{lock_file.file} is outdated, run 'kiss lock' to update it")
+            return False
+        console.print_success(f"{lock_file.file} is up to date")
+        return True
+
+    if not lock_file.save():
+        return False
+    console.print_success(f"Locked {len(lock_file.projects)} projects in {lock_file.file}")
+    return True
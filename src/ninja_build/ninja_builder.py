@@ -0,0 +1,108 @@
+import argparse
+import os
+from pathlib import Path
+from typing import Optional, Self
+from build import KissBuildContext
+from builder import BaseBuilder
+from cli import KissParser
+import console
+from generator import GeneratorRegistry
+from ninja_build.ninja_context import NinjaContext
+from ninja_build.ninja_generator import NinjaGenerateContext, NinjaGenerator
+from process import run_process
+from project import Project
+from toolchain import Toolchain
+
+
+class NinjaBuildContext(KissBuildContext):
+    def __init__(self,
+                 current_directory:Path,
+                 project: Project,
+                 builder_name: str,
+                 toolchain: Toolchain,
+                 profile_name:str,
+                 root_projects: Optional[list[Project]] = None):
+        super().__init__(current_directory=current_directory,
+                         project=project,
+                         builder_name=builder_name,
+                         toolchain=toolchain,
+                         profile_name=profile_name,
+                         root_projects=root_projects)
+        self._ninja_generate_context = NinjaGenerateContext(current_directory=current_directory,
+                                                            project=project,
+                                                            generator_name=builder_name,
+                                                            profile_name=profile_name,
+                                                            toolchain=toolchain,
+                                                            root_projects=self.root_projects)
+
+    @property
+    def ninja_generate_context(self) -> NinjaGenerateContext:
+        return self._ninja_generate_context
+
+    @property
+    def ninja_context(self) -> NinjaContext:
+        return self._ninja_generate_context.ninja_context
+
+    @classmethod
+    def create(cls,
+               current_directory: Path,
+               project_name: str,
+               builder_name: str,
+               toolchain: Toolchain,
+               profile_name:str) -> Optional[Self]:
+        project_to_build = super().find_target_project(current_directory, project_name)
+        if not project_to_build:
+            console.print_error(f"No project found in {str(current_directory)}")
+            return None
+        return NinjaBuildContext(current_directory=current_directory,
+                                 project=project_to_build,
+                                 builder_name=builder_name,
+                                 toolchain=toolchain,
+                                 profile_name=profile_name)
+
+    @staticmethod
+    def from_cli_args(kiss_build_context: KissBuildContext, cli_args: argparse.Namespace) -> Optional[Self]:
+        return NinjaBuildContext(current_directory=kiss_build_context.current_directory,
+                                 project=kiss_build_context.project,
+                                 builder_name=kiss_build_context.builder_name,
+                                 toolchain=kiss_build_context.toolchain,
+                                 profile_name=kiss_build_context.profile_name,
+                                 root_projects=kiss_build_context.root_projects)
+
+
+class NinjaBuilder(BaseBuilder):
+    @classmethod
+    def add_cli_argument_to_parser(cls, parser: KissParser):
+        parser.add_argument("-j", "--jobs",
+                            type=int,
+                            help="number of jobs run in parallel by ninja (default: chosen by ninja)")
+
+    def __init__(self):
+        super().__init__("ninja", "Build with a build.ninja file generated without CMake (GCC and Clang on Linux)")
+
+    # Generate the 'build.ninja' file and let ninja build what is out of date, there is no configure step
+    def build_project(self, ninja_build_context: NinjaBuildContext, jobs: Optional[int] = None) -> bool:
+        ninja_generator : NinjaGenerator = GeneratorRegistry.generators.get(ninja_build_context.builder_name)
+        if not ninja_generator:
+            console.print_error(f"Generator {ninja_build_context.builder_name} not found")
+            return False
+
+        if (is_ninjafile_changed := ninja_generator.generate_ninja_file(ninja_build_context.ninja_generate_context)) is None:
+            return False
+        if is_ninjafile_changed:
+            console.print_step("⚙️  build.ninja generated")
+        else:
+            console.print_step("✔️  build.ninja is up-to-date")
+
+        console.print_step("🏗️  Ninja build...")
+        build_directory = ninja_build_context.ninja_context.build_directory
+        os.makedirs(build_directory, exist_ok=True)
+        args = ["-C", str(build_directory)]
+        if jobs:
+            args += ["-j", str(jobs)]
+        return run_process("ninja", args) == 0
+
+    def build(self, kiss_build_context: KissBuildContext, cli_args: argparse.Namespace) -> bool:
+        if (ninja_build_context := NinjaBuildContext.from_cli_args(kiss_build_context, cli_args)) is None:
+            return False
+        return self.build_project(ninja_build_context=ninja_build_context, jobs=getattr(cli_args, "jobs", None))
@@ -0,0 +1,69 @@
+from pathlib import Path
+from project import Project, ProjectType
+from toolchain import Toolchain
+
+# Directories and files of the native Ninja backend
+# All projects of a profile are built by a single 'build.ninja' file:
+# build/<target>/<compiler>/ninja/<profile>/build.ninja
+# build/<target>/<compiler>/ninja/<profile>/<project>_<hash>/<output>
+# build/<target>/<compiler>/ninja/<profile>/<project>_<hash>/obj/<object files>
+class NinjaContext:
+    def __init__(self, current_directory: Path, toolchain: Toolchain, profile_name: str):
+        self._current_directory = current_directory
+        self._toolchain = toolchain
+        self._profile_name = profile_name
+        self._build_directory = self.resolveBuildDirectory(current_directory=current_directory,
+                                                           toolchain=toolchain,
+                                                           profile_name=profile_name)
+        self._ninjafile = self._build_directory / "build.ninja"
+
+    @staticmethod
+    def resolveRootBuildDirectory(current_directory: Path) -> Path:
+        return current_directory / "build"
+
+    @staticmethod
+    def resolveNinjaBuildDirectory(current_directory: Path, toolchain: Toolchain) -> Path:
+        return NinjaContext.resolveRootBuildDirectory(current_directory=current_directory) / toolchain.target.name / toolchain.compiler.name / "ninja"
+
+    @staticmethod
+    def resolveBuildDirectory(current_directory: Path, toolchain: Toolchain, profile_name: str) -> Path:
+        return NinjaContext.resolveNinjaBuildDirectory(current_directory=current_directory, toolchain=toolchain) / profile_name
+
+    # Directory of the project in the build directory, relative to the build directory
+    @staticmethod
+    def project_directory(project: Project) -> Path:
+        return Path(f"{project.name}_{project.filehash_short:08x}")
+
+    # File built for the project, relative to the build directory
+    @staticmethod
+    def output_file(project: Project) -> Path:
+        match project.type:
+            case ProjectType.bin:
+                return NinjaContext.project_directory(project) / project.name
+            case ProjectType.lib:
+                return NinjaContext.project_directory(project) / f"lib{project.name}.a"
+            case ProjectType.dyn:
+                return NinjaContext.project_directory(project) / f"lib{project.name}.so"
+
+    def output_directory(self, project: Project) -> Path:
+        return (self.build_directory / self.project_directory(project)).resolve()
+
+    @property
+    def current_directory(self) -> Path:
+        return self._current_directory
+
+    @property
+    def toolchain(self) -> Toolchain:
+        return self._toolchain
+
+    @property
+    def profile_name(self) -> str:
+        return self._profile_name
+
+    @property
+    def build_directory(self) -> Path:
+        return self._build_directory
+
+    @property
+    def ninjafile(self) -> Path:
+        return self._ninjafile
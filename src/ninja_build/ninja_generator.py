@@ -0,0 +1,251 @@
+
+############################################################
+# NinjaGenerator writes a 'build.ninja' file from the projects and the toolchain, without CMake:
+# - One compile edge per source, headers are tracked with the depfiles written by the compiler ('deps = gcc')
+# - One archive or link edge per project, with the outputs of its dependencies as inputs
+# - The compiler binary is an input of every edge, an upgraded compiler builds everything again
+# Ninja rebuilds an edge when its command changed, a flag changed in the toolchain only rebuilds what uses it.
+# Only GCC and Clang targeting Linux are supported.
+############################################################
+import argparse
+import io
+import os
+import shlex
+import shutil
+from pathlib import Path
+from typing import Optional, Self
+from cli import KissParser
+import console
+from generate import KissGenerateContext
+from generated_file import write_if_changed
+from generator import BaseGenerator
+from ninja_build.ninja_context import NinjaContext
+from project import Project, ProjectType
+from project_graph import ProjectGraph
+from project_sources import resolve_sources
+from toolchain import Toolchain
+
+class NinjaGenerateContext(KissGenerateContext):
+    def __init__(self,
+                 current_directory:Path,
+                 project: Project,
+                 generator_name: str,
+                 profile_name:str,
+                 toolchain: Toolchain,
+                 root_projects: Optional[list[Project]] = None):
+        super().__init__(current_directory=current_directory,
+                         project=project,
+                         generator_name=generator_name,
+                         profile_name=profile_name,
+                         toolchain=toolchain)
+        self._root_projects = root_projects or [project]
+        self._ninja_context = NinjaContext(current_directory=current_directory,
+                                           toolchain=toolchain,
+                                           profile_name=profile_name)
+
+    # Projects written in the 'build.ninja' file with their dependencies
+    @property
+    def root_projects(self) -> list[Project]:
+        return self._root_projects
+
+    @property
+    def ninja_context(self) -> NinjaContext:
+        return self._ninja_context
+
+    @property
+    def build_directory(self) -> Path:
+        return self._ninja_context.build_directory
+
+    @property
+    def ninjafile(self) -> Path:
+        return self._ninja_context.ninjafile
+
+    @classmethod
+    def create(cls,
+               current_directory: Path,
+               project_name: str,
+               generator_name: str,
+               toolchain: Toolchain,
+               profile_name: str) -> Optional[Self]:
+        project_to_generate = super().find_target_project(current_directory, project_name)
+        if not project_to_generate:
+            return None
+        return cls(current_directory=current_directory,
+                   project=project_to_generate,
+                   generator_name=generator_name or "ninja",
+                   profile_name=profile_name,
+                   toolchain=toolchain)
+
+    @staticmethod
+    def from_cli_args(kiss_generate_context: KissGenerateContext, cli_args: argparse.Namespace) -> Optional[Self]:
+        return NinjaGenerateContext(current_directory=kiss_generate_context.current_directory,
+                                    project=kiss_generate_context.project,
+                                    generator_name=kiss_generate_context.generator_name,
+                                    profile_name=kiss_generate_context.profile_name,
+                                    toolchain=kiss_generate_context.toolchain)
+
+
+# Escape a path used in a 'build' line of a ninja file
+def _escape_path(path: Path | str) -> str:
+    return str(path).replace("$", "$$").replace(" ", "$ ").replace(":", "$:")
+
+# Escape a value of a ninja variable used in a shell command
+def _escape_flags(flags: list[str]) -> str:
+    return " ".join(shlex.quote(flag) for flag in flags).replace("$", "$$")
+
+class NinjaGenerator(BaseGenerator):
+    @classmethod
+    def add_cli_argument_to_parser(cls, parser: KissParser):
+        pass
+
+    def __init__(self):
+        super().__init__("ninja", "Generate a build.ninja file, without CMake (GCC and Clang on Linux)")
+
+    @staticmethod
+    def is_supported(toolchain: Toolchain) -> bool:
+        return (toolchain.target.is_linux_os() and not toolchain.target.is_msvc_abi()
+                and (toolchain.compiler.is_gcc_based() or toolchain.compiler.is_clang_based()))
+
+    # Same flags as the CMake configure of the target architecture
+    @staticmethod
+    def _arch_flags(toolchain: Toolchain) -> list[str]:
+        if toolchain.target.is_x86_64():
+            return ["-m64"]
+        elif toolchain.target.is_i686():
+            return ["-m32"]
+        elif toolchain.target.is_aarch64():
+            return ["-march=armv8-a"]
+        elif toolchain.target.is_arm():
+            return ["-march=armv7-a"]
+        return []
+
+    # Object file of a source, relative to the build directory
+    # The path of the source relative to the project keeps objects of sources with the same name apart
+    @staticmethod
+    def _object_file(project: Project, source: Path) -> Path:
+        relative_source = Path(os.path.relpath(source, project.path.resolve()))
+        parts = ["__" if part == ".." else part for part in relative_source.parts]
+        return NinjaContext.project_directory(project) / "obj" / Path(*parts).with_name(f"{relative_source.name}.o")
+
+    # Include directories of the project and of its direct dependencies, like the CMake 'INTERFACE_INCLUDE_DIRECTORIES'
+    @staticmethod
+    def _include_flags(project: Project) -> list[str]:
+        include_flags = dict[str, None]()
+        for include_project in [project, *project.dependencies]:
+            if include_project is not project and include_project.type == ProjectType.bin:
+                continue
+            for interface_directory in getattr(include_project, "interface_directories", []):
+                include_flags[f"-I{interface_directory.resolve().as_posix()}"] = None
+        return list(include_flags)
+
+    def _write_project(self, f: io.StringIO, ninja_generate_context: NinjaGenerateContext, project: Project, outputs: dict[int, Path]) -> bool:
+        toolchain = ninja_generate_context.toolchain
+        if (profile := toolchain.get_profile(ninja_generate_context.profile_name)) is None:
+            console.print_error(f"Profile {ninja_generate_context.profile_name} not found in {self.name}")
+            return False
+        if (sources := resolve_sources(getattr(project, "sources", []), project.name)) is None:
+            return False
+        if not sources and project.type != ProjectType.lib:
+            console.print_error(f"Error when generating build.ninja for {project.name}: no source to compile")
+            return False
+
+        f.write(f"# {project.name}\n")
+        compiler_flags = self._include_flags(project) + profile.compiler_flags_for_project_type(project.type)
+        if project.type == ProjectType.dyn:
+            compiler_flags += ["-fPIC", f"-D{project.name.upper()}_EXPORTS"]
+        object_files = list[Path]()
+        for source in sources:
+            object_file = self._object_file(project, source)
+            object_files.append(object_file)
+            f.write(f"build {_escape_path(object_file)}: cxx {_escape_path(source.as_posix())} | $cxx_binary\n")
+            f.write(f"  cxxflags = {_escape_flags(compiler_flags)}\n")
+
+        # A library without source only has interface directories
+        if not object_files:
+            f.write("\n")
+            return True
+
+        output_file = NinjaContext.output_file(project)
+        outputs[id(project)] = output_file
+        if project.type == ProjectType.lib:
+            f.write(f"build {_escape_path(output_file)}: ar {' '.join(_escape_path(object_file) for object_file in object_files)}\n")
+            f.write("\n")
+            return True
+
+        # Libraries are linked from the projects that use them to their dependencies, as a static linker expects them
+        # Shared libraries are found at run time in their output directory
+        libraries = list[Path]()
+        rpaths = list[str]()
+        binaries = list[Path]()
+        transitive_dependencies = project.transitive_dependencies()
+        for dependency in reversed(project.topological_sort_projects()):
+            if dependency not in transitive_dependencies or (dependency_output := outputs.get(id(dependency))) is None:
+                continue
+            if dependency.type == ProjectType.bin:
+                binaries.append(dependency_output)
+                continue
+            libraries.append(dependency_output)
+            if dependency.type == ProjectType.dyn:
+                rpaths.append(f"-Wl,-rpath,{ninja_generate_context.ninja_context.output_directory(dependency).as_posix()}")
+
+        rule = "link" if project.type == ProjectType.bin else "so"
+        linker_flags = profile.linker_flags_for_project_type(project.type) + rpaths
+        inputs = " ".join(_escape_path(file) for file in [*object_files, *libraries])
+        order_only = f" || {' '.join(_escape_path(binary) for binary in binaries)}" if binaries else ""
+        f.write(f"build {_escape_path(output_file)}: {rule} {inputs} | $cxx_binary{order_only}\n")
+        f.write(f"  ldflags = {_escape_flags(linker_flags)}\n")
+        if project.type == ProjectType.dyn:
+            f.write(f"  soname = {_escape_flags([output_file.name])}\n")
+        f.write("\n")
+        return True
+
+    # Write the 'build.ninja' file of the root projects and their dependencies
+    # Return True if the file changed on disk, None on error
+    def generate_ninja_file(self, ninja_generate_context: NinjaGenerateContext) -> Optional[bool]:
+        toolchain = ninja_generate_context.toolchain
+        if not self.is_supported(toolchain):
+            console.print_error(f"Generator {self.name} only supports GCC and Clang on Linux, not {toolchain.compiler.name} for {toolchain.target.name}")
+            return None
+        if (cxx_binary := shutil.which(str(toolchain.compiler.cxx_path))) is None:
+            console.print_error(f"Compiler {toolchain.compiler.cxx_path} not found")
+            return None
+
+        with io.StringIO() as f:
+            f.write("# Generated by kiss, don't edit\n")
+            f.write("ninja_required_version = 1.3\n")
+            f.write("\n")
+            f.write(f"cxx_binary = {_escape_path(Path(cxx_binary).as_posix())}\n")
+            f.write(f"arch_flags = {_escape_flags(self._arch_flags(toolchain))}\n")
+            f.write("\n")
+            f.write("rule cxx\n")
+            f.write("  command = $cxx_binary -MD -MF $out.d $arch_flags $cxxflags -c $in -o $out\n")
+            f.write("  depfile = $out.d\n")
+            f.write("  deps = gcc\n")
+            f.write("  description = Compile $in\n")
+            f.write("rule ar\n")
+            f.write("  command = rm -f $out && ar crs $out $in\n")
+            f.write("  description = Archive $out\n")
+            f.write("rule link\n")
+            f.write("  command = $cxx_binary $arch_flags $ldflags -o $out $in\n")
+            f.write("  description = Link $out\n")
+            f.write("rule so\n")
+            f.write("  command = $cxx_binary $arch_flags -shared -Wl,-soname,$soname $ldflags -o $out $in\n")
+            f.write("  description = Link $out\n")
+            f.write("\n")
+
+            # Dependencies are written before the projects that use them
+            outputs = dict[int, Path]()
+            for level in ProjectGraph.levels(ninja_generate_context.root_projects):
+                for project in level:
+                    if not self._write_project(f, ninja_generate_context, project, outputs):
+                        return None
+
+            defaults = [outputs[id(project)] for project in ninja_generate_context.root_projects if id(project) in outputs]
+            if defaults:
+                f.write(f"default {' '.join(_escape_path(output) for output in defaults)}\n")
+            return write_if_changed(ninja_generate_context.ninjafile, f.getvalue())
+
+    def generate(self, kiss_generate_context: KissGenerateContext, cli_args: argparse.Namespace) -> bool:
+        if (ninja_generate_context := NinjaGenerateContext.from_cli_args(kiss_generate_context, cli_args)) is None:
+            return False
+        return self.generate_ninja_file(ninja_generate_context) is not None
@@ -0,0 +1,48 @@
+from pathlib import Path
+from builder import BuilderRegistry
+from cli import KissParser
+import console
+from ninja_build.ninja_builder import NinjaBuildContext, NinjaBuilder
+from process import run_process
+from project import ProjectType
+from run import KissRunContext
+from runner import BaseRunner
+
+
+class NinjaRunner(BaseRunner):
+    @classmethod
+    def add_cli_argument_to_parser(cls, parser: KissParser):
+        pass
+
+    def __init__(self):
+        super().__init__("ninja", "Run a binary build with ninja, without CMake")
+
+    def run_project(self, run_context: KissRunContext):
+        # Ensure the the project is a binary
+        if run_context.project.type != ProjectType.bin:
+            console.print_error(f"Project {run_context.project.name} is not a binary project")
+            exit(1)
+
+        # Build the project
+        ninja_builder : NinjaBuilder = BuilderRegistry.builders.get(run_context.runner_name)
+        if not ninja_builder:
+            console.print_error(f"Builder {run_context.runner_name} not found")
+            exit(1)
+        ninja_build_context = NinjaBuildContext(current_directory=run_context.current_directory,
+                                                project=run_context.project,
+                                                builder_name=run_context.runner_name,
+                                                toolchain=run_context.toolchain,
+                                                profile_name=run_context.profile_name)
+        if not ninja_builder.build_project(ninja_build_context):
+            exit(1)
+
+        # Shared libraries are found with the rpath written in the binary
+        binary_path = ninja_build_context.ninja_context.output_directory(run_context.project) / run_context.project.name
+        console.print_step(f"▶ Run {Path(*binary_path.parts[-2:])} ({run_context.toolchain.compiler.name})...")
+
+        # Run the project
+        if not run_process(binary_path, output_prefix=False, print_command=False) == 0:
+             exit(1)
+
+    def run(self, run_context: KissRunContext):
+        self.run_project(run_context=run_context)
@@ -1,5 +1,4 @@
 from abc import abstractmethod
-from collections import defaultdict, deque
 import hashlib
 from pathlib import Path
 from typing import Self
@@ -7,7 +6,8 @@ from semver import Version
 from enum import Enum
 
 import console
-from yaml_file import YamlBinProject, YamlDynProject, YamlLibProject, YamlProject, YamlProjectType
+from project_graph import DependencyLevels, ProjectGraph
+from yaml_file import intern_path, YamlBinProject, YamlDynProject, YamlLibProject, YamlProject, YamlProjectType
 
 # Enumeration of the project type that is supported
 class ProjectType(str, Enum):
@@ -27,8 +27,10 @@ class ProjectType(str, Enum):
 # It is represented by :
 # - The file 'kiss.yaml' that describe this project
 # - The directory where the project reside (Kiss allow to have a 'kiss.yaml' file in another directory than the project it self that contains sources)
+# Projects are compared by identity, a project is registered only once
 class Project:
-   
+    __slots__ = ("_type", "_file", "_filehash", "_path", "_name", "_description", "_version", "_dependencies", "_graph_index")
+
     # Initialize a project with the following informations:
     # - The file 'kiss.yaml' that describe this project
     # - The path where the project reside (Kiss allow to have a 'kiss.yaml' file in another path than the project it self that contains sources)
@@ -37,23 +39,16 @@ class Project:
     # - List of dependencie
     def __init__(self, type: ProjectType, file: Path, path: Path, name: str, description :str, version: Version):
         self._type = type
-        self._file = file
+        self._file = intern_path(file)
         self._filehash = int.from_bytes(hashlib.sha256(str(file).encode()).digest()[:4], "little" )
-        self._path = path
+        self._path = intern_path(path)
         self._name = name
         self._description = description
         self._version = version
         self._dependencies: list[Project]= []
+        # The project is added to the graph by the first query that needs it
+        self._graph_index = -1
 
-    def __hash__(self):
-        return hash((self._type, self._name, self._file))
-
-    def __eq__(self, other):
-        if not isinstance(other, YamlProject):
-            return False
-        return (self._type == other.type and
-                self._name == other.name and
-                self._file == other.file)
     # The type of the project
     @property
     def type(self) -> YamlProjectType:
@@ -94,10 +89,19 @@ class Project:
     def path(self) -> Path:
         return self._path
     
-    # List of dependencies
+    # List of dependencies, use add_dependency to add one
     @property
     def dependencies(self) -> list[Self]:
         return self._dependencies
+
+    # Index of the project in the ProjectGraph, -1 until the project is queried
+    @property
+    def graph_index(self) -> int:
+        return self._graph_index
+
+    @graph_index.setter
+    def graph_index(self, index: int):
+        self._graph_index = index
     
     @abstractmethod
     def to_yaml_project(self):
@@ -115,73 +119,28 @@ class Project:
         console.print_error("Invalid project type")
         exit(1)
 
-    def topological_sort_projects(self) -> list[Self]:
-        """
-        Kahn Algorithm
-        Returns a list of this project and its dependencies sorted by priority order (if A depends on B, A comes after B).
-
-        @return:
-        - list of projects in dependency order
-        - exit(1) if the graph contains a dependency cycle
-        """
-        # 1. Collecte du sous-graphe (DFS)
-        all_projects: set[Project] = set()
-        visiting_stack: list[Project] = []
-
-        def collect(project :Project, parent_project: Project):
-            # Detect cyclic dependency
-            if project in visiting_stack:
-                console.print_error(f"Error: Cyclic dependency between '{project.name}' and '{parent_project.name}'")
-                console.print_error(f"         {' -> '.join([p.name for p in visiting_stack] + [project.name])}")
-                exit(1)
-
-            # Visit the project only once
-            if project in all_projects:
-                return
-            visiting_stack.append(project)
-
-            # Visit dependency
-            for dep_project in project.dependencies:
-                collect(dep_project, project)
-            
-            # Remove visited project
-            visiting_stack.pop()
-            all_projects.add(project)
-        collect(self,  None)
+    # Add a dependency to the project
+    def add_dependency(self, project: Self):
+        self._dependencies.append(project)
+        ProjectGraph.invalidate()
 
-        # 2. Construction du graphe inversé
-        graph = defaultdict(list)     # dep -> [dependants]
-        in_degree = defaultdict(int)  # nombre de dépendances restantes
-
-        for project in all_projects:
-            in_degree[project] = 0
-        for project in all_projects:
-            for dep_project in project.dependencies:
-                graph[dep_project].append(project)
-                in_degree[project] += 1
-
-        # 3. Kahn : leaf en premier
-        queue = deque(
-            project for project in all_projects if in_degree[project] == 0
-        )
-
-        ordered = []
-
-        while queue:
-            project = queue.popleft()
-            ordered.append(project)
-
-            for dependant in graph[project]:
-                in_degree[dependant] -= 1
-                if in_degree[dependant] == 0:
-                    queue.append(dependant)
+    # List of this project and its dependencies sorted by priority order (if A depends on B, A comes after B)
+    # The result is cached until a dependency is added, exit(1) if the graph contains a dependency cycle
+    def topological_sort_projects(self) -> list[Self]:
+        return ProjectGraph.topological_order(self)
 
-        return ordered
+    # All projects this project depends on, directly or not
+    def transitive_dependencies(self) -> frozenset[Self]:
+        return ProjectGraph.transitive_dependencies(self)
 
-        
+    # This project and its dependencies grouped by dependency levels, projects of a level can be processed concurrently
+    def dependency_levels(self) -> DependencyLevels:
+        return ProjectGraph.levels([self])
 
 # BinProject represent a project that is a binary project (elf or .exe file)
 class BinProject(Project):
+    __slots__ = ("_sources",)
+
     # Initialize a project with the following informations:
     # - The file 'kiss.yaml' that describe this project
     # - The path where the project reside (Kiss allow to have a 'kiss.yaml' file in another path than the project it self that contains sources)
@@ -223,6 +182,8 @@ class BinProject(Project):
 
 # LibProject represent a project that is a static library project (.a or .lib file)
 class LibProject(Project):
+    __slots__ = ("_sources", "_interface_directories")
+
     # Initialize a project with the following informations:
     # - The file 'kiss.yaml' that describe this project
     # - The path where the project reside (Kiss allow to have a 'kiss.yaml' file in another path than the project it self that contains sources)
@@ -272,6 +233,8 @@ class LibProject(Project):
     
 # DynProject represent a project that is a dynamic library project (.so or .dll file)
 class DynProject(Project):
+    __slots__ = ("_sources", "_interface_directories")
+
     # Initialize a project with the following informations:
     # - The file 'kiss.yaml' that describe this project
     # - The path where the project reside (Kiss allow to have a 'kiss.yaml' file in another path than the project it self that contains sources)
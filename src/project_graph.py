@@ -0,0 +1,367 @@
+
+############################################################
+# ProjectGraph computes the dependency graph of registered projects:
+# - The topological order of a project and its dependencies (dependencies first)
+# - The transitive dependencies of a project
+# - The dependency levels of projects, projects of a level can be processed concurrently
+# - The projects affected by a change of some projects
+# - All dependency cycles, as strongly connected components
+# Each project has an integer index in the graph, and dependencies are kept in compact arrays (CSR):
+# the dependencies of the project i are targets[offsets[i]:offsets[i + 1]].
+# Arrays are built again when the graph changed, and results are cached per root project until then.
+# Algorithms are iterative so deep dependency chains don't hit the recursion limit.
+############################################################
+from array import array
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+import console
+from yaml_file import YamlProjectFile
+
+if TYPE_CHECKING:
+    from project import Project
+
+# Projects grouped by level, the dependencies of a project are all in lower levels
+# The depth of a project is its level: 0 if it has no dependency, else 1 + the highest depth of its dependencies
+class DependencyLevels:
+    __slots__ = ("_levels", "_depths")
+
+    def __init__(self, levels: list[list["Project"]], depths: dict[int, int]):
+        self._levels = levels
+        self._depths = depths
+
+    # Projects of each level, in topological order inside a level
+    @property
+    def levels(self) -> list[list["Project"]]:
+        return self._levels
+
+    # Number of projects of the longest dependency chain
+    @property
+    def critical_path_length(self) -> int:
+        return len(self._levels)
+
+    # Depth of the project, None if the project is not in the levels
+    def depth(self, project: "Project") -> int | None:
+        return self._depths.get(id(project))
+
+    def __iter__(self) -> Iterator[list["Project"]]:
+        return iter(self._levels)
+
+    def __len__(self) -> int:
+        return len(self._levels)
+
+class ProjectGraph:
+    def __init__(self):
+        # Incremented each time the graph changes
+        self._generation = 0
+        # Project of each index
+        self._projects = list["Project"]()
+        # Dependencies and dependants of each project index, built at the generation _arrays_generation
+        self._arrays_generation = -1
+        self._offsets = array("i")
+        self._targets = array("i")
+        self._reverse_arrays_generation = -1
+        self._reverse_offsets = array("i")
+        self._reverse_targets = array("i")
+        # Results of queries by root index, computed at the generation _cache_generation
+        self._cache_generation = 0
+        self._topological_orders: dict[int, list["Project"]] = {}
+        self._transitive_dependencies: dict[int, frozenset["Project"]] = {}
+        self._levels: dict[tuple[int, ...], DependencyLevels] = {}
+
+    # Generation of the graph, it changes each time the graph changes
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    # Number of projects in the graph
+    def __len__(self) -> int:
+        return len(self._projects)
+
+    # Forget cached results, must be called when dependencies of a project change
+    def invalidate(self):
+        self._generation += 1
+
+    # Forget all projects
+    def clear(self):
+        self.__init__()
+
+    # Add the project to the graph, returns its index
+    def add_project(self, project: "Project") -> int:
+        self._projects.append(project)
+        self._generation += 1
+        return len(self._projects) - 1
+
+    # Index of the project, the project is added when it is first queried or if it was added before the graph was cleared
+    def _index(self, project: "Project") -> int:
+        index = project.graph_index
+        if 0 <= index < len(self._projects) and self._projects[index] is project:
+            return index
+        project.graph_index = self.add_project(project)
+        return project.graph_index
+
+    def _indices(self, projects: Iterable["Project"]) -> list[int]:
+        indices = [self._index(project) for project in projects]
+        self._build_arrays()
+        return indices
+
+    def _check_cache(self):
+        if self._cache_generation != self._generation:
+            self._cache_generation = self._generation
+            self._topological_orders.clear()
+            self._transitive_dependencies.clear()
+            self._levels.clear()
+
+    # Build the dependency arrays if the graph changed
+    def _build_arrays(self):
+        if self._arrays_generation == self._generation:
+            return
+        offsets = array("i", [0])
+        targets = array("i")
+        projects = self._projects
+        # Dependencies created before the graph was cleared are added while arrays are built
+        index = 0
+        while index < len(projects):
+            for dependency in projects[index].dependencies:
+                dependency_index = dependency.graph_index
+                if not 0 <= dependency_index < len(projects) or projects[dependency_index] is not dependency:
+                    dependency_index = self._index(dependency)
+                targets.append(dependency_index)
+            offsets.append(len(targets))
+            index += 1
+        self._offsets = offsets
+        self._targets = targets
+        self._arrays_generation = self._generation
+
+    # Build the dependant arrays if the graph changed
+    def _build_reverse_arrays(self):
+        self._build_arrays()
+        if self._reverse_arrays_generation == self._arrays_generation:
+            return
+        offsets, targets = self._offsets, self._targets
+        project_count = len(offsets) - 1
+        # Count dependants of each index, then place them
+        positions = array("i", [0]) * (project_count + 1)
+        for target in targets:
+            positions[target + 1] += 1
+        for index in range(project_count):
+            positions[index + 1] += positions[index]
+        reverse_offsets = array("i", positions)
+        reverse_targets = array("i", [0]) * len(targets)
+        for index in range(project_count):
+            for position in range(offsets[index], offsets[index + 1]):
+                target = targets[position]
+                reverse_targets[positions[target]] = index
+                positions[target] += 1
+        self._reverse_offsets = reverse_offsets
+        self._reverse_targets = reverse_targets
+        self._reverse_arrays_generation = self._arrays_generation
+
+    # Strongly connected components of the root indices and all their dependencies, with the iterative Tarjan algorithm
+    # A component is listed after the components it depends on
+    def _strongly_connected_components(self, roots: list[int]) -> list[list[int]]:
+        offsets, targets = self._offsets, self._targets
+        project_count = len(offsets) - 1
+        components = list[list[int]]()
+        # Visit order of each index (-1 if not visited), and lowest visit order reachable from it
+        visit_order = array("i", [-1]) * project_count
+        lowlink = array("i", [0]) * project_count
+        on_stack = bytearray(project_count)
+        stack = list[int]()
+        visited_count = 0
+        for root in roots:
+            if visit_order[root] != -1:
+                continue
+            visit_order[root] = lowlink[root] = visited_count
+            visited_count += 1
+            stack.append(root)
+            on_stack[root] = 1
+            nodes = [root]
+            positions = [offsets[root]]
+            while nodes:
+                node = nodes[-1]
+                position = positions[-1]
+                end = offsets[node + 1]
+                while position < end:
+                    dependency = targets[position]
+                    position += 1
+                    if visit_order[dependency] == -1:
+                        break
+                    if on_stack[dependency] and visit_order[dependency] < lowlink[node]:
+                        lowlink[node] = visit_order[dependency]
+                else:
+                    nodes.pop()
+                    positions.pop()
+                    if nodes and lowlink[node] < lowlink[nodes[-1]]:
+                        lowlink[nodes[-1]] = lowlink[node]
+                    # The node is the root of a component, the component is on the top of the stack
+                    if lowlink[node] == visit_order[node]:
+                        component = list[int]()
+                        while True:
+                            member = stack.pop()
+                            on_stack[member] = 0
+                            component.append(member)
+                            if member == node:
+                                break
+                        component.reverse()
+                        components.append(component)
+                    continue
+                positions[-1] = position
+                visit_order[dependency] = lowlink[dependency] = visited_count
+                visited_count += 1
+                stack.append(dependency)
+                on_stack[dependency] = 1
+                nodes.append(dependency)
+                positions.append(offsets[dependency])
+        return components
+
+    # Strongly connected components of the projects and all their dependencies
+    # A component is listed after the components it depends on
+    def strongly_connected_components(self, projects: list["Project"]) -> list[list["Project"]]:
+        roots = self._indices(projects)
+        return [[self._projects[index] for index in component] for component in self._strongly_connected_components(roots)]
+
+    # Dependency cycles of the projects and all their dependencies, one strongly connected component per cycle
+    def cycles(self, projects: list["Project"]) -> list[list["Project"]]:
+        return [component for component in self.strongly_connected_components(projects)
+                if len(component) > 1 or any(dependency is component[0] for dependency in component[0].dependencies)]
+
+    # Print each cycle with the dependencies that create it and where they are described in 'kiss.yaml' files
+    @staticmethod
+    def print_cycles(cycles: list[list["Project"]]):
+        dependency_lines = dict[Path, dict[tuple[str, str], int]]()
+        for component in cycles:
+            members = {id(project) for project in component}
+            # Follow dependencies inside the component until a project is visited twice to show one cycle
+            path = [component[0]]
+            visited = {id(component[0]): 0}
+            while True:
+                dependency = next(dependency for dependency in path[-1].dependencies if id(dependency) in members)
+                if id(dependency) in visited:
+                    cycle = path[visited[id(dependency)]:] + [dependency]
+                    break
+                visited[id(dependency)] = len(path)
+                path.append(dependency)
+            console.print_error(f"Error: Cyclic dependency between {len(component)} projects : {' -> '.join(project.name for project in cycle)}")
+            for project in component:
+                if project.file not in dependency_lines:
+                    dependency_lines[project.file] = YamlProjectFile(project.file).load_dependency_lines()
+                for dependency in project.dependencies:
+                    if id(dependency) in members:
+                        line = dependency_lines[project.file].get((project.name, dependency.name))
+                        console.print_error(f"         '{project.name}' depends on '{dependency.name}' in {project.file}{f'({line})' if line else ''}")
+
+    # Depth first search from the root indices, an index is added when all its dependencies are added
+    # exit(1) if the graph contains a dependency cycle, all cycles are printed
+    def _sort(self, roots: list[int]) -> list[int]:
+        offsets, targets = self._offsets, self._targets
+        order = list[int]()
+        # 0: not visited, 1: on the current path, 2: in the order
+        state = bytearray(len(offsets) - 1)
+        for root in roots:
+            if state[root]:
+                continue
+            state[root] = 1
+            path = [root]
+            positions = [offsets[root]]
+            while path:
+                node = path[-1]
+                position = positions[-1]
+                end = offsets[node + 1]
+                while position < end:
+                    dependency = targets[position]
+                    position += 1
+                    if state[dependency] == 0:
+                        break
+                    if state[dependency] == 1:
+                        self.print_cycles(self.cycles([self._projects[index] for index in roots]))
+                        exit(1)
+                else:
+                    path.pop()
+                    positions.pop()
+                    state[node] = 2
+                    order.append(node)
+                    continue
+                positions[-1] = position
+                state[dependency] = 1
+                path.append(dependency)
+                positions.append(offsets[dependency])
+        return order
+
+    # The project and its dependencies sorted by priority order (if A depends on B, A comes after B)
+    # The project is the last one, the list must not be modified
+    def topological_order(self, project: "Project") -> list["Project"]:
+        self._check_cache()
+        root = self._index(project)
+        if (order := self._topological_orders.get(root)) is None:
+            self._build_arrays()
+            order = [self._projects[index] for index in self._sort([root])]
+            self._topological_orders[root] = order
+        return order
+
+    # All projects the project depends on, directly or not
+    def transitive_dependencies(self, project: "Project") -> frozenset["Project"]:
+        self._check_cache()
+        root = self._index(project)
+        if (dependencies := self._transitive_dependencies.get(root)) is None:
+            dependencies = frozenset(self.topological_order(project)[:-1])
+            self._transitive_dependencies[root] = dependencies
+        return dependencies
+
+    # Check if project depends on dependency, directly or not
+    def depends_on(self, project: "Project", dependency: "Project") -> bool:
+        return dependency in self.transitive_dependencies(project)
+
+    # Dependency levels of the projects and all their dependencies
+    # exit(1) if the graph contains a dependency cycle
+    def levels(self, projects: list["Project"]) -> DependencyLevels:
+        self._check_cache()
+        roots = self._indices(projects)
+        if (dependency_levels := self._levels.get(tuple(roots))) is not None:
+            return dependency_levels
+        offsets, targets, projects = self._offsets, self._targets, self._projects
+        depths = array("i", [0]) * (len(offsets) - 1)
+        levels = list[list["Project"]]()
+        project_depths = dict[int, int]()
+        # Dependencies are before the project in the topological order, so their depth is known
+        for index in self._sort(roots):
+            depth = 0
+            for dependency in targets[offsets[index]:offsets[index + 1]]:
+                if depths[dependency] >= depth:
+                    depth = depths[dependency] + 1
+            depths[index] = depth
+            if depth == len(levels):
+                levels.append([])
+            levels[depth].append(projects[index])
+            project_depths[id(projects[index])] = depth
+        dependency_levels = DependencyLevels(levels, project_depths)
+        self._levels[tuple(roots)] = dependency_levels
+        return dependency_levels
+
+    # The projects and all projects that depend on them, directly or not, in topological order
+    # Dependants are searched in all_projects
+    def dependants_closure(self, projects: list["Project"], all_projects: list["Project"]) -> list["Project"]:
+        candidates = self._indices(all_projects)
+        roots = self._indices(projects)
+        self._build_reverse_arrays()
+        reverse_offsets, reverse_targets = self._reverse_offsets, self._reverse_targets
+        # 1: can be affected, 2: affected
+        state = bytearray(len(reverse_offsets) - 1)
+        for index in candidates:
+            state[index] = 1
+        stack = list[int]()
+        for root in roots:
+            if state[root] != 2:
+                state[root] = 2
+                stack.append(root)
+        while stack:
+            index = stack.pop()
+            for dependant in reverse_targets[reverse_offsets[index]:reverse_offsets[index + 1]]:
+                if state[dependant] == 1:
+                    state[dependant] = 2
+                    stack.append(dependant)
+
+        # Keep the topological order of all affected projects
+        affected = [index for index in range(len(state)) if state[index] == 2]
+        return [self._projects[index] for index in self._sort(affected) if state[index] == 2]
+
+ProjectGraph = ProjectGraph()
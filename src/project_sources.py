@@ -0,0 +1,50 @@
+############################################################
+# Resolution of the sources of a project, shared by the CMake and ninja backends
+# A source is a file, or a path with a '*', '?' or '**' component that is resolved with glob
+# Sources keep their declaration order and duplicates are removed, dict keys are used as an ordered set
+############################################################
+from pathlib import Path
+from typing import Optional
+import console
+
+# Split the path at its first component with a wildcard: the directory before it, the component and the path after it
+# The component and the rest are None if the path has no wildcard
+def split_source_pattern(path: Path) -> tuple[Path, Optional[str], Optional[Path]]:
+    parts = path.parts
+    base = Path()
+    for i, part in enumerate(parts):
+        if '*' in part or '?' in part:
+            return base, str(part), Path(*parts[i+1:]) if i + 1 < len(parts) else None
+        base = base / part
+    return base, None, None
+
+def _resolve_glob_sources(base: Path, pattern: str, rest: Optional[Path]) -> dict[Path, None]:
+    all_files = dict[Path, None]()
+
+    if "**" in pattern:
+        pattern = pattern.replace("**", "**/*")
+
+    # glob the pattern from base, sorted because the order of glob depends on the file system
+    for f in sorted(base.glob(pattern)):
+        # It's a file, add it
+        if f.is_file():
+            all_files[f.resolve()] = None
+        # It's a directory and we have rest, apply the rest from the directory
+        elif f.is_dir() and rest:
+            all_files.update(_resolve_glob_sources(*split_source_pattern(f / rest)))
+    return all_files
+
+# Resolved files of the sources, None if a source without wildcard doesn't exist
+def resolve_sources(sources: list[Path], project_name: str) -> Optional[list[Path]]:
+    all_files = dict[Path, None]()
+    for source in sources:
+        base, pattern, rest = split_source_pattern(source)
+        if pattern:
+            all_files.update(_resolve_glob_sources(base, pattern, rest))
+        else:
+            if not source.exists():
+                console.print_error(f"Error when resolving the sources of {project_name}: file {source} not found")
+                return None
+            if base.is_file():
+                all_files[base.resolve()] = None
+    return list(all_files)
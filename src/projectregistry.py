@@ -1,84 +1,130 @@
 # ProjectRegistry represent all instanciation of project
 # A Project is linked with it's file, and a file can contains multiple project
 # To find a specific project you must provide a file to differenciate a project A that is in multiple file
+# Projects are indexed by name, by (file, name) and by directory to find them without iterating over all projects
+# Files are found with the workspace index of the directory, loaded projects are added to it
 from pathlib import Path
 import console
 from project import Project
-from yaml_file import YamlProjectFile, YamlProject
+from project_graph import ProjectGraph
+from yaml_file import PROJECT_FILE_NAME, intern_path, IndexedProjectDiscovery, YamlProjectFile, YamlProject
 
 class ProjectRegistry:
     def __init__(self):
         self.projects_: dict[Path, list[Project]] = {}
+        # Projects by name, in registration order
+        self._projects_by_name: dict[str, list[Project]] = {}
+        # Project by file and name
+        self._projects_by_file_and_name: dict[tuple[Path, str], Project] = {}
+        # File by directory of the file
+        self._file_by_directory: dict[Path, Path] = {}
+        # Projects by keys that a path dependency can match:
+        # - (name, path) when the dependency path is the project path
+        # - (name, directory) when the dependency path is the directory of the file where the project is described
+        self._projects_by_name_and_path: dict[tuple[str, Path], Project] = {}
+        self._projects_by_name_and_directory: dict[tuple[str, Path], Project] = {}
+
+    # Forget all registered projects
+    def clear(self):
+        self.__init__()
+        ProjectGraph.clear()
 
     def __contains__(self, path: Path) -> bool:
         return path in self.projects_
 
     def __iter__(self):
         return iter(self.projects_.items())
-    
+
     def items(self):
         return self.projects_.items()
-    
-    def get_project(self, project_name: Project) -> Project | None:
-        for path, project_type_list in self:
-            for project in project_type_list:
-                if project.name == project_name:
-                    return project
+
+    def get_project(self, project_name: str) -> Project | None:
+        if (projects := self._projects_by_name.get(project_name)):
+            return projects[0]
         return None
 
+    def get_project_in_file(self, file: Path, project_name: str) -> Project | None:
+        return self._projects_by_file_and_name.get((file, project_name))
+
     @property
     def projects(self) -> dict[Path, list[Project]]:
         return self.projects_
-    
+
     def paths(self):
         return self.projects_.keys()
-    
+
     def register_project(self, project: Project):
+        if (project.file, project.name) in self._projects_by_file_and_name:
+            console.print_warning(f"⚠️  Warning: Project already registered: {project.file}")
+            return
+        # The directory of the file is usually the path of the project, interning it keeps only one of them
+        directory = intern_path(project.file.parent)
         if project.file not in self.projects_:
             self.projects_[project.file] = list[Project]()
-        if project in self.projects_[project.file]:
-            console.print_warning(f"⚠️  Warning: Project already registered: {project.file}")
-        else:
-            self.projects_[project.file].append(project)
+            self._file_by_directory.setdefault(directory, project.file)
+        self.projects_[project.file].append(project)
+        self._projects_by_name.setdefault(project.name, []).append(project)
+        self._projects_by_file_and_name[(project.file, project.name)] = project
+        self._projects_by_name_and_path.setdefault((project.name, project.path), project)
+        self._projects_by_name_and_directory.setdefault((project.name, directory), project)
 
     def is_file_loaded(self, filepath:Path) -> bool:
         return filepath in self.projects_
-    
-    def load_and_register_all_project_in_directory(self, current_directory: Path, load_dependencies : bool, recursive: bool ):
-        # Load all yaml projects
-        list_all_yaml_project = YamlProjectFile.load_yaml_projects_in_directory(directory=current_directory, load_dependencies=load_dependencies, recursive=recursive).values()
-            
+
+    # Create and register projects of all yaml projects, then resolve their dependencies
+    # Projects that are already registered are not registered again
+    def register_yaml_projects(self, yaml_projects_per_file: dict[Path, list[YamlProject]]):
         # Create all projects
-        all_projects: set[(YamlProject, Project)] = set()
-        for yaml_project_list in list_all_yaml_project:
+        new_projects = list[tuple[YamlProject, Project]]()
+        for file, yaml_project_list in yaml_projects_per_file.items():
             for yaml_project in yaml_project_list:
-                all_projects.add((yaml_project, Project.from_yaml_project(yaml_project)))
+                if (file, yaml_project.name) in self._projects_by_file_and_name:
+                    continue
+                project = Project.from_yaml_project(yaml_project)
+                self.register_project(project)
+                new_projects.append((yaml_project, project))
 
         # Resolve dependencies match yaml dependency with corresponding projects
-        for yaml_project, project in all_projects:
+        for yaml_project, project in new_projects:
             for yaml_dep in yaml_project.dependencies:
-                resolved = False
-                for yaml_project_dep, project_dep in all_projects:
+                project_dep = None
+                # Path dependencies and resolved git dependencies are projects in a directory
+                if yaml_dep.path is not None:
                     # Check if Yaml match ( means we have a kiss.yaml in the depencency directory)
-                    # Or if the Yaml don't match, check if the yaml dependency name match the project name and the directory of that project (Where the kiss.yaml is)match the file directory of the project
+                    # Or if the Yaml don't match, check if the yaml dependency name match the project name and the directory of that project (Where the kiss.yaml is) match the file directory of the project
                     # We add this extra test to allow user to add a project as a dependency if this project is defined as a inner project (A/kiss.yml define a project 'B' in A/B directory)
-                    if yaml_project_dep.is_matching_yaml_dependency(yaml_dep) or (yaml_dep.name == project_dep.name and project_dep.file.parent == yaml_dep.path):
-                        project.dependencies.append(project_dep)
-                        resolved = True
-                        break
-                if not resolved:
+                    key = (yaml_dep.name, yaml_dep.path)
+                    project_dep = self._projects_by_name_and_path.get(key) or self._projects_by_name_and_directory.get(key)
+                if project_dep is None:
                     console.print_error(f"Failed to find project that match the {yaml_dep.type} dependency '{yaml_dep.name}' for the project '{yaml_project.name}' in file {yaml_project.file}")
                     exit(1)
-                    
-        # Register projects
-        for _, project in all_projects:
-            self.register_project(project)
-        
+                project.add_dependency(project_dep)
+
+    def load_and_register_all_project_in_directory(self, current_directory: Path, load_dependencies : bool, recursive: bool ):
+        # Load all yaml projects
+        yaml_projects_per_file = YamlProjectFile.load_yaml_projects_in_directory(directory=current_directory, load_dependencies=load_dependencies, recursive=recursive, discovery=IndexedProjectDiscovery())
+        self.register_yaml_projects(yaml_projects_per_file)
+
+    # Load and register only the project named project_name and its dependency closure
+    # The project is looked for in the 'kiss.yaml' file of the directory, then in the only file of the workspace index that describes it
+    # Returns None if the project is not found, the directory must then be walked
+    def load_and_register_project_closure(self, current_directory: Path, project_name: str) -> Project | None:
+        discovery = IndexedProjectDiscovery()
+        file = current_directory / PROJECT_FILE_NAME
+        if (yaml_projects_per_file := YamlProjectFile.load_yaml_project_closure(file=file, project_name=project_name)) is None:
+            # The index may be outdated, the project is searched again in the file
+            if len(files := discovery.index(current_directory).find_project_files(project_name)) != 1:
+                return None
+            file = files[0]
+            if (yaml_projects_per_file := YamlProjectFile.load_yaml_project_closure(file=file, project_name=project_name)) is None:
+                return None
+        discovery.projects_loaded(current_directory, yaml_projects_per_file, recursive=False)
+        self.register_yaml_projects(yaml_projects_per_file)
+        return self.get_project_in_file(file, project_name)
+
     def projects_in_directory(self, current_directory: Path) -> list[Project]:
-        for path, project_type_list in self.projects.items():
-            if path.parent != current_directory:
-                continue
-            return project_type_list
-        return []
-            
-ProjectRegistry = ProjectRegistry()
\ No newline at end of file
+        if (file := self._file_by_directory.get(current_directory)) is None:
+            return []
+        return self.projects_[file]
+
+ProjectRegistry = ProjectRegistry()
@@ -6,10 +6,11 @@ import copy
 
 #####################################################################
 # FlagList represent a list of flags used by the compiler or linker
+# Flags keep their declaration order, duplicates are removed
 #####################################################################
 class FlagList:
     def __init__(self):
-        self.flags = set[str]()
+        self.flags = dict[str, None]()
 
     def __iter__(self):
         return iter(self.flags)
@@ -21,13 +22,13 @@ class FlagList:
         return flag in self.flags
     
     def __repr__(self) -> str:
-        return repr(self.flags)
+        return repr(list(self.flags))
     
     def __str__(self) -> str:
-        return str(self.flags)
+        return str(list(self.flags))
     
     def add(self, flag:str):
-        self.flags.add(flag)
+        self.flags[flag] = None
 
     def get(self, name: str) -> str | None:
         for f in self.flags:
@@ -39,19 +40,20 @@ class FlagList:
         for f in flags:
             self.add(f)
 
-    # Merge, duplicate are removed
+    # Merge, flags of other come first, duplicate are removed
     def merge_with_other(self, other : Self) -> Self:
         merged = FlagList()
-        merged.flags = self.flags.union(other.flags)
+        merged.flags = dict.fromkeys([*other.flags, *self.flags])
         return merged
     
 
 ##############################################################
 # FeatureNameList are list of feature names
+# Feature names keep their declaration order, duplicates are removed
 ##############################################################
 class FeatureNameList:
     def __init__(self):
-        self.feature_names = set[str]()
+        self.feature_names = dict[str, None]()
      #   self.is_self_extended = False
         
     def __iter__(self):
@@ -64,13 +66,13 @@ class FeatureNameList:
         return feature_name in self.feature_names
     
     def __repr__(self) -> str:
-        return repr(self.feature_names)
+        return repr(list(self.feature_names))
     
     def __str__(self) -> str:
-        return str(self.feature_names)  
+        return str(list(self.feature_names))
       
     def add(self, feature_name:str):
-        self.feature_names.add(feature_name)
+        self.feature_names[feature_name] = None
 
     def get(self, name: str) -> str | None:
         for f in self.feature_names:
@@ -113,7 +115,7 @@ class FeatureNameList:
                         case str():
                             # We have one feature name in base and one in self
                             # We keep the one in self
-                            cleaned_list_base.feature_names.remove(base_feature_name)
+                            del cleaned_list_base.feature_names[base_feature_name]
                 # Multiple feature name is present in base that is also present in 'only-one' rule
                 case FeatureNameList() as mutliple_feature:
                     console.print_error(f"Rule '{FeatureRuleNodeOnlyOne.KEY}' invalidate feature list '{', '.join(list(mutliple_feature.feature_names))}' ")
@@ -121,8 +123,8 @@ class FeatureNameList:
                 case None:
                     pass
 
-        # Merge cleaned_list_base and self
-        merged.feature_names = cleaned_list_base.feature_names.union(self.feature_names)
+        # Merge cleaned_list_base and self, features of base come first
+        merged.feature_names = dict.fromkeys([*cleaned_list_base.feature_names, *self.feature_names])
         # Check that merge feature_names validate feature-rules before merging
         if not compiler_feature_rules.is_feature_list_validate_rules(merged.feature_names):
             console.print_error(f"Rule invalidate feature list '{', '.join(list(merged.feature_names))}' ")
@@ -547,7 +549,8 @@ class ExtendsCyclicError(Exception):
 ######################################################
 class ProfileNodeList:
     def __init__(self):
-        self.profiles: set[ProfileNode] = set()
+        # Profiles keep their declaration order
+        self.profiles: list[ProfileNode] = list()
 
     def __iter__(self):
         return iter(self.profiles)
@@ -566,7 +569,8 @@ class ProfileNodeList:
         return False
     
     def add(self, profile:ProfileNode):
-        self.profiles.add(profile)
+        if profile not in self.profiles:
+            self.profiles.append(profile)
 
     def get(self, item: str | ProfileNode) -> Optional[ProfileNode]:
         if isinstance(item, str):
@@ -672,20 +676,20 @@ class ProfileNodeList:
                          compiler_feature_rules: 'FeatureRuleNodeList') -> Optional[Self]:
         merged = ProfileNodeList()
 
-        # Get elements in self AND other_profile_list
-        common_profile_list : set[ProfileNode] = self.profiles.intersection(other_profile_list.profiles)
-        # Get elements not in self and other_profile_list
-        non_commons_profile_list : set[ProfileNode] = self.profiles.symmetric_difference(other_profile_list.profiles)
-
-        # Merge common project type
-        for common_profile in common_profile_list:
-            if(extended_existing_profile:= self.get(common_profile).merge_with_other(other=other_profile_list.get(common_profile),
-                                                                                     compiler_feature_rules=compiler_feature_rules)) is None:
-                    return None
-            merged.add(extended_existing_profile)
-
-        # Just add non common
-        merged.profiles.update(non_commons_profile_list)
+        # Profiles of other_profile_list come first, then profiles only in self
+        for other_profile in other_profile_list.profiles:
+            # Merge common profile
+            if other_profile in self.profiles:
+                if(extended_existing_profile:= self.get(other_profile).merge_with_other(other=other_profile,
+                                                                                        compiler_feature_rules=compiler_feature_rules)) is None:
+                        return None
+                merged.add(extended_existing_profile)
+            # Just add non common
+            else:
+                merged.add(other_profile)
+        for profile in self.profiles:
+            if profile not in other_profile_list.profiles:
+                merged.add(profile)
 
         # for profile in other_profile_list.profiles:
         #     existing_profile = self.get(profile.name)
@@ -804,7 +808,7 @@ class FeatureRuleNodeOnlyOne(FeatureRuleNode):
         self.feature_list = FeatureNameList()
 
     def evaluate(self, feature_list: FeatureNodeList) -> ResultOnlyOne:
-        common = self.feature_list.feature_names.intersection(feature_list)
+        common = [feature_name for feature_name in self.feature_list.feature_names if feature_name in feature_list]
         match len(common):
             case 0:
                 return None
@@ -812,7 +816,7 @@ class FeatureRuleNodeOnlyOne(FeatureRuleNode):
                 return next(iter(common))
             case _:
                 result = FeatureNameList()
-                result.add_list(list(common))
+                result.add_list(common)
                 return result
     def is_satisfied(self, enabled_features: FeatureNodeList) -> bool:
         return self.evaluate(enabled_features) is str()
@@ -847,7 +851,7 @@ class FeatureRuleNodeIncompatibleWith(FeatureRuleNode):
 
     def is_satisfied(self, enabled_features: FeatureNodeList) -> FeatureNodeList:
         if self.feature_name in enabled_features:
-            incompatible_features = self.incompatible_with.feature_names.intersection(enabled_features)
+            incompatible_features = [feature_name for feature_name in self.incompatible_with.feature_names if feature_name in enabled_features]
             if incompatible_features:
                 return incompatible_features
         return set()
@@ -1397,6 +1401,9 @@ class CompilerNodeRegistry:
             exit(1)
         self.file_compiler_list.add(file_compiler_list)
 
+    def clear(self):
+        self.file_compiler_list.clear()
+
 
 
 CompilerNodeRegistry = CompilerNodeRegistry()
@@ -10,9 +10,9 @@ class ProjectType:
     def __init__(
         self,
         name: str,
-        cxx_linker_flags: set[str],
-        cxx_compiler_flags: set[str],
-        enabled_feature_list: set[str],
+        cxx_linker_flags: list[str],
+        cxx_compiler_flags: list[str],
+        enabled_feature_list: list[str],
     ):
         self.name = name
         self.cxx_linker_flags = cxx_linker_flags
@@ -66,9 +66,9 @@ class Profile:
         # Project type specific flags and features
         self.project_type_list = ProjectList()
         # Default flags and features that is not specific to a project type
-        self.cxx_linker_flags = set[str]()
-        self.cxx_compiler_flags = set[str]()
-        self.enabled_feature_list = set[str]()
+        self.cxx_linker_flags = list[str]()
+        self.cxx_compiler_flags = list[str]()
+        self.enabled_feature_list = list[str]()
 
     def __hash__(self) -> int:
         return hash(self.name)
@@ -100,7 +100,8 @@ class Profile:
     
 class ProfileList:
     def __init__(self):
-        self.profiles: set[Profile] = set()
+        # Profiles keep their declaration order
+        self.profiles: list[Profile] = list()
     
     def __iter__(self):
         return iter(self.profiles)
@@ -115,7 +116,8 @@ class ProfileList:
         return item in self.profiles
     
     def add(self, profile:Profile):
-        self.profiles.add(profile)
+        if profile not in self.profiles:
+            self.profiles.append(profile)
 
     def get(self, name: str) -> Optional[Profile]:
         for p in self.profiles:
@@ -139,6 +141,11 @@ class Compiler:
         # The compiler info node from which the compiler is created
         self._compiler_info = compiler_info
     
+    # The toolchain yaml file that describes the compiler
+    @property
+    def file_path(self) -> Path:
+        return self._compiler_info.file_path
+
     def is_based_on(self, compiler_name: Self) -> bool:
         return  self._compiler_info.is_based_on(compiler_name)
 
@@ -208,13 +215,11 @@ class Compiler:
             if not profile.is_abstract:
                 new_profile = Profile(profile.name)
                 # Each profile contains a per project flags and commons to all project flags
+                # Flags keep their declaration order and duplicates are removed, dict keys are used as an ordered set
                 for project_type in profile.project_type_list:
-                    cxx_compiler_flags = set()
-                    cxx_linker_flags = set()
-                    enabled_feature_list = set()
-                    cxx_compiler_flags.update(project_type.commons.cxx_compiler_flags)
-                    cxx_linker_flags.update(project_type.commons.cxx_linker_flags)
-                    enabled_feature_list.update(project_type.commons.enable_features_list)
+                    cxx_compiler_flags = dict.fromkeys(project_type.commons.cxx_compiler_flags)
+                    cxx_linker_flags = dict.fromkeys(project_type.commons.cxx_linker_flags)
+                    enabled_feature_list = dict.fromkeys(project_type.commons.enable_features_list)
 
                     # Add all features enabled by features
                     for feature_name in project_type.commons.enable_features_list:
@@ -224,15 +229,15 @@ class Compiler:
                         feature_node : FeatureNode = feature_node
                         if (profile_node := feature_node.profile_list.get(profile.name)):
                             if( project_type_node := profile_node.project_type_list.get(project_type.name)):
-                                cxx_compiler_flags.update(project_type_node.commons.cxx_compiler_flags)
-                                cxx_linker_flags.update(project_type_node.commons.cxx_linker_flags)
-                        cxx_linker_flags.update(feature_node.commons.cxx_linker_flags)
-                        enabled_feature_list.update(feature_node.commons.enable_features_list)
+                                cxx_compiler_flags.update(dict.fromkeys(project_type_node.commons.cxx_compiler_flags))
+                                cxx_linker_flags.update(dict.fromkeys(project_type_node.commons.cxx_linker_flags))
+                        cxx_linker_flags.update(dict.fromkeys(feature_node.commons.cxx_linker_flags))
+                        enabled_feature_list.update(dict.fromkeys(feature_node.commons.enable_features_list))
 
                     new_profile.project_type_list.add(ProjectType(name=project_type.project_type_name,
-                                                     cxx_linker_flags=cxx_linker_flags,
-                                                     cxx_compiler_flags=cxx_compiler_flags,
-                                                     enabled_feature_list=enabled_feature_list))
+                                                     cxx_linker_flags=list(cxx_linker_flags),
+                                                     cxx_compiler_flags=list(cxx_compiler_flags),
+                                                     enabled_feature_list=list(enabled_feature_list)))
                 new_compiler.profiles.add(new_profile)
         return new_compiler
     
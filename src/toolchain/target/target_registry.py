@@ -178,4 +178,7 @@ class TargetRegistry:
     def target_name_list(self) -> list[str] : 
         return [t.name for t in self.targets]
 
+    def clear(self):
+        self.targets = TargetList()
+
 TargetRegistry = TargetRegistry()
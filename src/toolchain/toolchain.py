@@ -5,7 +5,7 @@ import os
 from pathlib import Path
 from typing import Self
 import console
-from toolchain.compiler import Compiler
+from toolchain.compiler import Compiler, CompilerNodeRegistry
 from toolchain.compiler.compiler_registry import Profile
 from toolchain.target import Target
 from toolchain.target.target_registry import TargetRegistry
@@ -91,6 +91,16 @@ class Toolchain:
             toolchain_file = ToolchainYamlFile(file)
             toolchain_file.load_yaml()
         
+    # Forget all loaded toolchains and load the yaml files of the directory again
+    @staticmethod
+    def reload_all_toolchains_in_directory(directory: Path) -> bool :
+        CompilerNodeRegistry.clear()
+        TargetRegistry.clear()
+        for cls, attribute in ((Toolchain, "_default_toolchain"), (Compiler, "_default_compiler_name")):
+            if hasattr(cls, attribute):
+                delattr(cls, attribute)
+        return Toolchain.load_all_toolchains_in_directory(directory)
+
     @staticmethod
     def default_target_name() -> Target:
         return Target.default_target_name()
@@ -0,0 +1,155 @@
+
+############################################################
+# ToolchainDigest identifies what a toolchain changes in the generated files and in the build:
+# - configuration: the target, the flags and features of the profiles resolved by the compiler,
+#   and the content of the toolchain yaml file that describes the compiler.
+#   When it changes, CMakeLists.txt files must be generated again.
+# - compiler: the identity of the compiler binaries, their path, size, modification time and version.
+#   When it changes, CMake must detect the compiler again and every object must be compiled again.
+# Versions of compiler binaries are cached by path, size and modification time, so the compiler is run only once after it changes.
+############################################################
+import hashlib
+import json
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional, Self
+import console
+from cache import cache_directory
+from toolchain.compiler.compiler_registry import Profile
+from toolchain.toolchain import Toolchain
+
+COMPILER_VERSION_CACHE_FILE = Path("compiler_versions.json")
+
+def _digest(data) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+class CompilerVersionCache:
+    def __init__(self):
+        self._versions: Optional[dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_file(self) -> Path:
+        return cache_directory() / COMPILER_VERSION_CACHE_FILE
+
+    def _load(self):
+        if self._versions is not None:
+            return
+        try:
+            with self.cache_file.open("r", encoding="utf-8") as f:
+                self._versions = json.load(f)
+        except (OSError, ValueError):
+            self._versions = {}
+        if not isinstance(self._versions, dict):
+            self._versions = {}
+
+    def _save(self):
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temporary_file = self.cache_file.with_name(f"{self.cache_file.name}.{threading.get_ident()}.tmp")
+            with temporary_file.open("w", encoding="utf-8") as f:
+                json.dump(self._versions, f)
+            temporary_file.replace(self.cache_file)
+        except OSError as e:
+            console.print_warning(f"⚠️  Warning: Unable to save {self.cache_file}: {e}")
+
+    # Version printed by the compiler, cl and clang-cl print their version without argument
+    @staticmethod
+    def _run_version(path: Path, arguments: list[str]) -> str:
+        try:
+            result = subprocess.run([str(path)] + arguments, capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            return f"error: {e}"
+        return (result.stdout + result.stderr).strip()
+
+    def version(self, path: Path, size: int, mtime_ns: int, arguments: list[str]) -> str:
+        key = f"{path}|{size}|{mtime_ns}|{' '.join(arguments)}"
+        with self._lock:
+            self._load()
+            if (version := self._versions.get(key)) is not None:
+                return version
+        version = self._run_version(path, arguments)
+        with self._lock:
+            self._versions[key] = version
+            self._save()
+        return version
+
+CompilerVersionCache = CompilerVersionCache()
+
+class ToolchainDigest:
+    def __init__(self, configuration: str, compiler: str):
+        self._configuration = configuration
+        self._compiler = compiler
+
+    # Digest of the target, flags and toolchain file
+    @property
+    def configuration(self) -> str:
+        return self._configuration
+
+    # Digest of the compiler binaries
+    @property
+    def compiler(self) -> str:
+        return self._compiler
+
+    # Flags keep their order, the order of flags on the command line matters
+    @staticmethod
+    def _profile_data(profile: Profile) -> dict:
+        return {
+            "name": profile.name,
+            "cxx_compiler_flags": list(profile.cxx_compiler_flags),
+            "cxx_linker_flags": list(profile.cxx_linker_flags),
+            "features": list(profile.enabled_feature_list),
+            "project_types": sorted(({
+                "name": project_type.name,
+                "cxx_compiler_flags": list(project_type.cxx_compiler_flags),
+                "cxx_linker_flags": list(project_type.cxx_linker_flags),
+                "features": list(project_type.enabled_feature_list)
+            } for project_type in profile.project_type_list), key=lambda data: data["name"])
+        }
+
+    @staticmethod
+    def _file_digest(file: Optional[Path]) -> Optional[str]:
+        try:
+            return hashlib.sha256(Path(file).read_bytes()).hexdigest() if file else None
+        except OSError:
+            return None
+
+    # Path, size, modification time and version of the compiler binary
+    @staticmethod
+    def _binary_identity(path: Optional[Path], version_arguments: list[str]) -> Optional[dict]:
+        if not path or path == Path():
+            return None
+        if (found_path := shutil.which(str(path))) is None:
+            return {"path": str(path)}
+        found_path = Path(found_path).resolve()
+        try:
+            stat = found_path.stat()
+        except OSError:
+            return {"path": str(found_path)}
+        return {
+            "path": str(found_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "version": CompilerVersionCache.version(found_path, stat.st_size, stat.st_mtime_ns, version_arguments)
+        }
+
+    # Digest of the toolchain for the profiles
+    @classmethod
+    def create(cls, toolchain: Toolchain, profile_names: list[str]) -> Self:
+        compiler = toolchain.compiler
+        target = toolchain.target
+        profiles = [profile for profile_name in sorted(set(profile_names)) if (profile := toolchain.get_profile(profile_name)) is not None]
+        configuration = {
+            "target": [target.name, target.arch, target.vendor, target.os, target.abi],
+            "compiler": compiler.name,
+            "toolchain_file": cls._file_digest(compiler.file_path),
+            "profiles": [cls._profile_data(profile) for profile in profiles]
+        }
+        version_arguments = [] if compiler.is_cl_based() or compiler.is_clangcl_based() else ["--version"]
+        binaries = {
+            "cxx": cls._binary_identity(compiler.cxx_path, version_arguments),
+            "c": cls._binary_identity(compiler.c_path, version_arguments)
+        }
+        return cls(configuration=_digest(configuration), compiler=_digest(binaries))
@@ -2,12 +2,20 @@
 
 # YamlProjectFile is the instanciation of one kiss.yaml file.
 # It is use to load, read, modify and save the yaml file.
+from concurrent.futures import ProcessPoolExecutor
+import os
 from pathlib import Path
-from typing import Optional, Self
+from typing import Iterable, Optional, Self
 import semver
 import yaml
 import console
-from yaml_file.yaml_project import PROJECT_FILE_NAME, YamlBinProject, YamlDependency, YamlDependencyType, YamlDynProject, YamlGitDependency, YamlLibProject, YamlPathDependency, YamlProject, YamlProjectType
+from yaml_file.git_mirror import GIT_CACHE_DIRECTORY, GitMirrorCache, GitMirrorError
+from yaml_file.line_loader import LineLoader, SafeLoader
+from yaml_file.lock_file import LOCK_FILE_NAME, LockFile, apply_lock_file
+from yaml_file.manifest_cache import ManifestCache
+from yaml_file.project_discovery import KISS_IGNORE_FILE_NAME, DirectoryListing, KissIgnore, ProjectDiscovery
+from yaml_file.workspace_index import WORKSPACE_INDEX_FILE, IndexedProjectDiscovery, WorkspaceIndex
+from yaml_file.yaml_project import PROJECT_FILE_NAME, intern_path, YamlBinProject, YamlDependency, YamlDependencyType, YamlDynProject, YamlGitDependency, YamlLibProject, YamlPathDependency, YamlProject, YamlProjectType
 
 # Valid root keys in the YAML file
 _VALID_YAML_ROOT = [str(YamlProjectType.bin), str(YamlProjectType.dyn), str(YamlProjectType.lib), str(YamlProjectType.workspace)]
@@ -34,12 +42,32 @@ class YamlProjectFile:
     def load_yaml(self) -> bool:
         try:
             with self.file.open() as f:
-                self._yaml = yaml.safe_load(f)
+                self._yaml = yaml.load(f, Loader=SafeLoader)
             return True
         except (OSError, yaml.YAMLError) as e:
             console.print_error(f"Error: When loading {self.file} file: {e}")
             return False
         
+    # Load the line of each dependency by (project name, dependency name)
+    # The file is parsed again with line numbers, it is used to report errors
+    def load_dependency_lines(self) -> dict[tuple[str, str], int]:
+        lines = dict[tuple[str, str], int]()
+        try:
+            with self.file.open() as f:
+                data = yaml.load(f, Loader=LineLoader)
+        except (OSError, yaml.YAMLError):
+            return lines
+        if not isinstance(data, dict):
+            return lines
+        for key in _VALID_YAML_ROOT:
+            for yaml_project in getattr(data.get(key), "value", None) or []:
+                if not isinstance(yaml_project, dict) or "name" not in yaml_project:
+                    continue
+                for dependency in getattr(yaml_project.get("dependencies"), "value", None) or []:
+                    if isinstance(dependency, dict) and "name" in dependency:
+                        lines.setdefault((yaml_project["name"].value, dependency["name"].value), dependency["name"].key_line)
+        return lines
+
     # Save the current yaml dictionary to the file
     def save_yaml(self) -> bool:
         try:
@@ -103,7 +131,8 @@ class YamlProjectFile:
             # Read git if any
             if dep_git:
                 branch = dependency.get("branch")
-                dependencies.append(YamlGitDependency(dep_name, dep_git, branch))
+                commit = dependency.get("commit")
+                dependencies.append(YamlGitDependency(dep_name, dep_git, branch, commit))
 
             # If no path is given, the default behaviour is that path is the name of dependency
             elif dep_path:
@@ -174,9 +203,38 @@ class YamlProjectFile:
           
         return projects
     
+    @staticmethod
+    def _print_missing_dependency_error(yaml_project: YamlProject, path_dependency: YamlPathDependency):
+        console.print_error(f"Error: Failed to load dependency '{path_dependency.name}' for project '{yaml_project.name}'.\n\n" +
+                            f"Possible causes:\n" + 
+                            f"1. The file '{PROJECT_FILE_NAME}' is missing in:\n" + 
+                            f"   {path_dependency.path}\n\n" +
+                            f"2. The dependency '{path_dependency.name}' is not declared in:\n" + 
+                            f"   {yaml_project.file}\n" +
+                            f"   or the 'path' attributs is not set.\n\n")
+
+        console.print_tips( f"Tips:\n" + 
+                            f"Each dependency must:\n"+
+                            f"  - Have a '{PROJECT_FILE_NAME}' file in its root path of the dependency, or\n" + 
+                            f"  - Be declared in the '{PROJECT_FILE_NAME}' of the project that depends on it. note that 'path' is required in this case.")
+
+    @staticmethod
+    def _print_missing_git_project_file_error(yaml_project: YamlProject, git_dependency: YamlGitDependency):
+        console.print_error(f"Error: Failed to load git dependency '{git_dependency.name}' for project '{yaml_project.name}'.\n" +
+                            f"The file '{PROJECT_FILE_NAME}' is missing at the root of {git_dependency.git} ({git_dependency.revision}) checked out in:\n" +
+                            f"   {git_dependency.path}")
+
+    # Resolve the checkout directory of git dependencies of all projects, repositories are fetched concurrently
+    @staticmethod
+    def _resolve_git_dependencies(yaml_projects: Iterable[YamlProject]):
+        git_dependencies = [dependency for yaml_project in yaml_projects for dependency in yaml_project.dependencies if dependency.type == YamlDependencyType.git]
+        if not GitMirrorCache.resolve(git_dependencies):
+            exit(1)
+
     @classmethod
     def _load_yaml_dependency(cls, loaded_yaml_projects: dict[Path, list[YamlProject]], yaml_projects_in_file: list[YamlProject]) -> dict[Path, list[YamlProject]]:
         yaml_dependency_projects: dict[Path, list[YamlProject]] = {}
+        YamlProjectFile._resolve_git_dependencies(yaml_projects_in_file)
 
         for yaml_project in yaml_projects_in_file:
             for dependency in yaml_project.dependencies:
@@ -194,49 +252,73 @@ class YamlProjectFile:
                             
                             # Oops… we don’t have a dependency YAML in the project or in the root of the dependency path.
                             if not file_in_directory.exists():
-                                console.print_error(f"Error: Failed to load dependency '{path_dependency.name}' for project '{yaml_project.name}'.\n\n" +
-                                                    f"Possible causes:\n" + 
-                                                    f"1. The file '{PROJECT_FILE_NAME}' is missing in:\n" + 
-                                                    f"   {path_dependency.path}\n\n" +
-                                                    f"2. The dependency '{path_dependency.name}' is not declared in:\n" + 
-                                                    f"   {yaml_project.file}\n" +
-                                                    f"   or the 'path' attributs is not set.\n\n")
-  
-                                console.print_tips( f"Tips:\n" + 
-                                                    f"Each dependency must:\n"+
-                                                    f"  - Have a '{PROJECT_FILE_NAME}' file in its root path of the dependency, or\n" + 
-                                                    f"  - Be declared in the '{PROJECT_FILE_NAME}' of the project that depends on it. note that 'path' is required in this case.")
+                                YamlProjectFile._print_missing_dependency_error(yaml_project, path_dependency)
                                 exit(1)
                             else:
                                 # Don't reload the file if already loaded
                                 if file_in_directory in loaded_yaml_projects or file_in_directory in yaml_dependency_projects:
                                     continue
                                 
-                                # Load the yaml
-                                yaml = YamlProjectFile(file_in_directory)
-                                if not yaml.load_yaml():
-                                    console.print_error(f"⚠️ Error: Unable to load project file `{file_in_directory}`")
-                                    exit(1)
-
                                 # Load yaml projects and save them in the dependency set
-                                for yaml_project_deps in yaml._read_all_projects_in_file():
+                                for yaml_project_deps in YamlProjectFile.read_projects_in_file(file_in_directory):
                                     yaml_dependency_projects.setdefault(file_in_directory, []).append(yaml_project_deps)
                                     
 
                     case YamlDependencyType.git:
-                        # Clone the repo and tr to load yaml file or request for a project in dependent project
-                        dependency: YamlGitDependency = dependency
-                        pass
+                        # The repository is checked out, load the yaml file at its root
+                        git_dependency: YamlGitDependency = dependency
+                        file_in_directory = git_dependency.path / PROJECT_FILE_NAME
+                        if not file_in_directory.exists():
+                            YamlProjectFile._print_missing_git_project_file_error(yaml_project, git_dependency)
+                            exit(1)
+                        # Don't reload the file if already loaded
+                        if file_in_directory in loaded_yaml_projects or file_in_directory in yaml_dependency_projects:
+                            continue
+                        for yaml_project_deps in YamlProjectFile.read_projects_in_file(file_in_directory):
+                            yaml_dependency_projects.setdefault(file_in_directory, []).append(yaml_project_deps)
         return yaml_dependency_projects
 
+    # Read all YamlProject in a file
+    # The file is parsed only if it changed since the last time it was read
+    @staticmethod
+    def read_projects_in_file(file: Path) -> list[YamlProject]:
+        if (yaml_projects := ManifestCache.get(file)) is not None:
+            return yaml_projects
+
+        yaml_projects = _parse_projects_in_file(file)
+        ManifestCache.put(file, yaml_projects)
+        return yaml_projects
+
+    # Read all YamlProject in each file
+    # Files that are not in the manifest cache are parsed concurrently by 'jobs' processes (0 means one process per CPU)
+    # The result keeps the order of files
+    @staticmethod
+    def read_projects_in_files(files: list[Path], jobs: int) -> dict[Path, list[YamlProject]]:
+        yaml_projects_per_file: dict[Path, Optional[list[YamlProject]]] = {file: ManifestCache.get(file) for file in files}
+        files_to_parse = [file for file, yaml_projects in yaml_projects_per_file.items() if yaml_projects is None]
+
+        max_workers = min(jobs if jobs > 0 else os.cpu_count() or 1, len(files_to_parse))
+        if max_workers > 1:
+            chunksize = max(1, len(files_to_parse) // (max_workers * 4))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                parsed_yaml_projects = executor.map(_parse_projects_in_file, files_to_parse, chunksize=chunksize)
+        else:
+            parsed_yaml_projects = map(_parse_projects_in_file, files_to_parse)
+
+        for file, yaml_projects in zip(files_to_parse, parsed_yaml_projects):
+            ManifestCache.put(file, yaml_projects)
+            yaml_projects_per_file[file] = yaml_projects
+        return yaml_projects_per_file
+
     # Load all YamlProject in a file and add them to yaml_projects
     # When load_dependencies is True, also load YamlProject of dependencies
+    # yaml_projects_in_file can be given if the file is already read
     @staticmethod
-    def load_yaml_projects(yaml_file: Self, loaded_yaml_projects: dict[Path, list[YamlProject]], load_dependencies : bool):
+    def load_yaml_projects(file: Path, loaded_yaml_projects: dict[Path, list[YamlProject]], load_dependencies : bool, yaml_projects_in_file: Optional[list[YamlProject]] = None):
         # Load yaml projects
-        new_yaml_projects_in_file: list[YamlProject] = yaml_file._read_all_projects_in_file()
+        new_yaml_projects_in_file: list[YamlProject] = yaml_projects_in_file if yaml_projects_in_file is not None else YamlProjectFile.read_projects_in_file(file)
         for yaml_project in new_yaml_projects_in_file:
-            loaded_yaml_projects.setdefault(yaml_file.file, []).append(yaml_project)
+            loaded_yaml_projects.setdefault(file, []).append(yaml_project)
 
         # Load dependencies if requested
         if load_dependencies:
@@ -252,33 +334,119 @@ class YamlProjectFile:
                 # Load all dependencies of dependencies
                 yaml_dependency_projects_old = yaml_dependency_projects
                 yaml_dependency_projects = {}
+                # Fetch git dependencies of all files at the same time
+                YamlProjectFile._resolve_git_dependencies(yaml_project for yaml_dependency in yaml_dependency_projects_old.values() for yaml_project in yaml_dependency)
                 for dependency_file, yaml_dependency in yaml_dependency_projects_old.items():
                     for dependency_file2, yaml_dependencies in YamlProjectFile._load_yaml_dependency(loaded_yaml_projects, yaml_dependency).items():
                         for dep2 in yaml_dependencies:
                             yaml_dependency_projects.setdefault(dependency_file2, []).append(dep2)
 
+    # Load the YamlProject of the files locked by the 'kiss.lock' file of the directory, None if there is no lock file or if it is outdated
+    # The locked files are read without walking the dependencies, git dependencies are resolved to the locked commits
+    @staticmethod
+    def _load_locked_yaml_projects(directory: Path, jobs: int = 1) -> Optional[dict[Path, list[YamlProject]]]:
+        if (lock_file := apply_lock_file(directory)) is None:
+            return None
+        if (yaml_projects_per_file := ManifestCache.get_locked_graph(directory, lock_file.digest)) is not None:
+            return yaml_projects_per_file
+        # A git dependency that is not checked out yet is checked out by walking the dependencies
+        if (files := lock_file.project_files()) is None:
+            return None
+        yaml_projects_per_file = YamlProjectFile.read_projects_in_files(files, jobs)
+        YamlProjectFile._resolve_git_dependencies(yaml_project for yaml_projects in yaml_projects_per_file.values() for yaml_project in yaml_projects)
+        ManifestCache.put_locked_graph(directory, lock_file.digest, yaml_projects_per_file)
+        return yaml_projects_per_file
+
+    # Load the YamlProject named project_name in a file and the YamlProject of its dependencies, recursively
+    # Only projects of the dependency closure are returned, other projects of the visited files are ignored
+    # Returns None if the file does not contain the project
+    @staticmethod
+    def load_yaml_project_closure(file: Path, project_name: str) -> Optional[dict[Path, list[YamlProject]]]:
+        if not file.is_file():
+            return None
+        # With an up to date lock file, all files of the closure are already read and git dependencies are resolved
+        if (locked_yaml_projects := YamlProjectFile._load_locked_yaml_projects(file.parent)) is not None and file not in locked_yaml_projects:
+            locked_yaml_projects = None
+        yaml_projects_per_file: dict[Path, list[YamlProject]] = dict(locked_yaml_projects or {file: YamlProjectFile.read_projects_in_file(file)})
+        if (yaml_project := next((p for p in yaml_projects_per_file[file] if p.name == project_name), None)) is None:
+            return None
+
+        # Walk the dependencies from the project level by level, each project is visited once
+        visited: set[tuple[Path, str]] = {(file, project_name)}
+        frontier: list[YamlProject] = [yaml_project]
+        while frontier:
+            # Fetch git dependencies of the level at the same time
+            if locked_yaml_projects is None:
+                YamlProjectFile._resolve_git_dependencies(frontier)
+            next_frontier = list[YamlProject]()
+            for yaml_project, dependency in ((yaml_project, dependency) for yaml_project in frontier for dependency in yaml_project.dependencies):
+                yaml_dependency = None
+                match dependency.type:
+                    case YamlDependencyType.path:
+                        path_dependency: YamlPathDependency = dependency
+                        # Search for the project in the project file first, then in the file of the dependency path
+                        yaml_dependency = next((p for p in yaml_projects_per_file[yaml_project.file] if p.is_matching_yaml_dependency(path_dependency)), None)
+                        if not yaml_dependency:
+                            file_in_directory = path_dependency.path / PROJECT_FILE_NAME
+                            if file_in_directory not in yaml_projects_per_file:
+                                if not file_in_directory.exists():
+                                    YamlProjectFile._print_missing_dependency_error(yaml_project, path_dependency)
+                                    exit(1)
+                                yaml_projects_per_file[file_in_directory] = YamlProjectFile.read_projects_in_file(file_in_directory)
+                            yaml_dependency = next((p for p in yaml_projects_per_file[file_in_directory] 
+                                                    if p.is_matching_yaml_dependency(path_dependency) or (p.name == path_dependency.name and p.file.parent == path_dependency.path)), None)
+                    case YamlDependencyType.git:
+                        git_dependency: YamlGitDependency = dependency
+                        file_in_directory = git_dependency.path / PROJECT_FILE_NAME
+                        if file_in_directory not in yaml_projects_per_file:
+                            if not file_in_directory.exists():
+                                YamlProjectFile._print_missing_git_project_file_error(yaml_project, git_dependency)
+                                exit(1)
+                            yaml_projects_per_file[file_in_directory] = YamlProjectFile.read_projects_in_file(file_in_directory)
+                        yaml_dependency = next((p for p in yaml_projects_per_file[file_in_directory] if p.is_matching_yaml_dependency(git_dependency) or p.name == git_dependency.name), None)
+                # A dependency that is not found is reported when projects are registered
+                if yaml_dependency and (yaml_dependency.file, yaml_dependency.name) not in visited:
+                    visited.add((yaml_dependency.file, yaml_dependency.name))
+                    next_frontier.append(yaml_dependency)
+            frontier = next_frontier
+
+        ManifestCache.save()
+        # Keep the order of projects in files
+        return {file_path: [p for p in yaml_projects if (file_path, p.name) in visited] for file_path, yaml_projects in yaml_projects_per_file.items()
+                if any((file_path, p.name) in visited for p in yaml_projects)}
+
     # Load all YamlProject in a directory.
-    # When load_dependencies is True, also load YamlProject of dependencies
+    # When load_dependencies is True, also load YamlProject of dependencies, from the 'kiss.lock' file if use_lock_file is True
     # When recursive is true, also load YamlProject in child directories 
+    # discovery is used to find files in child directories, by default build directories and '.kissignore' patterns are skipped
+    # jobs is the number of processes used to parse files found in the directory (0 means one process per CPU)
     @staticmethod
-    def load_yaml_projects_in_directory(directory: Path, load_dependencies : bool, recursive: bool) -> dict[Path, list[YamlProject]]:
+    def load_yaml_projects_in_directory(directory: Path, load_dependencies : bool, recursive: bool, discovery: Optional[ProjectDiscovery] = None, jobs: int = 1, use_lock_file: bool = True) -> dict[Path, list[YamlProject]]:
         loaded_yaml_projects :dict[Path, list[YamlProject]] = {}
+        discovery = discovery or ProjectDiscovery()
+
+        if load_dependencies and use_lock_file:
+            # The lock file locks the projects of the directory only, projects of child directories are walked with the locked commits
+            if recursive:
+                apply_lock_file(directory)
+            elif (locked_yaml_projects := YamlProjectFile._load_locked_yaml_projects(directory, jobs)) is not None:
+                discovery.projects_loaded(directory, locked_yaml_projects, recursive)
+                ManifestCache.save()
+                return locked_yaml_projects
 
-        pattern = f"**/{PROJECT_FILE_NAME}" if recursive else PROJECT_FILE_NAME
+        # Read all files found in the directory
+        yaml_projects_per_file = YamlProjectFile.read_projects_in_files(discovery.find_project_files(directory, recursive), jobs)
 
         # Load modules
-        for file in directory.glob(pattern):
+        for file, yaml_projects_in_file in yaml_projects_per_file.items():
             # Don't reload if already loaded
             if file in loaded_yaml_projects:
                 continue
-            # Load the yaml
-            yaml = YamlProjectFile(file)
-            if not yaml.load_yaml():
-                console.print_error(f"⚠️ Error: Unable to load project file `{file}`")
-                exit(1)
             # Load project in the YAML file
-            YamlProjectFile.load_yaml_projects(yaml, loaded_yaml_projects, load_dependencies)
+            YamlProjectFile.load_yaml_projects(file, loaded_yaml_projects, load_dependencies, yaml_projects_in_file)
 
+        discovery.projects_loaded(directory, loaded_yaml_projects, recursive)
+        ManifestCache.save()
         return loaded_yaml_projects
     
     # Check if a project with the given name exists
@@ -347,11 +515,15 @@ class YamlProjectFile:
             data["path"] = str(dependency_path)
         return data
     
-    def git_depencendies_to_yaml_dict(self, dependency_name: str, dependency_path: Path) -> dict:
+    def git_depencendies_to_yaml_dict(self, dependency_name: str, dependency_path: Path, branch: Optional[str] = None, commit: Optional[str] = None) -> dict:
         data: dict = {
             "name": dependency_name,
             "git": str(dependency_path)
         }
+        if branch:
+            data["branch"] = branch
+        if commit:
+            data["commit"] = commit
         return data
 
     def add_dependency_to_project(self, project_name: str, dependency_yaml:dict) -> bool:
@@ -392,4 +564,11 @@ class YamlProjectFile:
 
         console.print_error(f"⚠️  Error: Project `{project_name}` not found in {self.file}")
         return False
-        
\ No newline at end of file
+
+# Parse a 'kiss.yaml' file in a worker process of YamlProjectFile.read_projects_in_files
+def _parse_projects_in_file(file: Path) -> list[YamlProject]:
+    yaml = YamlProjectFile(file)
+    if not yaml.load_yaml():
+        console.print_error(f"⚠️ Error: Unable to load project file `{file}`")
+        exit(1)
+    return yaml._read_all_projects_in_file()
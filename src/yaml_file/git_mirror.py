@@ -0,0 +1,227 @@
+
+############################################################
+# GitMirrorCache resolves git dependencies with a cache shared by all projects:
+# - 'git/mirrors' contains a bare mirror of each repository
+# - 'git/checkouts' contains a worktree of each commit checked out, they are never modified
+# A dependency pinned to a commit (in the manifest or in the lock file) already in the mirror never fetches the repository.
+# In offline mode the network is never used, branches are resolved with the mirror.
+# Repositories are fetched concurrently by a bounded pool of threads.
+# The cache is shared by all kiss processes, a mirror and its checkouts are only modified with the '<mirror>.lock' file locked.
+############################################################
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+import console
+from cache import cache_directory
+from yaml_file.yaml_project import YamlGitDependency
+
+GIT_CACHE_DIRECTORY = Path("git")
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# Error when a repository can't be fetched or checked out
+class GitMirrorError(Exception):
+    pass
+
+# Lock the file for other processes until the context exits, the file is created if needed
+@contextmanager
+def _lock_file(file: Path):
+    file.parent.mkdir(parents=True, exist_ok=True)
+    with file.open("a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            # Lock the first byte, LK_LOCK gives up after 10 seconds and is tried again
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+class GitMirrorCache:
+    def __init__(self):
+        self._offline = False
+        self._jobs = 8
+        # Locks of mirror directories
+        self._locks: dict[Path, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        # Commits already resolved by (url, revision)
+        self._resolved_commits: dict[tuple[str, str], str] = {}
+        # Commits of the lock file by (url, revision)
+        self._locked_commits: dict[tuple[str, str], str] = {}
+
+    # In offline mode repositories are never fetched
+    @property
+    def offline(self) -> bool:
+        return self._offline
+
+    @offline.setter
+    def offline(self, value: bool):
+        self._offline = value
+
+    # Maximum number of repositories fetched at the same time
+    @property
+    def jobs(self) -> int:
+        return self._jobs
+
+    @jobs.setter
+    def jobs(self, value: int):
+        self._jobs = max(1, value)
+
+    @property
+    def directory(self) -> Path:
+        return cache_directory() / GIT_CACHE_DIRECTORY
+
+    # Directory name of a repository, readable and unique
+    @staticmethod
+    def _repository_key(url: str) -> str:
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", url.rstrip("/").rsplit("/", 1)[-1].removesuffix(".git")) or "repository"
+        return f"{name}-{hashlib.sha256(url.encode()).hexdigest()[:16]}"
+
+    def mirror_directory(self, url: str) -> Path:
+        return self.directory / "mirrors" / f"{self._repository_key(url)}.git"
+
+    def checkout_directory(self, url: str, commit: str) -> Path:
+        return self.directory / "checkouts" / self._repository_key(url) / commit
+
+    # Lock the mirror for the other threads and the other processes
+    @contextmanager
+    def _lock(self, mirror: Path):
+        with self._locks_lock:
+            lock = self._locks.setdefault(mirror, threading.Lock())
+        with lock, _lock_file(mirror.with_name(f"{mirror.name}.lock")):
+            yield
+
+    @staticmethod
+    def _git(args: list[str], cwd: Optional[Path] = None) -> subprocess.CompletedProcess:
+        try:
+            return subprocess.run(["git"] + args, cwd=cwd, capture_output=True, text=True)
+        except OSError as e:
+            raise GitMirrorError(f"Unable to run git: {e}")
+
+    def _rev_parse(self, mirror: Path, revision: str) -> Optional[str]:
+        result = self._git(["--git-dir", str(mirror), "rev-parse", "--verify", "--quiet", f"{revision}^{{commit}}"])
+        return result.stdout.strip() if result.returncode == 0 else None
+
+    def _update_mirror(self, url: str, mirror: Path):
+        if self.offline:
+            raise GitMirrorError(f"Repository {url} is not in the cache and kiss is offline")
+        if not mirror.exists():
+            # Cloned in a directory of this process, a clone interrupted by another process is never reused
+            mirror.parent.mkdir(parents=True, exist_ok=True)
+            temporary_mirror = Path(tempfile.mkdtemp(prefix=f"{mirror.name}.", suffix=".tmp", dir=mirror.parent))
+            if (result := self._git(["clone", "--mirror", "--quiet", url, str(temporary_mirror)])).returncode != 0:
+                shutil.rmtree(temporary_mirror, ignore_errors=True)
+                raise GitMirrorError(f"Unable to clone {url}: {result.stderr.strip()}")
+            try:
+                os.rename(temporary_mirror, mirror)
+            except OSError:
+                shutil.rmtree(temporary_mirror, ignore_errors=True)
+                # Another process cloned the repository first
+                if not mirror.exists():
+                    raise
+        elif (result := self._git(["--git-dir", str(mirror), "fetch", "--prune", "--quiet", "origin"])).returncode != 0:
+            raise GitMirrorError(f"Unable to fetch {url}: {result.stderr.strip()}")
+
+    # Resolve the revision of the repository to a commit, the repository is fetched if needed
+    def resolve_commit(self, url: str, revision: str, pinned: bool) -> str:
+        if (commit := self._resolved_commits.get((url, revision))) is not None:
+            return commit
+        mirror = self.mirror_directory(url)
+        with self._lock(mirror):
+            commit = None
+            # A pinned commit in the mirror never changes, branches are fetched to get their last commit unless offline
+            if mirror.exists() and (pinned or self.offline):
+                commit = self._rev_parse(mirror, revision)
+            if commit is None:
+                if not (mirror.exists() and self.offline):
+                    self._update_mirror(url, mirror)
+                if (commit := self._rev_parse(mirror, revision)) is None:
+                    raise GitMirrorError(f"Revision '{revision}' not found in {url}" + (" (kiss is offline)" if self.offline else ""))
+        self._resolved_commits[(url, revision)] = commit
+        return commit
+
+    # Checkout the commit in its own worktree, returns the directory of the worktree
+    def checkout(self, url: str, commit: str) -> Path:
+        checkout = self.checkout_directory(url, commit)
+        mirror = self.mirror_directory(url)
+        with self._lock(mirror):
+            if (checkout / ".git").exists():
+                return checkout
+            # Remove a checkout that was interrupted
+            shutil.rmtree(checkout, ignore_errors=True)
+            self._git(["--git-dir", str(mirror), "worktree", "prune"])
+            checkout.parent.mkdir(parents=True, exist_ok=True)
+            if (result := self._git(["--git-dir", str(mirror), "worktree", "add", "--detach", "--quiet", str(checkout), commit])).returncode != 0:
+                shutil.rmtree(checkout, ignore_errors=True)
+                raise GitMirrorError(f"Unable to checkout {commit} of {url}: {result.stderr.strip()}")
+        return checkout
+
+    # Resolve the revision of the repository to the commit instead of its last commit
+    def lock(self, url: str, revision: str, commit: str):
+        self._locked_commits[(url, revision)] = commit
+
+    # The commit of the revision, None if the revision was not resolved
+    def resolved_commit(self, url: str, revision: str) -> Optional[str]:
+        return self._resolved_commits.get((url, revision))
+
+    def _resolve_dependency(self, dependency: YamlGitDependency) -> Path:
+        try:
+            if (locked_commit := self._locked_commits.get((dependency.git, dependency.revision))) is not None:
+                commit = self.resolve_commit(dependency.git, locked_commit, pinned=True)
+                self._resolved_commits[(dependency.git, dependency.revision)] = commit
+            else:
+                commit = self.resolve_commit(dependency.git, dependency.revision, pinned=dependency.commit is not None)
+            return self.checkout(dependency.git, commit)
+        except OSError as e:
+            raise GitMirrorError(f"Unable to update the git cache {self.directory}: {e}")
+
+    # Resolve the path of all git dependencies, repositories are fetched concurrently
+    # Returns False if a dependency can't be resolved, errors are printed
+    def resolve(self, dependencies: list[YamlGitDependency]) -> bool:
+        requests = dict[tuple[str, str], list[YamlGitDependency]]()
+        for dependency in dependencies:
+            requests.setdefault((dependency.git, dependency.revision), []).append(dependency)
+        if not requests:
+            return True
+
+        errors = list[str]()
+        max_workers = min(self.jobs, len(requests))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {key: executor.submit(self._resolve_dependency, dependencies[0]) for key, dependencies in requests.items()}
+            for key, future in futures.items():
+                try:
+                    path = future.result()
+                except GitMirrorError as e:
+                    errors.append(f"Error: Failed to resolve git dependency '{requests[key][0].name}': {e}")
+                    continue
+                for dependency in requests[key]:
+                    dependency.path = path
+
+        for error in errors:
+            console.print_error(error)
+        return not errors
+
+GitMirrorCache = GitMirrorCache()
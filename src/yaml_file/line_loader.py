@@ -1,10 +1,22 @@
 
 ############################################################
 # LineLoader used to keep track of line when parsing YAML
+# LineLoader and SafeLoader use libyaml (CSafeLoader) when PyYAML is built with it,
+# otherwise they fallback to the pure python SafeLoader
 ############################################################
 import yaml
 
-class LineLoader(yaml.SafeLoader):
+# True if PyYAML is built with libyaml
+HAS_LIBYAML = hasattr(yaml, "CSafeLoader")
+
+# Fastest safe loader available, used to load project files
+SafeLoader = yaml.CSafeLoader if HAS_LIBYAML else yaml.SafeLoader
+
+class LineLoader(SafeLoader):
+    pass
+
+# Pure python LineLoader, always available
+class PyLineLoader(yaml.SafeLoader):
     pass
 
 class YamlObject:
@@ -12,7 +24,7 @@ class YamlObject:
         self.key_line = key_line
         self.value = value
         self.line = line
-        
+
 def construct_mapping(loader, node, deep=False):
     mapping = {}
     for key_node, value_node in node.value:
@@ -27,7 +39,8 @@ def construct_mapping(loader, node, deep=False):
 
     return mapping
 
-LineLoader.add_constructor(
-    yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
-    construct_mapping,
-)
\ No newline at end of file
+for loader in (LineLoader, PyLineLoader):
+    loader.add_constructor(
+        yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
+        construct_mapping,
+    )
@@ -0,0 +1,181 @@
+
+############################################################
+# LockFile is the 'kiss.lock' file written next to a 'kiss.yaml' file by 'kiss lock'.
+# It records every project of the resolved dependency graph in topological order (dependencies first):
+# - The 'kiss.yaml' file of the project, or the git repository, revision and commit of a git dependency
+# - The sha256 of the 'kiss.yaml' file
+# When the hashes of local 'kiss.yaml' files still match, loading the directory reads the locked files
+# instead of walking the dependencies, and git dependencies use the locked commits instead of resolving their branches.
+# The loaded graph is kept in the manifest cache under the digest of the lock file.
+############################################################
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Self
+import yaml
+import console
+from yaml_file.git_mirror import GitMirrorCache
+from yaml_file.line_loader import SafeLoader
+from yaml_file.yaml_project import PROJECT_FILE_NAME, YamlDependencyType, YamlGitDependency, YamlProject
+
+LOCK_FILE_NAME = "kiss.lock"
+
+# Increase it when the layout of the lock file changes
+_LOCK_FILE_VERSION = 1
+
+def _hash_file(file: Path) -> Optional[str]:
+    try:
+        return hashlib.sha256(file.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+# Sort yaml projects so that dependencies come before the projects that depend on them
+# Dependencies are matched by name and path like the project registry do, unresolved dependencies are ignored
+def _topological_order(yaml_projects_per_file: dict[Path, list[YamlProject]]) -> list[YamlProject]:
+    yaml_projects = [yaml_project for yaml_project_list in yaml_projects_per_file.values() for yaml_project in yaml_project_list]
+    by_name_and_path = dict[tuple[str, Path], YamlProject]()
+    for yaml_project in yaml_projects:
+        by_name_and_path.setdefault((yaml_project.name, yaml_project.path), yaml_project)
+    for yaml_project in yaml_projects:
+        by_name_and_path.setdefault((yaml_project.name, yaml_project.file.parent), yaml_project)
+
+    order = list[YamlProject]()
+    visited = set[int]()
+    for root in yaml_projects:
+        if id(root) in visited:
+            continue
+        visited.add(id(root))
+        # Iterative depth first search, a project is added when all its dependencies are added
+        stack = [(root, iter(root.dependencies))]
+        while stack:
+            yaml_project, dependencies = stack[-1]
+            for dependency in dependencies:
+                if dependency.path is None:
+                    continue
+                if (yaml_dependency := by_name_and_path.get((dependency.name, dependency.path))) is None or id(yaml_dependency) in visited:
+                    continue
+                visited.add(id(yaml_dependency))
+                stack.append((yaml_dependency, iter(yaml_dependency.dependencies)))
+                break
+            else:
+                stack.pop()
+                order.append(yaml_project)
+    return order
+
+class LockFile:
+    def __init__(self, file: Path, projects: list[dict]):
+        self._file = file
+        self._projects = projects
+        self._digest = hashlib.sha256(yaml.safe_dump(projects, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def file(self) -> Path:
+        return self._file
+
+    # Locked projects in topological order
+    @property
+    def projects(self) -> list[dict]:
+        return self._projects
+
+    # Digest of the locked graph, it changes when a locked file or commit changes
+    @property
+    def digest(self) -> str:
+        return self._digest
+
+    # Create the lock of all yaml projects loaded with their dependencies from the directory
+    @classmethod
+    def create(cls, directory: Path, yaml_projects_per_file: dict[Path, list[YamlProject]]) -> Self:
+        # Git repository of each checkout directory
+        git_dependencies = dict[Path, YamlGitDependency]()
+        for yaml_project_list in yaml_projects_per_file.values():
+            for yaml_project in yaml_project_list:
+                for dependency in yaml_project.dependencies:
+                    if dependency.type == YamlDependencyType.git and dependency.path is not None:
+                        git_dependencies.setdefault(dependency.path, dependency)
+
+        projects = list[dict]()
+        for position, yaml_project in enumerate(_topological_order(yaml_projects_per_file)):
+            locked_project = {"name": yaml_project.name, "position": position}
+            if (git_dependency := git_dependencies.get(yaml_project.file.parent)) is not None:
+                locked_project["git"] = git_dependency.git
+                locked_project["revision"] = git_dependency.revision
+                locked_project["commit"] = GitMirrorCache.resolved_commit(git_dependency.git, git_dependency.revision)
+            else:
+                locked_project["file"] = Path(os.path.relpath(yaml_project.file, directory)).as_posix()
+            locked_project["sha256"] = _hash_file(yaml_project.file)
+            projects.append(locked_project)
+        return cls(directory / LOCK_FILE_NAME, projects)
+
+    # Load the lock file of the directory, None if there is no valid lock file
+    @classmethod
+    def load(cls, directory: Path) -> Optional[Self]:
+        file = directory / LOCK_FILE_NAME
+        try:
+            with file.open("r", encoding="utf-8") as f:
+                data = yaml.load(f, Loader=SafeLoader)
+        except FileNotFoundError:
+            return None
+        except (OSError, yaml.YAMLError) as e:
+            console.print_warning(f"⚠️  Warning: Ignoring invalid lock file {file}: {e}")
+            return None
+        if not isinstance(data, dict) or data.get("version") != _LOCK_FILE_VERSION or not isinstance(data.get("projects"), list):
+            console.print_warning(f"⚠️  Warning: Ignoring lock file {file} with an unsupported version")
+            return None
+        return cls(file, data["projects"])
+
+    # Check that local 'kiss.yaml' files did not change since they were locked
+    def is_up_to_date(self) -> bool:
+        for locked_project in self._projects:
+            if "file" in locked_project and _hash_file(self._file.parent / locked_project["file"]) != locked_project.get("sha256"):
+                return False
+        return True
+
+    # 'kiss.yaml' files of the locked projects, the file of the directory first then the dependencies in topological order
+    # Files are given as the dependencies resolve them, None if a git dependency is not checked out
+    def project_files(self) -> Optional[list[Path]]:
+        directory = self._file.parent
+        root_file = directory / PROJECT_FILE_NAME
+        files = dict[Path, None]()
+        for locked_project in self._projects:
+            if "git" in locked_project:
+                if locked_project.get("commit") is None:
+                    return None
+                file = GitMirrorCache.checkout_directory(locked_project["git"], locked_project["commit"]) / PROJECT_FILE_NAME
+                if not file.is_file():
+                    return None
+            elif (file := directory / locked_project["file"]) != root_file:
+                file = file.resolve(strict=False)
+            files[file] = None
+        return sorted(files, key=lambda file: file != root_file)
+
+    # Use locked commits to resolve git dependencies
+    def pin_git_dependencies(self):
+        for locked_project in self._projects:
+            if "git" in locked_project:
+                GitMirrorCache.lock(locked_project["git"], locked_project["revision"], locked_project["commit"])
+
+    def save(self) -> bool:
+        data = {
+            "version": _LOCK_FILE_VERSION,
+            "digest": self._digest,
+            "projects": self._projects
+        }
+        try:
+            with self._file.open("w", encoding="utf-8") as f:
+                f.write("# This file is generated by 'kiss lock', do not edit it\n")
+                yaml.safe_dump(data, f, sort_keys=False, default_flow_style=False, indent=2)
+            return True
+        except OSError as e:
+            console.print_error(f"Error: When saving {self._file} file: {e}")
+            return False
+
+# Use the lock file of the directory, if any, to resolve git dependencies
+# Return the lock file if it is up to date, None otherwise
+def apply_lock_file(directory: Path) -> Optional[LockFile]:
+    if (lock_file := LockFile.load(directory)) is None:
+        return None
+    if not lock_file.is_up_to_date():
+        console.print_warning(f"⚠️  Warning: {lock_file.file} is outdated, run 'kiss lock' to update it")
+        return None
+    lock_file.pin_git_dependencies()
+    return lock_file
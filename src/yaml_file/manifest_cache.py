@@ -0,0 +1,140 @@
+
+############################################################
+# ManifestCache keeps on disk the YamlProject read from each 'kiss.yaml' file.
+# An entry is reused only if the size, the mtime and the content hash of the file
+# are the same as when the entry was stored, otherwise the file is parsed again.
+# The graph loaded from the 'kiss.lock' file of a directory is kept under the digest of the lock file,
+# git dependencies of its projects are resolved. It is reused while the lock file has the same digest.
+############################################################
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Optional
+import console
+from cache import cache_directory
+from yaml_file.yaml_project import YamlProject
+
+MANIFEST_CACHE_FILE = Path("manifests.pickle")
+
+# Increase it when the layout of YamlProject changes to discard old caches
+_MANIFEST_CACHE_VERSION = 4
+
+class ManifestCache:
+    def __init__(self):
+        self._enabled = True
+        self._entries: Optional[dict[str, tuple[int, int, str, list[YamlProject]]]] = None
+        # Digest of the lock file and YamlProject list by file, by directory of the lock file
+        self._locked_graphs: dict[str, tuple[str, dict[Path, list[YamlProject]]]] = {}
+        # Key computed by 'get' for files that are not in the cache, reused by 'put'
+        self._pending_keys: dict[str, tuple[int, int, str]] = {}
+        self._is_dirty = False
+
+    # When disabled, manifests are always parsed and the cache file is never read or written
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value: bool):
+        self._enabled = value
+
+    @property
+    def cache_file(self) -> Path:
+        return cache_directory() / MANIFEST_CACHE_FILE
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        if not self.cache_file.exists():
+            return
+        try:
+            with self.cache_file.open("rb") as f:
+                version, *content = pickle.load(f)
+            if version == _MANIFEST_CACHE_VERSION:
+                self._entries, self._locked_graphs = content
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError, pickle.UnpicklingError) as e:
+            console.print_warning(f"⚠️  Warning: Ignoring invalid manifest cache {self.cache_file}: {e}")
+
+    @staticmethod
+    def _compute_key(file: Path) -> Optional[tuple[int, int, str]]:
+        try:
+            stat = file.stat()
+            content = file.read_bytes()
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).hexdigest())
+
+    # Get the YamlProject list of the file if the file did not change since it was cached
+    def get(self, file: Path) -> Optional[list[YamlProject]]:
+        if not self.enabled:
+            return None
+        self._load()
+        # YamlProject keep the path of the file as given, the same file with another path is another entry
+        key = os.fspath(file)
+        if (file_key := self._compute_key(file)) is None:
+            return None
+        if (entry := self._entries.get(key)) is not None and entry[:3] == file_key:
+            return list(entry[3])
+        self._pending_keys[key] = file_key
+        return None
+
+    # Store the YamlProject list read from the file
+    def put(self, file: Path, yaml_projects: list[YamlProject]):
+        if not self.enabled:
+            return
+        self._load()
+        key = os.fspath(file)
+        if (file_key := self._pending_keys.pop(key, None)) is None:
+            file_key = self._compute_key(file)
+        else:
+            # Don't store the entry if the file was modified while it was parsed
+            try:
+                stat = file.stat()
+            except OSError:
+                return
+            if (stat.st_size, stat.st_mtime_ns) != file_key[:2]:
+                return
+        if file_key is None:
+            return
+        self._entries[key] = (*file_key, list(yaml_projects))
+        self._is_dirty = True
+
+    # Get the YamlProject list by file locked by the lock file of the directory, if the lock file has the same digest
+    def get_locked_graph(self, directory: Path, digest: str) -> Optional[dict[Path, list[YamlProject]]]:
+        if not self.enabled:
+            return None
+        self._load()
+        if (entry := self._locked_graphs.get(os.fspath(directory))) is None or entry[0] != digest:
+            return None
+        # Checkouts of git dependencies may have been removed from the cache
+        if not all(file.is_file() for file in entry[1]):
+            return None
+        return {file: list(yaml_projects) for file, yaml_projects in entry[1].items()}
+
+    # Store the YamlProject list by file locked by the lock file of the directory, git dependencies must be resolved
+    def put_locked_graph(self, directory: Path, digest: str, yaml_projects_per_file: dict[Path, list[YamlProject]]):
+        if not self.enabled:
+            return
+        self._load()
+        self._locked_graphs[os.fspath(directory)] = (digest, {file: list(yaml_projects) for file, yaml_projects in yaml_projects_per_file.items()})
+        self._is_dirty = True
+
+    # Write the cache file if it was modified
+    def save(self):
+        if not self.enabled or not self._is_dirty:
+            return
+        cache_file = self.cache_file
+        temporary_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with temporary_file.open("wb") as f:
+                pickle.dump((_MANIFEST_CACHE_VERSION, self._entries, self._locked_graphs), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_file, cache_file)
+            self._is_dirty = False
+        except (OSError, pickle.PicklingError) as e:
+            console.print_warning(f"⚠️  Warning: Unable to save manifest cache {cache_file}: {e}")
+            temporary_file.unlink(missing_ok=True)
+
+ManifestCache = ManifestCache()
@@ -0,0 +1,178 @@
+
+############################################################
+# ProjectDiscovery finds the 'kiss.yaml' files of a directory tree.
+# Directories are walked with os.scandir and pruned when:
+# - They are version control directories (.git, .hg, .svn)
+# - They are build directories created by kiss
+# - They match a pattern of a '.kissignore' file
+############################################################
+import fnmatch
+import os
+from pathlib import Path
+from typing import Optional, Self
+from yaml_file.yaml_project import PROJECT_FILE_NAME, YamlProject
+
+KISS_IGNORE_FILE_NAME = ".kissignore"
+
+# Directories never containing projects
+_PRUNED_DIRECTORY_NAMES = frozenset([".git", ".hg", ".svn"])
+
+# KissIgnore is the list of patterns of a '.kissignore' file
+# Each non empty line that doesn't start with '#' is a pattern:
+# - A pattern without '/' matches a file or directory name at any depth below the '.kissignore' file
+# - A pattern with a '/' matches a path relative to the directory of the '.kissignore' file
+# - A trailing '/' is ignored
+class KissIgnore:
+    def __init__(self, directory: Path, patterns: list[str]):
+        self._directory = directory
+        self._name_patterns = list[str]()
+        self._path_patterns = list[str]()
+        for pattern in patterns:
+            pattern = pattern.strip().rstrip("/")
+            if not pattern or pattern.startswith("#"):
+                continue
+            if "/" in pattern:
+                self._path_patterns.append(pattern.lstrip("/"))
+            else:
+                self._name_patterns.append(pattern)
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional[Self]:
+        try:
+            with open(directory / KISS_IGNORE_FILE_NAME, "r", encoding="utf-8") as f:
+                return cls(directory, f.read().splitlines())
+        except OSError:
+            return None
+
+    # Check if the path (a child of the kissignore directory) must be ignored
+    def is_ignored(self, path: Path) -> bool:
+        if any(fnmatch.fnmatchcase(path.name, pattern) for pattern in self._name_patterns):
+            return True
+        if self._path_patterns:
+            relative_path = path.relative_to(self._directory).as_posix()
+            return any(fnmatch.fnmatchcase(relative_path, pattern) for pattern in self._path_patterns)
+        return False
+
+# Listing of a directory with what the discovery needs to know about it
+class DirectoryListing:
+    def __init__(self, mtime_ns: int, directories: list[str], has_project_file: bool, has_kissignore: bool):
+        self.mtime_ns = mtime_ns
+        # Names of child directories, sorted, without version control directories and symbolic links
+        self.directories = directories
+        self.has_project_file = has_project_file
+        self.has_kissignore = has_kissignore
+
+    @classmethod
+    def scan(cls, directory: Path) -> Optional[Self]:
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            return None
+        directories = list[str]()
+        has_project_file = False
+        has_kissignore = False
+        for entry in entries:
+            if entry.name == PROJECT_FILE_NAME:
+                has_project_file = True
+            elif entry.name == KISS_IGNORE_FILE_NAME:
+                has_kissignore = True
+            elif entry.name not in _PRUNED_DIRECTORY_NAMES:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.name)
+                except OSError:
+                    pass
+        return cls(mtime_ns, directories, has_project_file, has_kissignore)
+
+class ProjectDiscovery:
+    # - skip_build_directories: Don't walk in kiss build directories
+    # - use_kissignore: Don't walk in directories ignored by '.kissignore' files
+    # - stop_at_project: Don't walk below a directory that contains a 'kiss.yaml' file
+    def __init__(self, skip_build_directories: bool = True, use_kissignore: bool = True, stop_at_project: bool = False):
+        self._skip_build_directories = skip_build_directories
+        self._use_kissignore = use_kissignore
+        self._stop_at_project = stop_at_project
+
+    @property
+    def skip_build_directories(self) -> bool:
+        return self._skip_build_directories
+
+    @property
+    def use_kissignore(self) -> bool:
+        return self._use_kissignore
+
+    @property
+    def stop_at_project(self) -> bool:
+        return self._stop_at_project
+
+    @staticmethod
+    def _build_directory(directory: Path) -> Path:
+        from cmake.cmake_context import CMakeContext
+        return CMakeContext.resolveRootBuildDirectory(current_directory=directory)
+
+    # Find all 'kiss.yaml' files in the directory
+    # When recursive is True, also find 'kiss.yaml' files in child directories
+    # Files are returned in a stable order, a directory file comes before its children files
+    def find_project_files(self, directory: Path, recursive: bool) -> list[Path]:
+        if not recursive:
+            file = directory / PROJECT_FILE_NAME
+            return [file] if file.is_file() else []
+
+        project_files = list[Path]()
+        skipped_directories = set[Path]()
+        if self.skip_build_directories:
+            skipped_directories.add(self._build_directory(directory))
+
+        # Stack of (directory, kissignore files that apply to this directory)
+        stack: list[tuple[Path, tuple[KissIgnore, ...]]] = [(directory, ())]
+        while stack:
+            current_directory, kissignores = stack.pop()
+            if (listing := self._list_directory(current_directory)) is None:
+                continue
+
+            if self.use_kissignore and listing.has_kissignore:
+                if (kissignore := KissIgnore.load(current_directory)) is not None:
+                    kissignores = kissignores + (kissignore,)
+
+            has_project_file = False
+            if listing.has_project_file:
+                file = current_directory / PROJECT_FILE_NAME
+                if not any(kissignore.is_ignored(file) for kissignore in kissignores):
+                    project_files.append(file)
+                    has_project_file = True
+                    # kiss can be run in this directory, skip its build directory
+                    if self.skip_build_directories:
+                        skipped_directories.add(self._build_directory(current_directory))
+
+            if has_project_file and self.stop_at_project and current_directory != directory:
+                continue
+
+            # Push in reverse order to pop children in name order
+            for name in reversed(listing.directories):
+                child_directory = current_directory / name
+                if child_directory in skipped_directories:
+                    continue
+                if any(kissignore.is_ignored(child_directory) for kissignore in kissignores):
+                    continue
+                stack.append((child_directory, kissignores))
+
+        self._walk_finished(directory)
+        return project_files
+
+    # List the content of a directory during the walk
+    def _list_directory(self, directory: Path) -> Optional[DirectoryListing]:
+        return DirectoryListing.scan(directory)
+
+    # Called when a recursive walk of directory is finished
+    def _walk_finished(self, directory: Path):
+        pass
+
+    # Called with the projects read in files found by the discovery
+    def projects_loaded(self, directory: Path, yaml_projects_per_file: dict[Path, list[YamlProject]], recursive: bool):
+        pass
@@ -0,0 +1,191 @@
+
+############################################################
+# WorkspaceIndex keeps in 'build/.kiss/index' what was found the last time a directory tree was walked:
+# - For each directory: its mtime, its child directories and if it contains a 'kiss.yaml' or a '.kissignore' file
+# - For each 'kiss.yaml' file: the name, the type and the dependencies of its projects
+# IndexedProjectDiscovery scans a directory again only if its mtime changed.
+# '.kissignore' and 'kiss.yaml' files are always read, the manifest cache avoid to parse unchanged 'kiss.yaml'
+############################################################
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+import console
+from yaml_file.project_discovery import DirectoryListing, ProjectDiscovery
+from yaml_file.yaml_project import YamlProject
+
+WORKSPACE_INDEX_FILE = Path(".kiss") / "index"
+
+# Increase it when the layout of the index changes to discard old indexes
+_WORKSPACE_INDEX_VERSION = 1
+
+# A directory modified less than this delay before the index was written can be modified again
+# without changing its mtime (mtime granularity), it is scanned again
+_RACY_DELAY_NS = 2_000_000_000
+
+class WorkspaceIndex:
+    # root is the indexed directory, the index file is in the build directory of root
+    def __init__(self, root: Path, build_directory: Path):
+        self._root = root
+        self._file = build_directory / WORKSPACE_INDEX_FILE
+        self._directories: dict[str, DirectoryListing] = {}
+        self._projects: dict[str, list[dict]] = {}
+        self._written_ns = 0
+        self._is_dirty = False
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    @property
+    def file(self) -> Path:
+        return self._file
+
+    # Project summaries by 'kiss.yaml' file
+    @property
+    def projects(self) -> dict[Path, list[dict]]:
+        return {self._root / file: summaries for file, summaries in self._projects.items()}
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self._root).as_posix()
+
+    # Load the index file, an invalid index is ignored
+    def load(self):
+        try:
+            with self._file.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _WORKSPACE_INDEX_VERSION:
+                return
+            self._written_ns = data["written_ns"]
+            self._directories = {key: DirectoryListing(*listing) for key, listing in data["directories"].items()}
+            self._projects = data["projects"]
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            console.print_warning(f"⚠️  Warning: Ignoring invalid workspace index {self._file}: {e}")
+            self._directories = {}
+            self._projects = {}
+
+    # Remove all entries, everything will be scanned again
+    def clear(self):
+        self._directories = {}
+        self._projects = {}
+        self._is_dirty = True
+
+    # Get the listing of a directory if the directory did not change since it was indexed
+    def get_listing(self, directory: Path) -> Optional[DirectoryListing]:
+        if (listing := self._directories.get(self._key(directory))) is None:
+            return None
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return None
+        if mtime_ns != listing.mtime_ns or mtime_ns >= self._written_ns - _RACY_DELAY_NS:
+            return None
+        return listing
+
+    def set_listing(self, directory: Path, listing: DirectoryListing):
+        self._directories[self._key(directory)] = listing
+        self._is_dirty = True
+
+    # Keep only listings of the given directories
+    def retain_directories(self, directories: set[Path]):
+        keys = {self._key(directory) for directory in directories}
+        if (removed := self._directories.keys() - keys):
+            for key in removed:
+                del self._directories[key]
+            self._is_dirty = True
+
+    # Store the summary of projects of each file
+    # When replace is True, files that are not given are removed from the index
+    def update_projects(self, yaml_projects_per_file: dict[Path, list[YamlProject]], replace: bool):
+        projects = dict[str, list[dict]]() if replace else dict(self._projects)
+        for file, yaml_projects in yaml_projects_per_file.items():
+            if not file.is_relative_to(self._root):
+                continue
+            projects[self._key(file)] = [{"name": yaml_project.name,
+                                          "type": str(yaml_project.type),
+                                          "dependencies": [dependency.name for dependency in yaml_project.dependencies]}
+                                         for yaml_project in yaml_projects]
+        if projects != self._projects:
+            self._projects = projects
+            self._is_dirty = True
+
+    # Find the 'kiss.yaml' files that describe a project with the given name
+    def find_project_files(self, project_name: str) -> list[Path]:
+        return [self._root / file for file, summaries in self._projects.items() if any(summary["name"] == project_name for summary in summaries)]
+
+    # Write the index file if it was modified
+    def save(self):
+        if not self._is_dirty:
+            return
+        temporary_file = self._file.with_name(f"{self._file.name}.{os.getpid()}.tmp")
+        try:
+            self._file.parent.mkdir(parents=True, exist_ok=True)
+            self._written_ns = time.time_ns()
+            data = {
+                "version": _WORKSPACE_INDEX_VERSION,
+                "written_ns": self._written_ns,
+                "directories": {key: [listing.mtime_ns, listing.directories, listing.has_project_file, listing.has_kissignore]
+                                for key, listing in self._directories.items()},
+                "projects": self._projects
+            }
+            with temporary_file.open("w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(temporary_file, self._file)
+            self._is_dirty = False
+        except OSError as e:
+            console.print_warning(f"⚠️  Warning: Unable to save workspace index {self._file}: {e}")
+            temporary_file.unlink(missing_ok=True)
+
+# ProjectDiscovery that reuse the listing of unchanged directories from the workspace index of the walked directory
+# The index is saved when projects found are loaded
+class IndexedProjectDiscovery(ProjectDiscovery):
+    def __init__(self, skip_build_directories: bool = True, use_kissignore: bool = True, stop_at_project: bool = False, rebuild: bool = False):
+        super().__init__(skip_build_directories=skip_build_directories, use_kissignore=use_kissignore, stop_at_project=stop_at_project)
+        self._rebuild = rebuild
+        self._indexes: dict[Path, WorkspaceIndex] = {}
+        self._index: Optional[WorkspaceIndex] = None
+        self._visited_directories = set[Path]()
+        self._scanned_count = 0
+
+    # Number of directories scanned because they were not in the index or changed
+    @property
+    def scanned_count(self) -> int:
+        return self._scanned_count
+
+    # Get the index of a directory
+    def index(self, directory: Path) -> WorkspaceIndex:
+        if (index := self._indexes.get(directory)) is None:
+            index = WorkspaceIndex(root=directory, build_directory=self._build_directory(directory))
+            if self._rebuild:
+                index.clear()
+            else:
+                index.load()
+            self._indexes[directory] = index
+        return index
+
+    def find_project_files(self, directory: Path, recursive: bool) -> list[Path]:
+        if recursive:
+            self._index = self.index(directory)
+            self._visited_directories = set[Path]()
+        return super().find_project_files(directory, recursive)
+
+    def _list_directory(self, directory: Path) -> Optional[DirectoryListing]:
+        self._visited_directories.add(directory)
+        if (listing := self._index.get_listing(directory)) is not None:
+            return listing
+        self._scanned_count += 1
+        if (listing := DirectoryListing.scan(directory)) is not None:
+            self._index.set_listing(directory, listing)
+        return listing
+
+    def _walk_finished(self, directory: Path):
+        # Directories that are not walked anymore are removed
+        self._index.retain_directories(self._visited_directories)
+
+    def projects_loaded(self, directory: Path, yaml_projects_per_file: dict[Path, list[YamlProject]], recursive: bool):
+        index = self.index(directory)
+        index.update_projects(yaml_projects_per_file, replace=recursive)
+        index.save()
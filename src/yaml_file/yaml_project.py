@@ -1,12 +1,20 @@
 from abc import abstractmethod
 from enum import Enum
 from pathlib import Path
+from typing import Optional
 
 import semver
 
 
 PROJECT_FILE_NAME = "kiss.yaml"
 
+# Paths shared by many projects and dependencies (files and directories of projects) are interned,
+# equal paths are the same object so they are stored once and hashed once
+_interned_paths: dict[Path, Path] = {}
+
+def intern_path(path: Path) -> Path:
+    return _interned_paths.setdefault(path, path)
+
 # Enumeration of the project type that is supported
 class YamlDependencyType(str, Enum):
     path = "path"
@@ -22,6 +30,7 @@ class YamlDependencyType(str, Enum):
 # YamlPathDependency represent a dependency that is in a path 
 # GitDependecy represent a git dependency that is a git repository with a branch
 class YamlDependency:
+    __slots__ = ("_name", "_type")
 
     # Initialize a dependency with a name and no associated project
     # The association is done with the project property setter later
@@ -43,11 +52,12 @@ class YamlDependency:
     
 # A YamlPathDependency represent a dependency that is in a path 
 class YamlPathDependency(YamlDependency):
+    __slots__ = ("_path",)
 
     # Initialize a dependency with a name and the path
     def __init__(self, name: str, path: Path):
         super().__init__(YamlDependencyType.path, name)
-        self._path = Path(path)
+        self._path = intern_path(Path(path))
 
     # The path where the project reside
     @property 
@@ -56,24 +66,47 @@ class YamlPathDependency(YamlDependency):
 
 
 # A YamlGitDependency represent a dependency that is in a git repository with a branch
+# An optional commit pin the dependency to a specific commit of the repository
 class YamlGitDependency(YamlDependency):
+    __slots__ = ("_git", "_branch", "_commit", "_path")
 
-    # Initialize a dependency with a name, a git repository address and a branch
-    def __init__(self, name: str, git: str, branch: str):
+    # Initialize a dependency with a name, a git repository address, a branch and a commit
+    def __init__(self, name: str, git: str, branch: Optional[str], commit: Optional[str] = None):
         super().__init__(YamlDependencyType.git, name)
         self._git = git
-        self._branch = str(branch)
+        self._branch = str(branch) if branch is not None else None
+        self._commit = str(commit) if commit is not None else None
+        self._path: Optional[Path] = None
 
     # The git repository address
     @property 
     def git(self) -> str:
         return self._git
     
-    # The git branch
+    # The git branch, None means the default branch of the repository
     @property 
-    def branch(self) -> str:
+    def branch(self) -> Optional[str]:
         return self._branch
 
+    # The pinned commit
+    @property 
+    def commit(self) -> Optional[str]:
+        return self._commit
+
+    # The revision to checkout
+    @property 
+    def revision(self) -> str:
+        return self._commit or self._branch or "HEAD"
+
+    # The directory where the resolved commit is checked out, None until the dependency is resolved
+    @property 
+    def path(self) -> Optional[Path]:
+        return self._path
+
+    @path.setter
+    def path(self, path: Path):
+        self._path = intern_path(path)
+
 
 # Enumeration of the project type that is supported
 class YamlProjectType(str, Enum):
@@ -87,10 +120,12 @@ class YamlProjectType(str, Enum):
 
 
 class YamlProject:
+    __slots__ = ("_type", "_file", "_path", "_name", "_description", "_version", "_dependencies")
+
     def __init__(self, type: YamlProjectType, file: Path, path: Path, name: str, description :str, version: semver.Version, dependencies :list[YamlDependency]=[]):
         self._type = type
-        self._file = file
-        self._path = path
+        self._file = intern_path(file)
+        self._path = intern_path(path)
         self._name = name
         self._description = description
         self._version = version
@@ -141,7 +176,8 @@ class YamlProject:
                 dep: YamlPathDependency = dep
                 return self.name == dep.name and self.path == dep.path
             case YamlDependencyType.git:
-                exit(1) # not implemented
+                dep: YamlGitDependency = dep
+                return self.name == dep.name and dep.path is not None and self.path == dep.path
         
     
     def _to_yaml_dict(self) -> dict:
@@ -168,6 +204,8 @@ class YamlProject:
         pass
 
 class YamlBinProject(YamlProject):
+    __slots__ = ("_sources",)
+
     def __init__(self, file: Path, path: Path, name: str, description :str, version: semver.Version, sources:list[Path], dependencies :list[YamlDependency]=[]):
         super().__init__(YamlProjectType.bin, 
                          file=file, 
@@ -190,6 +228,8 @@ class YamlBinProject(YamlProject):
         return str(YamlProjectType.bin), data
     
 class YamlLibProject(YamlProject):
+    __slots__ = ("_sources", "_interface_directories")
+
     def __init__(self, file: Path, path: Path, name: str, description :str, version: semver.Version, sources:list[Path], interface_directories:list[Path], dependencies :list[YamlDependency]=[]):
         super().__init__(YamlProjectType.lib, 
                          file=file, 
@@ -219,6 +259,8 @@ class YamlLibProject(YamlProject):
         return str(YamlProjectType.lib), data
     
 class YamlDynProject(YamlProject):
+    __slots__ = ("_sources", "_interface_directories")
+
     def __init__(self, file: Path, path: Path, name: str, description :str, version: semver.Version, sources:list[Path], interface_directories:list[Path], dependencies :list[YamlDependency]=[]):
         super().__init__(YamlProjectType.dyn, 
                          file=file, 
@@ -27,10 +27,16 @@ def delete_runtime_dir():
         console.print_step(f"\nDeleting '{str(RUNTIME_DIR)}'")
         shutil.rmtree(str(RUNTIME_DIR), ignore_errors=True)
 
+# kiss cache shared by the tests of the session, the tests don't write in the cache of the user
+@pytest.fixture(scope="session")
+def kiss_cache_dir(tmp_path_factory) -> Path:
+    return tmp_path_factory.mktemp("kiss_cache")
+
 @pytest.fixture
-def runtime_dir():
+def runtime_dir(kiss_cache_dir, monkeypatch):
     # Delete RUNTIME_DIR if exist
     delete_runtime_dir()
+    monkeypatch.setenv("KISS_CACHE_DIR", str(kiss_cache_dir))
     # Run the test
     yield
 
@@ -52,6 +58,13 @@ def generate_project(directory: str, args: list[str] = []) -> int:
     result = subprocess.run(["python", "src/kiss.py", "-d", str(directory), "generate"] + args)
     return result.returncode
 
+# Generate the CMakeLists.txt with the CMake generator, the default generator of the toolchain if cmake_generator_name is None
+# args are other options of 'kiss generate cmake'
+def generate_cmake(directory: Path, cmake_generator_name: str | None = None, profile_name: str = DEFAULT_PROFILE_NAME, args: list[str] = [], env: dict | None = None) -> subprocess.CompletedProcess:
+    generator_args = ["-g", cmake_generator_name] if cmake_generator_name else []
+    return subprocess.run(["python", "src/kiss.py", "-d", str(directory), "generate", "--profile", profile_name, "cmake"] + generator_args + args,
+                          env=env, capture_output=True, text=True)
+
 def find_cmake_files(root):
     return list(Path(root).rglob("CMakeLists.txt"))
 
@@ -82,6 +95,12 @@ def build_project(directory: str, args: list[str] = []) -> int:
     result = subprocess.run(["python", "src/kiss.py", "-d", str(directory), "build"] + args)
     return result.returncode
 
+# Name of the file built for a project on this platform
+def artifact_name(project_name: str, project_type: str) -> str:
+    if platform.system() == "Windows":
+        return {"bin": f"{project_name}.exe", "dyn": f"{project_name}.dll", "lib": f"{project_name}.lib"}[project_type]
+    return {"bin": project_name, "dyn": f"lib{project_name}.so", "lib": f"lib{project_name}.a"}[project_type]
+
 def validate_build( cmake_filepath: Path, 
                     project_name:str,
                     project_type:str,
@@ -96,27 +115,11 @@ def validate_build( cmake_filepath: Path,
                             profile_name=profile_name,
                             cmake_generator_name=cmake_generator_name)
     if cmake_generator_name.is_single_profile():
-        match project_type:
-            case "bin":
-                artifact_path = cmake_filepath.parent / project_name
-                assert artifact_path.exists()
-            case "dyn":
-                artifact_path = cmake_filepath.parent / f"{project_name}.so"
-                assert artifact_path.exists()
-            case "lib":
-                artifact_path = cmake_filepath.parent / f"{project_name}.a"
-                assert artifact_path.exists()
+        artifact_path = cmake_filepath.parent / artifact_name(project_name, project_type)
+        assert artifact_path.exists()
     elif cmake_generator_name.is_multi_profile():
-        match project_type:
-            case "bin":
-                artifact_path = cmake_filepath.parent / profile_name / f"{project_name}.exe"
-                assert artifact_path.exists()
-            case "dyn":
-                artifact_path = cmake_filepath.parent / profile_name / f"{project_name}.dll"
-                assert artifact_path.exists()
-            case "lib":
-                artifact_path = cmake_filepath.parent / profile_name / f"{project_name}.lib"
-                assert artifact_path.exists()
+        artifact_path = cmake_filepath.parent / profile_name / artifact_name(project_name, project_type)
+        assert artifact_path.exists()
     else:
         assert False
 
@@ -0,0 +1,9 @@
+#include <iostream>
+
+namespace my_inner_lib { 
+
+void hello_world() {
+    std::cout << "Hello, Lib World!" << std::endl;
+}
+
+} // namespace my_inner_lib 
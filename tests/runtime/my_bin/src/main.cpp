@@ -0,0 +1,6 @@
+#include <iostream>
+
+int main() {
+    std::cout << "Hello, Bin World!" << std::endl;
+    return 0;
+}
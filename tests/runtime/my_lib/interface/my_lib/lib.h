@@ -0,0 +1,10 @@
+#ifndef LIB_H
+#define LIB_H
+
+namespace my_lib {
+
+void hello_world();
+
+} // namespace my_lib
+
+#endif // LIB_H
@@ -0,0 +1,39 @@
+import json
+import subprocess
+from tests.common import *
+
+def affected(args: list[str]) -> dict:
+    json_file = RUNTIME_DIR / "affected.json"
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR), "affected", "--json", str(json_file)] + args)
+    assert result.returncode == 0
+    with open(json_file, "r") as f:
+        return json.load(f)
+
+def create_projects():
+    # my_bin -> my_lib, my_other_lib
+    new_project(["bin", "my_bin"])
+    new_project(["lib", "my_lib"])
+    new_project(["lib", "my_other_lib"])
+    add_dependency("my_bin", ["my_lib", "--path", str((RUNTIME_DIR / "my_lib").absolute())])
+
+def test_affected_files(runtime_dir):
+    create_projects()
+
+    # A source of a dependency affects the projects that depend on it, in build order
+    projects = affected(["--files", "my_lib/src/lib.cpp"])["projects"]
+    assert [(p["name"], p["changed"]) for p in projects] == [("my_lib", True), ("my_bin", False)]
+
+    # Interface directories and manifests are owned by their project
+    output = affected(["--files", "my_other_lib/interface/my_other_lib.h", "my_bin/kiss.yaml", "Readme.md"])
+    assert sorted(p["name"] for p in output["projects"]) == ["my_bin", "my_other_lib"]
+    assert len(output["unowned_files"]) == 1
+
+def test_affected_since(runtime_dir):
+    create_projects()
+    subprocess.run(["git", "init", "-q"], cwd=RUNTIME_DIR, check=True)
+    subprocess.run(["git", "add", "."], cwd=RUNTIME_DIR, check=True)
+    subprocess.run(["git", "-c", "user.name=kiss", "-c", "user.email=kiss@localhost", "commit", "-q", "-m", "projects"], cwd=RUNTIME_DIR, check=True)
+    with open(RUNTIME_DIR / "my_bin" / "src" / "main.cpp", "a") as f:
+        f.write("\n")
+
+    assert [p["name"] for p in affected(["--since", "HEAD"])["projects"]] == ["my_bin"]
@@ -428,3 +428,53 @@ def test_build_bin_all(runtime_dir):
                                cmake_generator_name=cmake_generator_name,
                                profile_name=profile)
         
+
+# Test that a build without change doesn't start CMake
+def test_build_bin_up_to_date(runtime_dir):
+    bin_type = "bin"
+    bin_name = "my_bin"
+    new_project([bin_type, bin_name])
+
+    assert build_project(directory=RUNTIME_DIR/bin_name) == 0
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR/bin_name), "build"], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "Build is up-to-date" in result.stdout
+    assert "CMake build" not in result.stdout
+
+    # A modified source is built again
+    main_file = RUNTIME_DIR/bin_name/"src"/"main.cpp"
+    main_file.write_text(main_file.read_text(encoding="utf-8") + "\n// modified\n", encoding="utf-8")
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR/bin_name), "build"], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "CMake build" in result.stdout
+
+# Test that a header included by a source is a build input, even if it is not declared in the sources
+@pytest.mark.parametrize("cmake_generator_name", ["Unix Makefiles", "Ninja"])
+def test_build_bin_header_modified(runtime_dir, cmake_generator_name):
+    bin_name = "my_bin"
+    new_project(["bin", bin_name])
+    directory = RUNTIME_DIR/bin_name
+    header_file = directory/"src"/"detail.h"
+    header_file.write_text('#pragma once\n#define DETAIL_MESSAGE "first detail"\n', encoding="utf-8")
+    main_file = directory/"src"/"main.cpp"
+    main_file.write_text('#include <iostream>\n#include "detail.h"\nint main() { std::cout << DETAIL_MESSAGE << std::endl; return 0; }\n', encoding="utf-8")
+
+    def build() -> str:
+        result = subprocess.run(["python", "src/kiss.py", "-d", str(directory), "build", "cmake", "-g", cmake_generator_name], capture_output=True, text=True)
+        assert result.returncode == 0, result.stdout + result.stderr
+        return result.stdout
+
+    def run() -> str:
+        binary_files = [file for file in (directory/"build").rglob(artifact_name(bin_name, "bin")) if file.is_file()]
+        assert len(binary_files) == 1
+        return subprocess.run([str(binary_files[0])], capture_output=True, text=True).stdout
+
+    build()
+    assert "first detail" in run()
+    assert "Build is up-to-date" in build()
+
+    header_file.write_text('#pragma once\n#define DETAIL_MESSAGE "second modified detail"\n', encoding="utf-8")
+    output = build()
+    assert "Build is up-to-date" not in output
+    assert "CMake build" in output
+    assert "second modified detail" in run()
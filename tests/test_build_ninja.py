@@ -0,0 +1,59 @@
+import sys
+from tests.common import *
+
+pytestmark = pytest.mark.skipif(platform.system() == "Windows" or shutil.which("ninja") is None,
+                                reason="The ninja builder needs ninja and GCC or Clang on Linux")
+
+def ninja_build_directory(directory: Path) -> Path:
+    toolchain = Toolchain.create(compiler_name=DEFAULT_COMPILER_NAME, target_name=DEFAULT_TARGET_NAME)
+    return directory / "build" / toolchain.target.name / toolchain.compiler.name / "ninja" / DEFAULT_PROFILE_NAME
+
+def build_with_ninja(directory: Path) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "src/kiss.py", "-d", str(directory), "build", "ninja"], capture_output=True, text=True)
+
+# A binary that uses a library, main.cpp includes the header of the library
+def create_workspace():
+    new_project(["lib", "my_lib"])
+    new_project(["bin", "my_bin"])
+    add_dependency("my_bin", ["my_lib", "--path", "../my_lib"])
+    (RUNTIME_DIR / "my_lib" / "interface" / "my_lib" / "value.h").write_text("#define MY_LIB_VALUE 1\n", encoding="utf-8")
+    (RUNTIME_DIR / "my_bin" / "src" / "main.cpp").write_text(
+        "#include <iostream>\n"
+        "#include <my_lib/lib.h>\n"
+        "#include <my_lib/value.h>\n"
+        "int main() {\n"
+        "    my_lib::hello_world();\n"
+        "    std::cout << \"value \" << MY_LIB_VALUE << std::endl;\n"
+        "}\n", encoding="utf-8")
+
+def test_build_ninja(runtime_dir):
+    create_workspace()
+    directory = RUNTIME_DIR / "my_bin"
+    build_directory = ninja_build_directory(directory)
+
+    result = build_with_ninja(directory)
+    assert result.returncode == 0
+    # No CMake configure
+    assert not find_cmake_files(RUNTIME_DIR)
+    assert (build_directory / "build.ninja").exists()
+    binary = next(build_directory.glob("my_bin_*/my_bin"))
+    assert next(build_directory.glob("my_lib_*/libmy_lib.a"))
+    assert subprocess.run([str(binary)], capture_output=True, text=True).stdout.endswith("value 1\n")
+
+    # Nothing changed, nothing is built
+    result = build_with_ninja(directory)
+    assert result.returncode == 0
+    assert "no work to do" in result.stdout
+
+    # The header is tracked with the depfile of main.cpp
+    (RUNTIME_DIR / "my_lib" / "interface" / "my_lib" / "value.h").write_text("#define MY_LIB_VALUE 2\n", encoding="utf-8")
+    result = build_with_ninja(directory)
+    assert result.returncode == 0
+    assert "main.cpp" in result.stdout
+    assert "lib.cpp" not in result.stdout
+    assert subprocess.run([str(binary)], capture_output=True, text=True).stdout.endswith("value 2\n")
+
+def test_run_ninja(runtime_dir):
+    create_workspace()
+    assert run_project(directory=RUNTIME_DIR / "my_bin", args=["ninja"]) == 0
+    assert not find_cmake_files(RUNTIME_DIR)
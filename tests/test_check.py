@@ -0,0 +1,25 @@
+import subprocess
+from tests.common import *
+
+def add_path_dependency(project_name: str, dependency_name: str):
+    add_dependency(project_name, [dependency_name, "--path", str((RUNTIME_DIR / dependency_name).absolute())])
+
+def test_check_graph(runtime_dir):
+    for name in ["my_a", "my_b", "my_c", "my_d"]:
+        new_project(["lib", name])
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR), "check", "--graph"], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "No dependency cycle in 4 projects" in result.stdout
+
+    # Two cycles are reported at once
+    add_path_dependency("my_a", "my_b")
+    add_path_dependency("my_b", "my_a")
+    add_path_dependency("my_c", "my_d")
+    add_path_dependency("my_d", "my_c")
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR), "check", "--graph"], capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "2 dependency cycles found in 4 projects" in result.stderr
+    assert "'my_a' depends on 'my_b' in" in result.stderr
+    assert "'my_d' depends on 'my_c' in" in result.stderr
+    # Line of the dependency in the kiss.yaml file
+    assert f"{(RUNTIME_DIR / 'my_b' / 'kiss.yaml').absolute()}(" in result.stderr
@@ -0,0 +1,58 @@
+import sys
+from tests.common import *
+
+@pytest.fixture
+def ninja_probe():
+    CMakeGeneratorName.is_ninja_available.cache_clear()
+    yield
+    CMakeGeneratorName.is_ninja_available.cache_clear()
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="GNU toolsets are used on Linux")
+def test_default_generator(ninja_probe, monkeypatch):
+    toolchain = Toolchain.create(compiler_name=DEFAULT_COMPILER_NAME, target_name=DEFAULT_TARGET_NAME)
+    probes = list[str]()
+    def which(name, *args, **kwargs):
+        probes.append(name)
+        return "/usr/bin/ninja" if name == "ninja" else None
+    monkeypatch.setattr(shutil, "which", which)
+
+    # ninja is looked for once
+    assert CMakeGeneratorName.create(toolchain).name == "Ninja Multi-Config"
+    assert CMakeGeneratorName.create(toolchain).name == "Ninja Multi-Config"
+    assert probes == ["ninja"]
+
+    monkeypatch.setattr(shutil, "which", lambda name, *args, **kwargs: None)
+    CMakeGeneratorName.is_ninja_available.cache_clear()
+    assert CMakeGeneratorName.create(toolchain).name == "Unix Makefiles"
+
+@pytest.mark.skipif(platform.system() == "Windows" or shutil.which("ninja") is None, reason="ninja is not found")
+def test_single_configure_for_all_profiles(runtime_dir):
+    new_project(["bin", "my_bin"])
+    directory = RUNTIME_DIR / "my_bin"
+    debug_build = subprocess.run([sys.executable, "src/kiss.py", "-d", str(directory), "build", "--debug"], capture_output=True, text=True)
+    assert debug_build.returncode == 0
+    assert "CMake configure..." in debug_build.stdout
+
+    # The tree configured for debug builds release
+    release_build = subprocess.run([sys.executable, "src/kiss.py", "-d", str(directory), "build", "--release"], capture_output=True, text=True)
+    assert release_build.returncode == 0
+    assert "CMake configure..." not in release_build.stdout
+    assert "No CMake configure required" in release_build.stdout
+    assert len(list(directory.glob("build/*/*/cmake/my_bin_*/release/my_bin"))) == 1
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="Unix Makefiles are used on Linux")
+def test_build_unix_makefiles(runtime_dir):
+    new_project(["lib", "my_lib"])
+    new_project(["bin", "my_bin"])
+    add_dependency("my_bin", ["my_lib", "--path", "../my_lib"])
+    directory = RUNTIME_DIR / "my_bin"
+
+    # Single profile generators have a CMake tree per profile
+    for profile in ["--debug", "--release"]:
+        result = subprocess.run([sys.executable, "src/kiss.py", "-d", str(directory), "build", profile, "cmake", "-g", "Unix Makefiles"], capture_output=True, text=True)
+        assert result.returncode == 0
+        assert "CMake configure..." in result.stdout
+    for profile_name in ["debug", "release"]:
+        assert len(list(directory.glob(f"build/*/*/cmake/my_bin_*/{profile_name}/build/Makefile"))) == 1
+        assert len(list(directory.glob(f"build/*/*/cmake/my_bin_*/{profile_name}/my_bin"))) == 1
+        assert len(list(directory.glob(f"build/*/*/cmake/my_lib_*/{profile_name}/libmy_lib.a"))) == 1
@@ -0,0 +1,84 @@
+import sys
+import pytest
+from tests.common import *
+from cmake.compiler_detection import CompilerDetectionCache
+
+pytestmark = pytest.mark.skipif(platform.system() == "Windows", reason="The compiler detection is cached for GNU toolsets")
+
+def create_toolchain() -> Toolchain:
+    return Toolchain.create(compiler_name=DEFAULT_COMPILER_NAME, target_name=DEFAULT_TARGET_NAME)
+
+def detection_args(toolchain: Toolchain, arch_flag: str = "-m64") -> list[str]:
+    return ["-G", "Unix Makefiles", f"-DCMAKE_C_COMPILER={toolchain.compiler.c_path}",
+            f"-DCMAKE_CXX_COMPILER={toolchain.compiler.cxx_path}", f"-DCMAKE_C_FLAGS={arch_flag}", f"-DCMAKE_CXX_FLAGS={arch_flag}"]
+
+@pytest.fixture
+def compiler_detection_cache(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str((RUNTIME_DIR / "cache").absolute()))
+
+def test_detect_once(compiler_detection_cache, monkeypatch):
+    toolchain = create_toolchain()
+    detections = list[Path]()
+    detect = CompilerDetectionCache._detect
+    def count_detect(args, file):
+        detections.append(file)
+        return detect(args, file)
+    monkeypatch.setattr(CompilerDetectionCache, "_detect", count_detect)
+
+    initial_cache_file = CompilerDetectionCache.initial_cache_file(toolchain, detection_args(toolchain))
+    assert initial_cache_file is not None
+    content = initial_cache_file.read_text(encoding="utf-8")
+    assert 'set(CMAKE_CXX_COMPILER_FORCED TRUE CACHE INTERNAL "")' in content
+    assert "CMAKE_CXX_COMPILER_LOADED" not in content
+    # The temporary CMake tree is removed
+    assert list(initial_cache_file.parent.iterdir()) == [initial_cache_file]
+
+    assert CompilerDetectionCache.initial_cache_file(create_toolchain(), detection_args(toolchain)) == initial_cache_file
+    assert detections == [initial_cache_file]
+
+def test_failed_detection_is_cached(compiler_detection_cache, monkeypatch):
+    toolchain = create_toolchain()
+    detections = list[Path]()
+    def fail_detect(args, file):
+        detections.append(file)
+        return False
+    monkeypatch.setattr(CompilerDetectionCache, "_detect", fail_detect)
+
+    assert CompilerDetectionCache.initial_cache_file(toolchain, detection_args(toolchain)) is None
+    assert CompilerDetectionCache.initial_cache_file(toolchain, detection_args(toolchain)) is None
+    assert len(detections) == 1
+    assert detections[0].with_suffix(".failed").exists()
+
+def test_key(compiler_detection_cache):
+    toolchain = create_toolchain()
+    key = CompilerDetectionCache._key(toolchain, detection_args(toolchain))
+    assert CompilerDetectionCache._key(create_toolchain(), detection_args(toolchain)) == key
+    assert CompilerDetectionCache._key(toolchain, detection_args(toolchain, "-m32")) != key
+
+def test_configure_skips_detection(compiler_detection_cache):
+    new_project(["bin", "my_bin"])
+    directory = RUNTIME_DIR / "my_bin"
+    first_build = subprocess.run([sys.executable, "src/kiss.py", "-d", str(directory), "build"], capture_output=True, text=True)
+    assert first_build.returncode == 0
+    assert "Detect the compiler" in first_build.stdout
+
+    # A new tree loads the detected compiler
+    shutil.rmtree(directory / "build")
+    second_build = subprocess.run([sys.executable, "src/kiss.py", "-d", str(directory), "build"], capture_output=True, text=True)
+    assert second_build.returncode == 0
+    assert "Detect the compiler" not in second_build.stdout
+    assert "The CXX compiler identification" not in second_build.stdout
+
+def test_up_to_date_build_skips_detection(compiler_detection_cache):
+    new_project(["bin", "my_bin"])
+    directory = RUNTIME_DIR / "my_bin"
+    first_build = subprocess.run([sys.executable, "src/kiss.py", "-d", str(directory), "build"], capture_output=True, text=True)
+    assert first_build.returncode == 0
+
+    # The compiler is only detected when CMake configures
+    shutil.rmtree(CompilerDetectionCache.directory)
+    second_build = subprocess.run([sys.executable, "src/kiss.py", "-d", str(directory), "build"], capture_output=True, text=True)
+    assert second_build.returncode == 0
+    assert "Build is up-to-date" in second_build.stdout
+    assert "Detect the compiler" not in second_build.stdout
+    assert not CompilerDetectionCache.directory.exists()
@@ -0,0 +1,61 @@
+import os
+import socket
+import subprocess
+import time
+import pytest
+from tests.common import *
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="unix sockets are required")
+
+SOCKET_PATH = RUNTIME_DIR / "kiss.sock"
+
+@pytest.fixture
+def daemon(runtime_dir):
+    env = os.environ | {"KISS_DAEMON_SOCKET": str(SOCKET_PATH.absolute())}
+    process = subprocess.Popen(["python", "src/kiss.py", "daemon"], env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    for _ in range(100):
+        if SOCKET_PATH.exists():
+            break
+        time.sleep(0.1)
+    yield env
+    subprocess.run(["python", "src/kiss.py", "daemon", "--stop"], env=env, capture_output=True)
+    process.wait(timeout=10)
+    env["DAEMON_OUTPUT"] = process.stdout.read()
+
+def test_daemon_serve_commands(daemon):
+    env = daemon
+    new_project(["bin", "my_bin"])
+
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR / "my_bin"), "list"], env=env, capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "my_bin" in result.stdout
+
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR / "my_bin"), "generate", "-p", "unknown"], env=env, capture_output=True, text=True)
+    assert result.returncode == 1
+    assert "Project unknown not found" in result.stderr
+
+def test_daemon_stop(daemon):
+    env = daemon
+    result = subprocess.run(["python", "src/kiss.py", "daemon", "--stop"], env=env, capture_output=True, text=True)
+    assert result.returncode == 0
+    # Commands are run locally when the daemon is not running
+    new_project(["bin", "my_bin"])
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR / "my_bin"), "list"], env=env, capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "my_bin" in result.stdout
+
+def test_daemon_invalid_request(daemon):
+    env = daemon
+    import daemon_client
+    deleted_directory = RUNTIME_DIR / "deleted"
+    deleted_directory.mkdir()
+    os.rmdir(deleted_directory)
+    request = {"argv": ["list"], "cwd": str(deleted_directory.absolute()), "env": {}}
+    assert daemon_client._send_request(env["KISS_DAEMON_SOCKET"], request, []) == 1
+    assert daemon_client._send_request(env["KISS_DAEMON_SOCKET"], {"cwd": os.getcwd()}, []) == 1
+
+    # The daemon still serves commands
+    new_project(["bin", "my_bin"])
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR / "my_bin"), "list"], env=env, capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "my_bin" in result.stdout
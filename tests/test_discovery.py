@@ -0,0 +1,41 @@
+import shutil
+import subprocess
+from tests.common import *
+
+def list_recursive(args: list[str] = []) -> subprocess.CompletedProcess:
+    result = subprocess.run(["python", "src/kiss.py", "--no-manifest-cache", "-d", str(RUNTIME_DIR), "list", "-r"] + args, capture_output=True, text=True)
+    assert result.returncode == 0
+    return result
+
+def create_tree():
+    new_project(["bin", "my_bin"])
+    new_project(["lib", "my_lib"])
+    new_project(["dyn", "my_third_party"])
+    new_inner_project("my_bin", ["lib", "my_inner_lib"])
+    # Copy a project in a build directory, it must be skipped
+    shutil.copytree(RUNTIME_DIR / "my_lib", RUNTIME_DIR / "my_bin" / "build" / "my_lib_copy")
+    # Copy a project in a .git directory, it must be skipped
+    shutil.copytree(RUNTIME_DIR / "my_lib", RUNTIME_DIR / ".git" / "my_lib_copy")
+
+def test_discovery_skip_build_and_vcs(runtime_dir):
+    create_tree()
+    result = list_recursive()
+    assert "my_bin" in result.stdout
+    assert "my_lib" in result.stdout
+    assert "my_inner_lib" in result.stdout
+    assert "my_third_party" in result.stdout
+    assert "my_lib_copy" not in result.stdout
+
+def test_discovery_kissignore(runtime_dir):
+    create_tree()
+    (RUNTIME_DIR / ".kissignore").write_text("# Third party projects\nmy_third_party/\n")
+    result = list_recursive()
+    assert "my_bin" in result.stdout
+    assert "my_third_party" not in result.stdout
+
+def test_discovery_stop_at_project(runtime_dir):
+    create_tree()
+    result = list_recursive(["--stop-at-project"])
+    assert "my_bin" in result.stdout
+    assert "my_lib" in result.stdout
+    assert "my_inner_lib" not in result.stdout
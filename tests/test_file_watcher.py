@@ -0,0 +1,36 @@
+import os
+import pytest
+from tests.common import *
+from file_watcher import InotifyWatcher, PollingWatcher
+
+def create_watchers():
+    watchers = [PollingWatcher()]
+    if (inotify_watcher := InotifyWatcher.create()) is not None:
+        watchers.append(inotify_watcher)
+    return watchers
+
+def test_watcher_detect_changes(runtime_dir):
+    file = (RUNTIME_DIR / "kiss.yaml").absolute()
+    other_file = (RUNTIME_DIR / "other.yaml").absolute()
+    RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
+    file.write_text("bin: []\n")
+    other_file.write_text("bin: []\n")
+    for watcher in create_watchers():
+        watcher.watch([file])
+        assert watcher.changed_files() == set()
+
+        # Modified file
+        file.write_text("lib: []\n")
+        assert watcher.changed_files() == {file}
+        assert watcher.changed_files() == set()
+
+        # Replaced file
+        temporary_file = file.with_suffix(".tmp")
+        temporary_file.write_text("dyn: []\n")
+        os.replace(temporary_file, file)
+        assert watcher.changed_files() == {file}
+
+        # Not watched file
+        other_file.write_text("lib: []\n")
+        assert watcher.changed_files() == set()
+        watcher.close()
@@ -0,0 +1,187 @@
+import hashlib
+import json
+import os
+import sys
+import pytest
+from tests.common import *
+from cmake.fingerprint import MMAP_THRESHOLD, Fingerprint, FingerprintMode, hash_files
+from cmake.fingerprint_store import FINGERPRINT_DATABASE
+
+def create_file(directory: Path, content: str) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    file = directory / "CMakeLists.txt"
+    file.write_text(content, encoding="utf-8")
+    return file
+
+# Change the modification time of the file without changing its content
+def touch(file: Path):
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+def save_fingerprint(directory: Path, file: Path, mode: FingerprintMode):
+    fingerprint = Fingerprint(directory, mode=mode)
+    fingerprint.load_or_create()
+    fingerprint.update_file(file)
+    fingerprint.save()
+
+def load_fingerprint(directory: Path, mode: FingerprintMode) -> Fingerprint:
+    fingerprint = Fingerprint(directory, mode=mode)
+    fingerprint.load_or_create()
+    return fingerprint
+
+@pytest.mark.parametrize("mode", [FingerprintMode.trust_stat, FingerprintMode.stat_hash])
+def test_unchanged_file_is_not_read(runtime_dir, mode):
+    file = create_file(RUNTIME_DIR / "fingerprint", "project(a)")
+    save_fingerprint(RUNTIME_DIR / "build", file, mode)
+
+    fingerprint = load_fingerprint(RUNTIME_DIR / "build", mode)
+    assert fingerprint.is_fresh_file(file)
+    assert fingerprint.stats.stat_hits == 1
+    assert fingerprint.stats.hash_computations == 0
+
+    # Updating an unchanged file reuses its hash
+    fingerprint.update_file(file)
+    assert fingerprint.stats.hash_computations == 0
+
+def test_touched_file(runtime_dir):
+    file = create_file(RUNTIME_DIR / "fingerprint", "project(a)")
+    save_fingerprint(RUNTIME_DIR / "build", file, FingerprintMode.stat_hash)
+    touch(file)
+
+    # Trusting the stat, a touched file is not fresh
+    assert not load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.trust_stat).is_fresh_file(file)
+
+    # The hash is compared when the stat changed, then the new stat is trusted
+    fingerprint = load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.stat_hash)
+    assert fingerprint.is_fresh_file(file)
+    assert fingerprint.stats.stat_misses == 1
+    assert fingerprint.stats.hash_computations == 1
+    assert fingerprint.is_fresh_file(file)
+    assert fingerprint.stats.stat_hits == 1
+    assert fingerprint.stats.hash_computations == 1
+
+def test_modified_file(runtime_dir):
+    file = create_file(RUNTIME_DIR / "fingerprint", "project(a)")
+    save_fingerprint(RUNTIME_DIR / "build", file, FingerprintMode.stat_hash)
+    file.write_text("project(b)", encoding="utf-8")
+    touch(file)
+    for mode in FingerprintMode:
+        assert not load_fingerprint(RUNTIME_DIR / "build", mode).is_fresh_file(file)
+
+def test_always_hash(runtime_dir):
+    file = create_file(RUNTIME_DIR / "fingerprint", "project(a)")
+    save_fingerprint(RUNTIME_DIR / "build", file, FingerprintMode.always_hash)
+    fingerprint = load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.always_hash)
+    assert fingerprint.is_fresh_file(file)
+    assert fingerprint.stats.hash_computations == 1
+
+def test_hash_algorithm_changed(runtime_dir):
+    file = create_file(RUNTIME_DIR / "fingerprint", "project(a)")
+    fingerprint = Fingerprint(RUNTIME_DIR / "build", mode=FingerprintMode.always_hash, hash_algorithm="sha256")
+    fingerprint.load_or_create()
+    fingerprint.update_file(file)
+    fingerprint.save()
+
+    # A hash computed with another algorithm is never compared
+    fingerprint = Fingerprint(RUNTIME_DIR / "build", mode=FingerprintMode.always_hash, hash_algorithm="blake2b")
+    fingerprint.load_or_create()
+    assert not fingerprint.is_fresh_file(file)
+    fingerprint.update_file(file)
+    assert fingerprint.is_fresh_file(file)
+
+def test_fresh_directories_and_values(runtime_dir):
+    file = create_file(RUNTIME_DIR / "fingerprint", "project(a)")
+    fingerprint = load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.stat_hash)
+    assert not fingerprint.is_fresh()
+    fingerprint.update_file(file)
+    fingerprint.update_directory(file.parent)
+    fingerprint.update_value("args", ["-G", "Ninja"])
+    fingerprint.save()
+
+    fingerprint = load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.stat_hash)
+    assert fingerprint.is_fresh()
+    assert fingerprint.is_fresh_value("args", ["-G", "Ninja"])
+    assert not fingerprint.is_fresh_value("args", ["-G", "Unix Makefiles"])
+    assert fingerprint.stats.hash_computations == 0
+
+    # A file added in the directory changes its modification time
+    (file.parent / "main.cpp").write_text("int main() {}", encoding="utf-8")
+    os.utime(file.parent, ns=(0, file.parent.stat().st_mtime_ns + 1_000_000_000))
+    assert not fingerprint.is_fresh()
+
+    # Entries no longer used are removed
+    fingerprint.retain({str(file.resolve())})
+    assert fingerprint.is_fresh()
+    assert not fingerprint.is_fresh_value("args", ["-G", "Ninja"])
+
+def test_legacy_json_is_migrated(runtime_dir):
+    file = create_file(RUNTIME_DIR / "fingerprint", "project(a)")
+    stat = file.stat()
+    legacy_file = RUNTIME_DIR / "build" / "fingerprint.json"
+    legacy_file.parent.mkdir(parents=True)
+    legacy_file.write_text(json.dumps({str(file.resolve()): {
+        "file": str(file.resolve()),
+        "hash": Fingerprint.compute_file_hash(file),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns}}, indent=2), encoding="utf-8")
+
+    load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.always_hash)
+    assert not legacy_file.exists()
+    assert (RUNTIME_DIR / "build" / FINGERPRINT_DATABASE).exists()
+    # Legacy entries were hashed with sha256
+    fingerprint = Fingerprint(RUNTIME_DIR / "build", mode=FingerprintMode.always_hash, hash_algorithm="sha256")
+    fingerprint.load_or_create()
+    assert fingerprint.is_fresh_file(file)
+
+def test_updates_are_not_lost(runtime_dir):
+    first_file = create_file(RUNTIME_DIR / "first", "project(a)")
+    second_file = create_file(RUNTIME_DIR / "second", "project(b)")
+    first = load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.stat_hash)
+    second = load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.stat_hash)
+    first.update_file(first_file)
+    second.update_file(second_file)
+    first.save()
+    second.save()
+
+    fingerprint = load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.stat_hash)
+    assert fingerprint.is_fresh_file(first_file)
+    assert fingerprint.is_fresh_file(second_file)
+
+    # Scopes don't share entries
+    other = Fingerprint(RUNTIME_DIR / "build", mode=FingerprintMode.stat_hash, scope="other")
+    other.load_or_create()
+    assert not other.is_fresh_file(first_file)
+
+def test_concurrent_processes(runtime_dir):
+    files = [create_file(RUNTIME_DIR / f"project_{i}", f"project(p{i})") for i in range(8)]
+    script = (
+        "import sys\n"
+        "from pathlib import Path\n"
+        "sys.path.insert(0, 'src')\n"
+        "from cmake.fingerprint import Fingerprint\n"
+        "for i in range(20):\n"
+        "    fingerprint = Fingerprint(Path(sys.argv[1]))\n"
+        "    fingerprint.load_or_create()\n"
+        "    fingerprint.update_file(Path(sys.argv[2]))\n"
+        "    fingerprint.update_value(sys.argv[2], i)\n"
+        "    fingerprint.save()\n"
+    )
+    processes = [subprocess.Popen([sys.executable, "-c", script, str(RUNTIME_DIR / "build"), str(file)]) for file in files]
+    assert all(process.wait() == 0 for process in processes)
+
+    fingerprint = load_fingerprint(RUNTIME_DIR / "build", FingerprintMode.stat_hash)
+    for file in files:
+        assert fingerprint.is_fresh_file(file)
+        assert fingerprint.is_fresh_value(str(file), 19)
+
+def test_hash_files(runtime_dir):
+    directory = RUNTIME_DIR / "hash"
+    directory.mkdir(parents=True)
+    contents = {directory / f"file_{i}.cpp": os.urandom(i * 100) for i in range(100)}
+    contents[directory / "large.bin"] = os.urandom(MMAP_THRESHOLD + 1)
+    for file, content in contents.items():
+        file.write_bytes(content)
+
+    hashes = hash_files(list(contents) + [directory / "missing.cpp"], hash_algorithm="sha256", jobs=4)
+    assert hashes == {file: hashlib.sha256(content).hexdigest() for file, content in contents.items()}
+    assert hash_files(list(contents), hash_algorithm="blake2b", jobs=1) == {file: hashlib.blake2b(content).hexdigest() for file, content in contents.items()}
@@ -0,0 +1,45 @@
+import os
+import pytest
+from tests.common import *
+from generated_file import write_if_changed
+
+@pytest.mark.parametrize("cmake_generator_name", ["Unix Makefiles", "Ninja Multi-Config"])
+def test_generate_is_deterministic(runtime_dir, cmake_generator_name):
+    bin_name = "my_bin"
+    new_project(["bin", bin_name])
+    for i in range(8):
+        (RUNTIME_DIR / bin_name / "src" / f"source_{i}.cpp").write_text(f"int f{i}() {{ return {i}; }}\n", encoding="utf-8")
+    yaml_file = RUNTIME_DIR / bin_name / "kiss.yaml"
+    yaml_file.write_text(yaml_file.read_text(encoding="utf-8").replace("- src/main.cpp", "- src/main.cpp\n  - src/*.cpp"), encoding="utf-8")
+
+    # The same project generates the same bytes whatever the hash seed
+    contents = set[bytes]()
+    for hash_seed in range(4):
+        shutil.rmtree(RUNTIME_DIR / bin_name / "build", ignore_errors=True)
+        result = generate_cmake(RUNTIME_DIR / bin_name, cmake_generator_name, env={**os.environ, "PYTHONHASHSEED": str(hash_seed)})
+        assert result.returncode == 0
+        files = find_cmake_files(RUNTIME_DIR / bin_name)
+        assert len(files) == 1
+        contents.add(files[0].read_bytes())
+    assert len(contents) == 1
+
+    # main.cpp is declared first and is not duplicated by the glob
+    content = contents.pop().decode("utf-8")
+    assert content.count("main.cpp") == 1
+    assert content.index("main.cpp") < content.index("source_0.cpp") < content.index("source_7.cpp")
+
+def test_write_if_changed(runtime_dir):
+    file = RUNTIME_DIR / "generated" / "CMakeLists.txt"
+    assert write_if_changed(file, "project(a)\n")
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns - 1_000_000_000))
+    mtime_ns = file.stat().st_mtime_ns
+
+    # The same content is not written again, the modification time is kept
+    assert not write_if_changed(file, "project(a)\n")
+    assert file.stat().st_mtime_ns == mtime_ns
+
+    assert write_if_changed(file, "project(b)\n")
+    assert file.read_bytes() == b"project(b)\n"
+    assert file.stat().st_mtime_ns != mtime_ns
+    assert list(file.parent.iterdir()) == [file]
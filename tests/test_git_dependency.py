@@ -0,0 +1,153 @@
+import shutil
+import subprocess
+import yaml
+from tests.common import *
+
+CACHE_DIR = RUNTIME_DIR / "cache"
+REPOSITORIES_DIR = RUNTIME_DIR / "repositories"
+
+def git(args: list[str], cwd: Path) -> str:
+    result = subprocess.run(["git", "-c", "user.name=kiss", "-c", "user.email=kiss@kiss", "-c", "init.defaultBranch=main"] + args, cwd=cwd, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip()
+
+# Create a git repository that contains a lib project, returns its url and its commit
+def create_repository(lib_name: str) -> tuple[str, str]:
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(REPOSITORIES_DIR), "new", "lib", lib_name])
+    assert result.returncode == 0
+    repository = REPOSITORIES_DIR / lib_name
+    git(["init", "--quiet"], repository)
+    git(["add", "."], repository)
+    git(["commit", "--quiet", "-m", "Initial commit"], repository)
+    return repository.absolute().as_uri(), git(["rev-parse", "HEAD"], repository)
+
+def list_dependencies(project_directory: Path, args: list[str] = []) -> subprocess.CompletedProcess:
+    return subprocess.run(["python", "src/kiss.py", "--no-manifest-cache"] + args + ["-d", str(project_directory), "list", "-d"], capture_output=True, text=True)
+
+def test_git_dependency(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str(CACHE_DIR.absolute()))
+    url_a, _ = create_repository("my_git_lib_a")
+    url_b, _ = create_repository("my_git_lib_b")
+    new_project(["bin", "my_bin"])
+    add_dependency("my_bin", ["my_git_lib_a", "--git", url_a, "--branch", "main"])
+    add_dependency("my_bin", ["my_git_lib_b", "--git", url_b])
+
+    result = list_dependencies(RUNTIME_DIR / "my_bin")
+    assert result.returncode == 0, result.stderr
+    assert "name : my_git_lib_a" in result.stdout
+    assert "name : my_git_lib_b" in result.stdout
+    # Projects are loaded from checkouts in the cache
+    assert str((CACHE_DIR / "git" / "checkouts").absolute()) in result.stdout
+
+def test_git_dependency_offline(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str(CACHE_DIR.absolute()))
+    url, commit = create_repository("my_git_lib")
+    new_project(["bin", "my_bin"])
+    add_dependency("my_bin", ["my_git_lib", "--git", url, "--commit", commit])
+
+    # Not in the cache
+    result = list_dependencies(RUNTIME_DIR / "my_bin", ["--offline"])
+    assert result.returncode == 1
+    assert "offline" in result.stderr
+
+    result = list_dependencies(RUNTIME_DIR / "my_bin")
+    assert result.returncode == 0, result.stderr
+
+    # The pinned commit is in the mirror, the repository is not used anymore
+    shutil.rmtree(REPOSITORIES_DIR)
+    result = list_dependencies(RUNTIME_DIR / "my_bin", ["--offline"])
+    assert result.returncode == 0, result.stderr
+    assert "name : my_git_lib" in result.stdout
+    result = list_dependencies(RUNTIME_DIR / "my_bin")
+    assert result.returncode == 0, result.stderr
+
+def test_git_dependency_unknown_revision(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str(CACHE_DIR.absolute()))
+    url, _ = create_repository("my_git_lib")
+    new_project(["bin", "my_bin"])
+    add_dependency("my_bin", ["my_git_lib", "--git", url, "--branch", "unknown"])
+    result = list_dependencies(RUNTIME_DIR / "my_bin")
+    assert result.returncode == 1
+    assert "Revision 'unknown' not found" in result.stderr
+
+def lock(project_directory: Path, args: list[str] = []) -> subprocess.CompletedProcess:
+    return subprocess.run(["python", "src/kiss.py", "-d", str(project_directory), "lock"] + args, capture_output=True, text=True)
+
+def test_lock_file(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str(CACHE_DIR.absolute()))
+    url, first_commit = create_repository("my_git_lib")
+    new_project(["bin", "my_bin"])
+    new_project(["lib", "my_lib"])
+    add_dependency("my_bin", ["my_git_lib", "--git", url, "--branch", "main"])
+    add_dependency("my_bin", ["my_lib", "--path", "../my_lib"])
+
+    result = lock(RUNTIME_DIR / "my_bin")
+    assert result.returncode == 0, result.stderr
+    lock_data = yaml.safe_load((RUNTIME_DIR / "my_bin" / "kiss.lock").read_text())
+    # Dependencies come first
+    assert [project["name"] for project in lock_data["projects"]] == ["my_git_lib", "my_lib", "my_bin"]
+    assert lock_data["projects"][0]["commit"] == first_commit
+    assert lock_data["projects"][1]["file"] == "../my_lib/kiss.yaml"
+    assert lock(RUNTIME_DIR / "my_bin", ["--check"]).returncode == 0
+
+    # A new commit on the branch is not used while the lock file is up to date
+    repository = REPOSITORIES_DIR / "my_git_lib"
+    (repository / "README.md").write_text("new commit")
+    git(["add", "."], repository)
+    git(["commit", "--quiet", "-m", "Second commit"], repository)
+    second_commit = git(["rev-parse", "HEAD"], repository)
+    result = list_dependencies(RUNTIME_DIR / "my_bin")
+    assert result.returncode == 0, result.stderr
+    assert first_commit in result.stdout
+    assert second_commit not in result.stdout
+
+    # The lock file is outdated when the branch moved
+    assert lock(RUNTIME_DIR / "my_bin", ["--check"]).returncode == 1
+    assert lock(RUNTIME_DIR / "my_bin").returncode == 0
+    result = list_dependencies(RUNTIME_DIR / "my_bin")
+    assert second_commit in result.stdout
+
+    # The lock file is not used when a manifest changed
+    (RUNTIME_DIR / "my_lib" / "kiss.yaml").write_text((RUNTIME_DIR / "my_lib" / "kiss.yaml").read_text() + "\n")
+    result = list_dependencies(RUNTIME_DIR / "my_bin")
+    assert result.returncode == 0
+    assert "kiss.lock is outdated" in result.stdout
+
+def test_lock_file_locked_graph(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str(CACHE_DIR.absolute()))
+    url, commit = create_repository("my_git_lib")
+    new_project(["bin", "my_bin"])
+    new_project(["lib", "my_lib"])
+    add_dependency("my_bin", ["my_git_lib", "--git", url, "--branch", "main"])
+    add_dependency("my_bin", ["my_lib", "--path", "../my_lib"])
+    assert lock(RUNTIME_DIR / "my_bin").returncode == 0
+
+    # The first load reads the locked files and keeps the graph in the manifest cache
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR / "my_bin"), "list", "-d"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert commit in result.stdout
+
+    # The locked graph is used as is, the git dependency is not resolved again
+    shutil.rmtree(CACHE_DIR / "git" / "mirrors")
+    result = subprocess.run(["python", "src/kiss.py", "--offline", "-d", str(RUNTIME_DIR / "my_bin"), "list", "-d"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert "name : my_git_lib" in result.stdout
+    assert "name : my_lib" in result.stdout
+    # Also when only the closure of the project is loaded
+    result = subprocess.run(["python", "src/kiss.py", "--offline", "-d", str(RUNTIME_DIR / "my_bin"), "generate", "-p", "my_bin", "cmake"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+def test_git_dependency_concurrent(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str(CACHE_DIR.absolute()))
+    url, _ = create_repository("my_git_lib")
+    new_project(["bin", "my_bin"])
+    add_dependency("my_bin", ["my_git_lib", "--git", url, "--branch", "main"])
+
+    # Processes that share the cache clone and checkout the repository at the same time
+    processes = [subprocess.Popen(["python", "src/kiss.py", "--no-manifest-cache", "-d", str(RUNTIME_DIR / "my_bin"), "list", "-d"],
+                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) for _ in range(6)]
+    for process in processes:
+        stdout, stderr = process.communicate()
+        assert process.returncode == 0, stderr
+        assert "name : my_git_lib" in stdout
+    assert len(list((CACHE_DIR / "git" / "mirrors").glob("*.git"))) == 1
@@ -0,0 +1,32 @@
+from pathlib import Path
+import yaml
+from tests.common import *
+from yaml_file.line_loader import LineLoader, PyLineLoader, YamlObject
+
+TOOLCHAIN_FILES = [Path("toolchains/linux/compilers.yaml"), Path("toolchains/windows/compilers.yaml")]
+
+# Convert YamlObject to tuples to compare values and lines
+def to_comparable(value):
+    if isinstance(value, YamlObject):
+        return (value.key_line, value.line, to_comparable(value.value))
+    if isinstance(value, dict):
+        return {key: to_comparable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [to_comparable(item) for item in value]
+    return value
+
+def test_line_loaders_are_identical():
+    for file in TOOLCHAIN_FILES:
+        with file.open() as f:
+            content = f.read()
+        assert to_comparable(yaml.load(content, Loader=LineLoader)) == to_comparable(yaml.load(content, Loader=PyLineLoader))
+
+def test_line_loader_lines():
+    data = yaml.load("compilers:\n  - name: gcc\n    flags:\n      - -O2\n", Loader=LineLoader)
+    compilers = data["compilers"]
+    assert compilers.key_line == 1
+    assert compilers.line == 2
+    compiler = compilers.value[0]
+    assert compiler["name"].value == "gcc"
+    assert compiler["flags"].key_line == 3
+    assert compiler["flags"].value == ["-O2"]
@@ -27,3 +27,25 @@ def test_new(runtime_dir):
     create_project()
     result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR), "list", "-r", "-d" ])
     assert result.returncode == 0
+
+def test_list_jobs(runtime_dir):
+    # Create project to list
+    create_project()
+    serial = subprocess.run(["python", "src/kiss.py", "--no-manifest-cache", "-d", str(RUNTIME_DIR), "list", "-r", "-d" ], capture_output=True, text=True)
+    assert serial.returncode == 0
+    parallel = subprocess.run(["python", "src/kiss.py", "--no-manifest-cache", "-d", str(RUNTIME_DIR), "list", "-r", "-d", "-j", "4" ], capture_output=True, text=True)
+    assert parallel.returncode == 0
+    # Result must be the same and in the same order
+    assert parallel.stdout == serial.stdout
+
+def test_list_levels(runtime_dir):
+    new_project(["bin", "my_bin"])
+    new_inner_project("my_bin", ["-e", "lib", "my_lib"])
+    new_inner_project("my_bin", ["-e", "dyn", "my_dyn"])
+    add_dependency("my_bin", ["my_lib"])
+    add_dependency("my_bin", ["my_dyn"])
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR / "my_bin"), "list", "-d", "--levels" ], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "critical path : 2 projects" in result.stdout
+    assert "level 0 : my_lib, my_dyn" in result.stdout
+    assert "level 1 : my_bin" in result.stdout
@@ -0,0 +1,48 @@
+import subprocess
+import yaml
+from tests.common import *
+
+CACHE_DIR = RUNTIME_DIR / "cache"
+
+def list_projects(directory: Path, args: list[str] = []) -> subprocess.CompletedProcess:
+    return subprocess.run(["python", "src/kiss.py", "-d", str(directory)] + args + ["list"], capture_output=True, text=True)
+
+def set_description(project_file: Path, description: str):
+    with open(project_file, "r") as f:
+        data = yaml.safe_load(f)
+    data["bin"][0]["description"] = description
+    with open(project_file, "w") as f:
+        yaml.safe_dump(data, f, sort_keys=False)
+
+def test_manifest_cache_invalidation(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str(CACHE_DIR.absolute()))
+    bin_name = "my_bin"
+    new_project(["bin", bin_name])
+
+    # First list parse the file and fill the cache
+    result = list_projects(RUNTIME_DIR / bin_name)
+    assert result.returncode == 0
+    assert (CACHE_DIR / "manifests.pickle").exists()
+
+    # Second list use the cache
+    result = list_projects(RUNTIME_DIR / bin_name)
+    assert result.returncode == 0
+    assert bin_name in result.stdout
+
+    # Modifying the file invalidate the cache entry
+    set_description(RUNTIME_DIR / bin_name / "kiss.yaml", "modified description")
+    result = list_projects(RUNTIME_DIR / bin_name)
+    assert result.returncode == 0
+    assert "modified description" in result.stdout
+
+def test_no_manifest_cache(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str(CACHE_DIR.absolute()))
+    bin_name = "my_bin"
+    new_project(["bin", bin_name])
+    # 'new' don't use the cache, only list does
+    assert not (CACHE_DIR / "manifests.pickle").exists()
+
+    result = list_projects(RUNTIME_DIR / bin_name, ["--no-manifest-cache"])
+    assert result.returncode == 0
+    assert bin_name in result.stdout
+    assert not (CACHE_DIR / "manifests.pickle").exists()
@@ -0,0 +1,96 @@
+import pytest
+import semver
+from tests.common import *
+from project import LibProject
+from project_graph import ProjectGraph
+
+def create_project(name: str) -> LibProject:
+    directory = RUNTIME_DIR / name
+    return LibProject(file=directory / "kiss.yaml", path=directory, name=name, description="", version=semver.Version.parse("0.1.0"))
+
+def test_topological_order():
+    # a -> b -> d, a -> c -> d
+    a, b, c, d = (create_project(name) for name in "abcd")
+    a.add_dependency(b)
+    a.add_dependency(c)
+    b.add_dependency(d)
+    c.add_dependency(d)
+    assert [p.name for p in a.topological_sort_projects()] == ["d", "b", "c", "a"]
+    assert a.transitive_dependencies() == {b, c, d}
+    assert ProjectGraph.depends_on(b, d)
+    assert not ProjectGraph.depends_on(d, b)
+
+    # Results are cached until a dependency is added
+    assert a.topological_sort_projects() is a.topological_sort_projects()
+    e = create_project("e")
+    d.add_dependency(e)
+    assert [p.name for p in a.topological_sort_projects()] == ["e", "d", "b", "c", "a"]
+    assert e in a.transitive_dependencies()
+
+def test_deep_dependency_chain():
+    projects = [create_project(f"lib_{index}") for index in range(10000)]
+    for project, dependency in zip(projects, projects[1:]):
+        project.add_dependency(dependency)
+    order = projects[0].topological_sort_projects()
+    assert order == list(reversed(projects))
+    assert len(projects[0].transitive_dependencies()) == 9999
+
+def test_cyclic_dependency(capsys):
+    a, b, c = (create_project(name) for name in "abc")
+    a.add_dependency(b)
+    b.add_dependency(c)
+    c.add_dependency(b)
+    with pytest.raises(SystemExit):
+        a.topological_sort_projects()
+    assert "b -> c -> b" in capsys.readouterr().err
+
+def test_dependency_levels():
+    # a -> b -> d, a -> c, e
+    a, b, c, d, e = (create_project(name) for name in "abcde")
+    a.add_dependency(b)
+    a.add_dependency(c)
+    b.add_dependency(d)
+    dependency_levels = ProjectGraph.levels([a, e])
+    assert [[p.name for p in level] for level in dependency_levels] == [["d", "c", "e"], ["b"], ["a"]]
+    assert dependency_levels.critical_path_length == 3
+    assert dependency_levels.depth(a) == 2
+    assert dependency_levels.depth(c) == 0
+    assert a.dependency_levels().critical_path_length == 3
+
+def test_cycles():
+    # a -> b -> c -> a, d -> d, e -> a
+    a, b, c, d, e = (create_project(name) for name in "abcde")
+    a.add_dependency(b)
+    b.add_dependency(c)
+    c.add_dependency(a)
+    d.add_dependency(d)
+    e.add_dependency(a)
+    cycles = ProjectGraph.cycles([e, d])
+    assert [sorted(p.name for p in cycle) for cycle in cycles] == [["a", "b", "c"], ["d"]]
+
+    # Components of a deep chain don't hit the recursion limit
+    projects = [create_project(f"lib_{index}") for index in range(10000)]
+    for project, dependency in zip(projects, projects[1:]):
+        project.add_dependency(dependency)
+    assert len(ProjectGraph.strongly_connected_components([projects[0]])) == 10000
+    assert ProjectGraph.cycles([projects[0]]) == []
+
+def test_projects_created_before_clear():
+    a, b = (create_project(name) for name in "ab")
+    a.add_dependency(b)
+    ProjectGraph.clear()
+    c = create_project("c")
+    c.add_dependency(a)
+    # Projects created before the graph was cleared get a new index
+    assert [p.name for p in c.topological_sort_projects()] == ["b", "a", "c"]
+    assert a.graph_index != c.graph_index
+
+def test_projects_added_when_queried():
+    ProjectGraph.clear()
+    a, b = (create_project(name) for name in "ab")
+    # Creating projects doesn't keep them in the graph
+    assert len(ProjectGraph) == 0
+    a.add_dependency(b)
+    assert [p.name for p in a.topological_sort_projects()] == ["b", "a"]
+    assert len(ProjectGraph) == 2
+    assert a.graph_index != b.graph_index
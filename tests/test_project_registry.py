@@ -0,0 +1,46 @@
+import yaml
+from tests.common import *
+from projectregistry import ProjectRegistry
+
+def test_registry_resolve_dependencies(runtime_dir):
+    new_project(["bin", "my_bin"])
+    new_inner_project("my_bin", ["-e", "lib", "my_lib"])
+    add_dependency("my_bin", ["my_lib"])
+    new_inner_project("my_bin", ["-e", "dyn", "my_dyn"])
+    add_dependency("my_bin", ["my_dyn"])
+
+    registry = type(ProjectRegistry)()
+    bin_directory = (RUNTIME_DIR / "my_bin").absolute()
+    registry.load_and_register_all_project_in_directory(current_directory=bin_directory, load_dependencies=True, recursive=False)
+    project = registry.get_project("my_bin")
+    assert project is not None
+    assert [dep.name for dep in project.dependencies] == ["my_lib", "my_dyn"]
+    assert registry.get_project_in_file(bin_directory / "kiss.yaml", "my_dyn") is project.dependencies[1]
+    assert [p.name for p in registry.projects_in_directory(bin_directory)] == ["my_bin", "my_lib", "my_dyn"]
+
+    # Loading again reuse registered projects
+    registry.load_and_register_all_project_in_directory(current_directory=bin_directory, load_dependencies=True, recursive=False)
+    assert registry.get_project("my_bin") is project
+    assert len(registry.projects_in_directory(bin_directory)) == 3
+
+def test_registry_load_project_closure(runtime_dir):
+    new_project(["bin", "my_bin"])
+    new_inner_project("my_bin", ["-e", "lib", "my_lib"])
+    add_dependency("my_bin", ["my_lib"])
+    new_inner_project("my_bin", ["-e", "bin", "my_other_bin"])
+    # A broken dependency of another project don't prevent to load 'my_bin'
+    project_file = RUNTIME_DIR / "my_bin" / "kiss.yaml"
+    with open(project_file, "r") as f:
+        data = yaml.safe_load(f)
+    next(p for p in data["bin"] if p["name"] == "my_other_bin")["dependencies"] = [{"name": "missing"}]
+    with open(project_file, "w") as f:
+        yaml.safe_dump(data, f, sort_keys=False)
+
+    registry = type(ProjectRegistry)()
+    bin_directory = (RUNTIME_DIR / "my_bin").absolute()
+    project = registry.load_and_register_project_closure(current_directory=bin_directory, project_name="my_bin")
+    assert project is not None
+    assert [dep.name for dep in project.dependencies] == ["my_lib"]
+    assert [p.name for p in registry.projects_in_directory(bin_directory)] == ["my_bin", "my_lib"]
+    assert registry.get_project("my_other_bin") is None
+    assert registry.load_and_register_project_closure(current_directory=bin_directory, project_name="unknown") is None
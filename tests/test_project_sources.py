@@ -0,0 +1,19 @@
+from tests.common import *
+from project_sources import resolve_sources, split_source_pattern
+
+def test_split_source_pattern():
+    assert split_source_pattern(Path("src/main.cpp")) == (Path("src/main.cpp"), None, None)
+    assert split_source_pattern(Path("src/*.cpp")) == (Path("src"), "*.cpp", None)
+    assert split_source_pattern(Path("src/**/detail/*.cpp")) == (Path("src"), "**", Path("detail/*.cpp"))
+
+def test_resolve_sources(runtime_dir):
+    directory = RUNTIME_DIR / "sources"
+    for file in ["src/b.cpp", "src/a.cpp", "src/inner/c.cpp", "src/inner/d.h"]:
+        (directory / file).parent.mkdir(parents=True, exist_ok=True)
+        (directory / file).write_text("", encoding="utf-8")
+
+    # Declaration order is kept, files of a pattern are sorted and duplicates are removed
+    sources = resolve_sources([directory / "src/b.cpp", directory / "src/*.cpp", directory / "src/**.cpp"], "my_project")
+    assert sources == [(directory / file).resolve() for file in ["src/b.cpp", "src/a.cpp", "src/inner/c.cpp"]]
+
+    assert resolve_sources([directory / "src/unknown.cpp"], "my_project") is None
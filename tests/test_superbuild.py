@@ -0,0 +1,45 @@
+from tests.common import *
+
+# Superbuild CMakeLists.txt generated in the directory, with the default generator of the toolchain
+def generate_superbuild(directory: Path) -> Path:
+    assert generate_cmake(directory, args=["--superbuild"]).returncode == 0
+    return next(directory.glob("build/*/*/cmake/superbuild/**/CMakeLists.txt"))
+
+# Two binaries of the same directory that share a library
+def create_workspace():
+    new_project(["lib", "shared"])
+    new_project(["bin", "app"])
+    (RUNTIME_DIR / "app" / "kiss.yaml").write_text(
+        "bin:\n"
+        "- name: app\n"
+        "  version: 0.1.0\n"
+        "  sources:\n"
+        "  - src/main.cpp\n"
+        "  dependencies:\n"
+        "  - name: shared\n"
+        "    path: ../shared\n"
+        "- name: tool\n"
+        "  version: 0.1.0\n"
+        "  sources:\n"
+        "  - src/main.cpp\n"
+        "  dependencies:\n"
+        "  - name: shared\n"
+        "    path: ../shared\n", encoding="utf-8")
+
+def test_superbuild_adds_each_project_once(runtime_dir):
+    create_workspace()
+    superbuild_file = generate_superbuild(RUNTIME_DIR / "app")
+    content = superbuild_file.read_text(encoding="utf-8")
+    add_subdirectories = [line for line in content.splitlines() if line.startswith("add_subdirectory(")]
+    assert len(add_subdirectories) == 3
+    # The shared library is added once, before the projects that use it
+    assert "shared_" in add_subdirectories[0]
+    assert any("app_" in line for line in add_subdirectories[1:])
+    assert any("tool_" in line for line in add_subdirectories[1:])
+    for line in add_subdirectories:
+        assert (Path(line.split('"')[1]) / "CMakeLists.txt").exists()
+
+    # Nothing changed, no file is written
+    cmake_files = {file: file.stat().st_mtime_ns for file in find_cmake_files(RUNTIME_DIR / "app" / "build")}
+    assert generate_superbuild(RUNTIME_DIR / "app") == superbuild_file
+    assert {file: file.stat().st_mtime_ns for file in find_cmake_files(RUNTIME_DIR / "app" / "build")} == cmake_files
@@ -0,0 +1,68 @@
+import os
+import stat
+import pytest
+from tests.common import *
+from toolchain.toolchain_digest import CompilerVersionCache, ToolchainDigest
+
+def create_toolchain() -> Toolchain:
+    return Toolchain.create(compiler_name=DEFAULT_COMPILER_NAME, target_name=DEFAULT_TARGET_NAME)
+
+# Compiler that counts how many times it was run in 'runs.txt'
+def create_fake_compiler(directory: Path, version: str) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    compiler = directory / "fake-g++"
+    compiler.write_text(f"#!/bin/sh\necho run >> \"{(directory / 'runs.txt').resolve()}\"\necho \"fake-g++ {version}\"\n", encoding="utf-8")
+    compiler.chmod(compiler.stat().st_mode | stat.S_IXUSR)
+    return compiler.resolve()
+
+def count_runs(directory: Path) -> int:
+    runs_file = directory / "runs.txt"
+    return len(runs_file.read_text(encoding="utf-8").splitlines()) if runs_file.exists() else 0
+
+@pytest.fixture
+def compiler_version_cache(runtime_dir, monkeypatch):
+    monkeypatch.setenv("KISS_CACHE_DIR", str((RUNTIME_DIR / "cache").absolute()))
+    monkeypatch.setattr(CompilerVersionCache, "_versions", None)
+
+def test_profile_flags(compiler_version_cache):
+    toolchain = create_toolchain()
+    profile_name = toolchain.profile_name_list()[0]
+    digest = ToolchainDigest.create(toolchain, [profile_name])
+    assert ToolchainDigest.create(create_toolchain(), [profile_name]).configuration == digest.configuration
+
+    # Only the flags of the profiles used are part of the digest
+    other_profile_name = next(name for name in toolchain.profile_name_list() if name != profile_name)
+    other_profile = toolchain.get_profile(other_profile_name)
+    other_profile.cxx_compiler_flags.append("-DOTHER")
+    assert ToolchainDigest.create(toolchain, [profile_name]).configuration == digest.configuration
+    assert ToolchainDigest.create(toolchain, [profile_name, other_profile_name]).configuration != digest.configuration
+
+    toolchain.get_profile(profile_name).cxx_compiler_flags.append("-DCHANGED")
+    changed_digest = ToolchainDigest.create(toolchain, [profile_name])
+    assert changed_digest.configuration != digest.configuration
+    assert changed_digest.compiler == digest.compiler
+
+@pytest.mark.skipif(platform.system() == "Windows", reason="The fake compiler is a shell script")
+def test_compiler_binary(compiler_version_cache):
+    directory = RUNTIME_DIR / "compiler"
+    toolchain = create_toolchain()
+    toolchain.compiler.cxx_path = create_fake_compiler(directory, "1.0")
+    toolchain.compiler.c_path = Path()
+    profile_name = toolchain.profile_name_list()[0]
+
+    digest = ToolchainDigest.create(toolchain, [profile_name])
+    assert count_runs(directory) == 1
+
+    # The version is cached on disk while the binary doesn't change
+    CompilerVersionCache._versions = None
+    assert ToolchainDigest.create(toolchain, [profile_name]).compiler == digest.compiler
+    assert count_runs(directory) == 1
+
+    # An upgraded compiler changes the compiler digest only
+    create_fake_compiler(directory, "2.0")
+    compiler_stat = toolchain.compiler.cxx_path.stat()
+    os.utime(toolchain.compiler.cxx_path, ns=(compiler_stat.st_atime_ns, compiler_stat.st_mtime_ns + 1_000_000_000))
+    upgraded_digest = ToolchainDigest.create(toolchain, [profile_name])
+    assert count_runs(directory) == 2
+    assert upgraded_digest.compiler != digest.compiler
+    assert upgraded_digest.configuration == digest.configuration
@@ -0,0 +1,75 @@
+import os
+import subprocess
+import time
+from tests.common import *
+
+INDEX_FILE = RUNTIME_DIR / "build" / ".kiss" / "index"
+
+def index(args: list[str] = []) -> subprocess.CompletedProcess:
+    return subprocess.run(["python", "src/kiss.py", "--no-manifest-cache", "-d", str(RUNTIME_DIR), "index"] + args, capture_output=True, text=True)
+
+# Move mtime of all directories in the past, the index trusts them immediately
+# The build directory is created before to not change the mtime of the root directory when the index is written
+def age_directories():
+    (RUNTIME_DIR / "build").mkdir(exist_ok=True)
+    past = time.time() - 60
+    for directory, _, _ in os.walk(RUNTIME_DIR):
+        os.utime(directory, (past, past))
+
+def create_tree():
+    new_project(["bin", "my_bin"])
+    new_project(["lib", "my_lib"])
+    new_inner_project("my_bin", ["lib", "my_inner_lib"])
+
+def test_index_incremental(runtime_dir):
+    create_tree()
+    age_directories()
+
+    result = index()
+    assert result.returncode == 0
+    assert "Indexed 3 projects in 3 files" in result.stdout
+    assert INDEX_FILE.exists()
+
+    # Nothing changed, no directory is scanned
+    result = index()
+    assert result.returncode == 0
+    assert "(0 directories scanned)" in result.stdout
+
+    # A new project is found in the changed directory
+    new_project(["dyn", "my_dyn"])
+    result = index(["-p", "my_dyn"])
+    assert result.returncode == 0
+    assert "Indexed 4 projects in 4 files" in result.stdout
+    assert str((RUNTIME_DIR / "my_dyn" / "kiss.yaml").absolute()) in result.stdout
+
+    # list use the index
+    result = subprocess.run(["python", "src/kiss.py", "-d", str(RUNTIME_DIR), "list", "-r"], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "my_dyn" in result.stdout
+
+def test_index_rebuild(runtime_dir):
+    create_tree()
+    age_directories()
+    assert index().returncode == 0
+    result = index(["--rebuild"])
+    assert result.returncode == 0
+    assert "(0 directories scanned)" not in result.stdout
+    assert "Indexed 3 projects in 3 files" in result.stdout
+
+def test_index_project_not_found(runtime_dir):
+    create_tree()
+    result = index(["-p", "unknown"])
+    assert result.returncode == 1
+
+def test_index_project_lookup(runtime_dir):
+    create_tree()
+    age_directories()
+    generate = ["python", "src/kiss.py", "-d", str(RUNTIME_DIR), "generate", "-p", "my_inner_lib", "cmake"]
+
+    # The root directory has no 'kiss.yaml', the project is only found in the index
+    result = subprocess.run(generate, capture_output=True, text=True)
+    assert result.returncode == 1
+    assert index().returncode == 0
+    result = subprocess.run(generate, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert any(file.parent.name.startswith("my_inner_lib_") for file in find_cmake_files(RUNTIME_DIR / "build"))